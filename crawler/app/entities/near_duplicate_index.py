@@ -0,0 +1,142 @@
+from typing import Iterable, Union
+
+import numpy as np
+
+from app.entities.picture_table import PictureTableException, hash_to_int
+
+# Hashes are split in 4 chunks of 16 bits. Two hashes differing by at most 3 bits
+# have at least one identical chunk, so only the hashes sharing a chunk with the
+# searched one are compared
+CHUNK_COUNT = 4
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+MAX_TOLERANCE = CHUNK_COUNT - 1
+
+# Number of bits set in each byte value
+BIT_COUNT_TABLE = np.array([bin(value).count("1") for value in range(256)], np.uint8)
+
+
+class NearDuplicateIndexException(Exception):
+    pass
+
+
+def count_different_bits(hashes: np.ndarray, picture_hash: int) -> np.ndarray:
+    differences = np.ascontiguousarray(hashes ^ np.uint64(picture_hash))
+
+    return BIT_COUNT_TABLE[differences.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def get_chunk_keys(hashes: np.ndarray, chunk: int) -> np.ndarray:
+    return ((hashes >> np.uint64(chunk * CHUNK_BITS)) & np.uint64(CHUNK_MASK)).astype(
+        np.uint16
+    )
+
+
+def get_chunk_key(picture_hash: int, chunk: int) -> int:
+    return (picture_hash >> (chunk * CHUNK_BITS)) & CHUNK_MASK
+
+
+class NearDuplicateIndex:
+    """Finds the hashes a few bits away from a picture hash, by multi-index hashing
+    over the chunks of the hashes"""
+
+    def __init__(
+        self, hashes: np.ndarray, chunk_orders: Union[np.ndarray, None] = None
+    ) -> None:
+        """chunk_orders are computed when not given, hashes must then be unique"""
+        if chunk_orders is None:
+            hashes = np.unique(hashes.astype(np.uint64))
+            chunk_orders = np.array(
+                [
+                    np.argsort(get_chunk_keys(hashes, chunk), kind="stable")
+                    for chunk in range(CHUNK_COUNT)
+                ],
+                dtype=np.int64,
+            ).reshape(CHUNK_COUNT, len(hashes))
+
+        self._hashes = hashes
+        self._chunk_orders = chunk_orders
+        self._sorted_chunk_keys = [
+            get_chunk_keys(hashes[chunk_orders[chunk]], chunk)
+            for chunk in range(CHUNK_COUNT)
+        ]
+
+        # Hashes added since the index was built, by chunk key
+        self._added_hash_set: set[int] = set()
+        self._added_chunk_buckets: list[dict[int, list[int]]] = [
+            {} for _ in range(CHUNK_COUNT)
+        ]
+
+    @classmethod
+    def from_hash_list(cls, hash_list: Iterable[str]) -> "NearDuplicateIndex":
+        """Hashes that are not 64 bits hashes are left out"""
+        values: list[int] = []
+
+        for picture_hash in hash_list:
+            try:
+                values.append(hash_to_int(picture_hash))
+            except PictureTableException:
+                continue
+
+        return cls(np.array(values, dtype=np.uint64))
+
+    def __len__(self) -> int:
+        return len(self._hashes) + len(self._added_hash_set)
+
+    def get_hashes(self) -> np.ndarray:
+        return self._hashes
+
+    def get_chunk_orders(self) -> np.ndarray:
+        return self._chunk_orders
+
+    def has_added_hashes(self) -> bool:
+        return len(self._added_hash_set) > 0
+
+    def rebuild(self) -> "NearDuplicateIndex":
+        """New index including the added hashes"""
+        added_hashes = np.array(sorted(self._added_hash_set), dtype=np.uint64)
+
+        return NearDuplicateIndex(np.concatenate([self._hashes, added_hashes]))
+
+    def add(self, picture_hash: int) -> None:
+        if picture_hash in self._added_hash_set:
+            return
+
+        self._added_hash_set.add(picture_hash)
+
+        for chunk in range(CHUNK_COUNT):
+            self._added_chunk_buckets[chunk].setdefault(
+                get_chunk_key(picture_hash, chunk), []
+            ).append(picture_hash)
+
+    def find(self, picture_hash: int, tolerance: int) -> list[int]:
+        """Known hashes differing by at most tolerance bits"""
+        if tolerance < 0 or tolerance > MAX_TOLERANCE:
+            raise NearDuplicateIndexException(
+                f"Tolerance must be between 0 and {MAX_TOLERANCE}, got {tolerance}"
+            )
+
+        candidate_list: list[np.ndarray] = []
+
+        for chunk in range(CHUNK_COUNT):
+            key = np.uint16(get_chunk_key(picture_hash, chunk))
+            sorted_keys = self._sorted_chunk_keys[chunk]
+            start = np.searchsorted(sorted_keys, key, side="left")
+            end = np.searchsorted(sorted_keys, key, side="right")
+
+            candidate_list.append(self._hashes[self._chunk_orders[chunk, start:end]])
+            candidate_list.append(
+                np.array(
+                    self._added_chunk_buckets[chunk].get(int(key), []), dtype=np.uint64
+                )
+            )
+
+        candidates = np.unique(np.concatenate(candidate_list))
+        close_candidates = candidates[
+            count_different_bits(candidates, picture_hash) <= tolerance
+        ]
+
+        return [int(value) for value in close_candidates]
+
+    def contains(self, picture_hash: int, tolerance: int) -> bool:
+        return len(self.find(picture_hash, tolerance)) > 0
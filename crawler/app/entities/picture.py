@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
+import io
 from pathlib import Path
+from typing import Union
 from PIL import Image
 
 import imagehash
+import numpy as np
 import piexif
+import scipy.fftpack
 
 
 class PictureException(Exception):
@@ -36,17 +40,65 @@ class iPicture(ABC):
     def get_hash(self) -> str:
         pass
 
+    @abstractmethod
+    def get_hash_pixels(self) -> np.ndarray:
+        pass
+
 
 DEFAULT_DATETIME = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 
+def extract_exif_date_time(
+    raw_date_time: str, current_timezone: timezone, path: Path
+) -> datetime:
+    try:
+        raw_date_and_time = raw_date_time.split(" ")
+        raw_date_elements = raw_date_and_time[0].split(":")
+
+        raw_time_elements = raw_date_and_time[1].split(":")
+
+        return datetime(
+            int(raw_date_elements[0]),
+            int(raw_date_elements[1]),
+            int(raw_date_elements[2]),
+            int(raw_time_elements[0]),
+            int(raw_time_elements[1]),
+            int(raw_time_elements[2]),
+            0,
+            current_timezone,
+        )
+    except Exception:
+        raise ExifMalformedDateTime(path)
+
+
+# imagehash.phash shrinks the picture to a 32x32 grayscale image before the DCT
+# and keeps the 8x8 lowest frequencies
+PHASH_IMAGE_SIZE = 32
+PHASH_HASH_SIZE = 8
+
+# Fast hashes are computed on a grayscale image downscaled by the JPEG decoder, they
+# are expected to be equal to the standard hash or within this Hamming distance
+FAST_HASH_MAX_DISTANCE = 4
+
+
 class Picture(iPicture):
-    def __init__(self, path: Path, current_timezone: timezone = timezone.utc) -> None:
+    def __init__(
+        self,
+        path: Path,
+        current_timezone: timezone = timezone.utc,
+        fast_hash: bool = False,
+        content: Union[bytes, None] = None,
+    ) -> None:
         self._current_timezone = current_timezone
         self._path = path
+        self._fast_hash = fast_hash
+        self._content = content
 
         try:
-            self._image = Image.open(self._path)
+            if self._content is None:
+                self._image = Image.open(self._path)
+            else:
+                self._image = Image.open(io.BytesIO(self._content))
         except Exception:
             raise MalformedImageFileException(str(self._path))
 
@@ -55,6 +107,8 @@ class Picture(iPicture):
             try:
                 if "exif" in self._image.info:
                     self._exif_dict = piexif.load(self._image.info["exif"])
+                elif self._content is not None:
+                    self._exif_dict = piexif.load(self._content)
                 else:
                     self._exif_dict = piexif.load(str(self._path))
             except Exception:
@@ -65,24 +119,11 @@ class Picture(iPicture):
     def _extract_date_time(
         self, raw_date_time: str, current_timezone: timezone
     ) -> datetime:
-        try:
-            raw_date_and_time = raw_date_time.split(" ")
-            raw_date_elements = raw_date_and_time[0].split(":")
-
-            raw_time_elements = raw_date_and_time[1].split(":")
-
-            return datetime(
-                int(raw_date_elements[0]),
-                int(raw_date_elements[1]),
-                int(raw_date_elements[2]),
-                int(raw_time_elements[0]),
-                int(raw_time_elements[1]),
-                int(raw_time_elements[2]),
-                0,
-                current_timezone,
-            )
-        except Exception:
-            raise ExifMalformedDateTime(self._path)
+        return extract_exif_date_time(
+            raw_date_time=raw_date_time,
+            current_timezone=current_timezone,
+            path=self._path,
+        )
 
     def get_exif_creation_time(self) -> datetime:
         try:
@@ -98,8 +139,53 @@ class Picture(iPicture):
         except KeyError:
             return DEFAULT_DATETIME
 
+    def _draft_for_hash(self) -> None:
+        if self._fast_hash:
+            # Ask the JPEG decoder for a DCT scaled (up to 1/8) grayscale draft
+            # instead of decoding the full size picture, no-op for other formats
+            self._image.draft("L", (PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE))
+
     def get_hash(self) -> str:
         try:
+            self._draft_for_hash()
+
             return str(imagehash.phash(self._image))
         except Exception:
             raise HasherException(str(self._path))
+
+    def get_hash_pixels(self) -> np.ndarray:
+        """32x32 grayscale pixels, as shrunk by imagehash.phash"""
+        try:
+            self._draft_for_hash()
+
+            return np.asarray(
+                self._image.convert("L").resize(
+                    (PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE), Image.Resampling.LANCZOS
+                )
+            )
+        except Exception:
+            raise HasherException(str(self._path))
+
+
+def get_hash_batch(pixels_list: list[np.ndarray]) -> list[str]:
+    """Same hex strings as imagehash.phash, from get_hash_pixels arrays"""
+    if len(pixels_list) == 0:
+        return []
+
+    # Checked before stacking, arrays of different shapes cannot be stacked
+    for pixels_array in pixels_list:
+        if pixels_array.shape != (PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE):
+            raise HasherException(f"Unexpected pixels shape {pixels_array.shape}")
+
+    pixels = np.stack(pixels_list)
+
+    dct = scipy.fftpack.dct(scipy.fftpack.dct(pixels, axis=1), axis=2)
+    dct_low_frequencies = dct[:, :PHASH_HASH_SIZE, :PHASH_HASH_SIZE].reshape(
+        len(pixels_list), PHASH_HASH_SIZE * PHASH_HASH_SIZE
+    )
+    medians = np.median(dct_low_frequencies, axis=1, keepdims=True)
+
+    # Bits are packed most significant first, as imagehash does
+    hash_bytes = np.packbits(dct_low_frequencies > medians, axis=1)
+
+    return [row.tobytes().hex() for row in hash_bytes]
@@ -1,7 +1,41 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from enum import Enum
 import json
+import os
 from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Union
+
+
+class FileStat(NamedTuple):
+    """Identifies the content of a file without reading it"""
+
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @staticmethod
+    def from_path(path: Path) -> "FileStat":
+        return FileStat.from_stat_result(os.stat(path))
+
+    @staticmethod
+    def from_stat_result(stat: os.stat_result) -> "FileStat":
+        return FileStat(size=stat.st_size, mtime_ns=stat.st_mtime_ns, inode=stat.st_ino)
+
+
+class PictureFile(NamedTuple):
+    """Content of a picture file, with its stat taken before reading it"""
+
+    content: bytes
+    file_stat: FileStat
+
+    @staticmethod
+    def read(path: Path) -> "PictureFile":
+        with open(path, "rb") as file:
+            file_stat = FileStat.from_stat_result(os.fstat(file.fileno()))
+            content = file.read()
+
+        return PictureFile(content=content, file_stat=file_stat)
 
 
 class iPictureData(ABC):
@@ -17,12 +51,32 @@ class iPictureData(ABC):
     def get_hash(self) -> str:
         pass
 
+    @abstractmethod
+    def get_file_stat(self) -> Union[FileStat, None]:
+        """Stat of the file when the data was computed, None if unknown"""
+        pass
+
+
+class PictureDataField(Enum):
+    CREATION_DATE = "creation_date"
+    HASH = "hash"
+
+
+ALL_PICTURE_DATA_FIELDS = (PictureDataField.CREATION_DATE, PictureDataField.HASH)
+
 
 class PictureData(iPictureData):
-    def __init__(self, path: Path, creation_date: datetime, hash: str) -> None:
+    def __init__(
+        self,
+        path: Path,
+        creation_date: datetime,
+        hash: str,
+        file_stat: Union[FileStat, None] = None,
+    ) -> None:
         self._path = path
         self._creation_date = creation_date
         self._hash = hash
+        self._file_stat = file_stat
 
     def get_path(self) -> Path:
         return self._path
@@ -33,21 +87,86 @@ class PictureData(iPictureData):
     def get_hash(self) -> str:
         return self._hash
 
+    def get_file_stat(self) -> Union[FileStat, None]:
+        return self._file_stat
+
     @staticmethod
     def from_json(json_data: str) -> iPictureData:
         data = json.loads(json_data)
+
+        file_stat = None
+        if "size" in data:
+            file_stat = FileStat(
+                size=data["size"], mtime_ns=data["mtime_ns"], inode=data["inode"]
+            )
+
         return PictureData(
             path=Path(data["path"]),
             creation_date=datetime.fromisoformat(data["creation_date"]),
             hash=data["hash"],
+            file_stat=file_stat,
         )
 
     @staticmethod
     def to_json(data: iPictureData) -> str:
-        return json.dumps(
-            {
-                "path": str(data.get_path()),
-                "creation_date": data.get_creation_date().isoformat(),
-                "hash": data.get_hash(),
-            }
+        json_data = {
+            "path": str(data.get_path()),
+            "creation_date": data.get_creation_date().isoformat(),
+            "hash": data.get_hash(),
+        }
+
+        file_stat = data.get_file_stat()
+        if file_stat is not None:
+            json_data.update(file_stat._asdict())
+
+        return json.dumps(json_data)
+
+
+class LazyPictureData(iPictureData):
+    """Computes each field on first access and keeps it"""
+
+    def __init__(
+        self,
+        path: Path,
+        creation_date_loader: Callable[[], datetime],
+        hash_loader: Callable[[], str],
+        file_stat: Union[FileStat, None] = None,
+    ) -> None:
+        self._path = path
+        self._creation_date_loader: Union[Callable[[], datetime], None] = (
+            creation_date_loader
         )
+        self._hash_loader: Union[Callable[[], str], None] = hash_loader
+        self._file_stat = file_stat
+
+    def get_path(self) -> Path:
+        return self._path
+
+    def get_creation_date(self) -> datetime:
+        if not hasattr(self, "_creation_date"):
+            creation_date_loader = self._creation_date_loader
+            assert creation_date_loader is not None
+            self._creation_date = creation_date_loader()
+            # Loaders may hold the file content, it is released once loaded
+            self._creation_date_loader = None
+
+        return self._creation_date
+
+    def get_hash(self) -> str:
+        if not hasattr(self, "_hash"):
+            hash_loader = self._hash_loader
+            assert hash_loader is not None
+            self._hash = hash_loader()
+            self._hash_loader = None
+
+        return self._hash
+
+    def get_file_stat(self) -> Union[FileStat, None]:
+        return self._file_stat
+
+    def load(self, fields: Iterable[PictureDataField]) -> None:
+        for field in fields:
+            if field == PictureDataField.CREATION_DATE:
+                self.get_creation_date()
+            elif field == PictureDataField.HASH:
+                self.get_hash()
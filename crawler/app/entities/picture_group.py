@@ -1,10 +1,15 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 import logging
 from pathlib import Path
+from typing import Iterable, NamedTuple, Union
 from app.entities.picture_data import iPictureData
-from app.repositories.picture_data import iPictureDataRepository
+from app.entities.picture_table import PictureTable
+from app.repositories.folder_name_index import iFolderNameIndexRepository
 import re
 
+import numpy as np
+
 
 class PictureGroupException(Exception):
     pass
@@ -18,6 +23,26 @@ class NotEditableGroupException(PictureGroupException):
     pass
 
 
+class EventFolder(NamedTuple):
+    """Time interval covered by the pictures of an existing event folder"""
+
+    folder_path: Path
+    min_timestamp: int
+    max_timestamp: int
+    picture_count: int
+
+
+class GroupSummary(NamedTuple):
+    """Everything the target folder and editability depend on, one pass over the
+    pictures"""
+
+    first_path: Path
+    first_creation_date: datetime
+    min_creation_date: datetime
+    max_creation_date: datetime
+    folder_count: dict[Path, int]
+
+
 class iPictureGroup(ABC):
     @abstractmethod
     def get_folder_path(self) -> Path:
@@ -29,7 +54,7 @@ class iPictureGroup(ABC):
 
     @abstractmethod
     def get_new_folder_name(
-        self, picture_repository: iPictureDataRepository, verbose: bool
+        self, folder_name_index: iFolderNameIndexRepository, verbose: bool
     ) -> Path:
         pass
 
@@ -40,27 +65,83 @@ class iPictureGroup(ABC):
 
 MIN_GROUP_SIZE = 10
 
+# Name given to the event folders created by group, until they are renamed
+EVENT_DESCRIPTION_FOLDER_PATTERN = re.compile(
+    r"^\d{4}-\d{2}-\d{2} <EVENT_DESCRIPTION>$"
+)
+
 
 class PictureGroup(iPictureGroup):
-    def _count_pictures_per_folder(
-        self, picture_list: list[iPictureData]
-    ) -> dict[Path, int]:
+    # Computed on first use, a full regroup creates a lot of groups
+    _summary: Union[GroupSummary, None]
+    _folder_list: Union[list[Path], None]
+    _editable: Union[bool, None]
+
+    def _get_picture_count(self) -> int:
+        return len(self._picture_list)
+
+    def _compute_summary(self) -> GroupSummary:
+        first_picture = self._picture_list[0]
+        min_creation_date = first_picture.get_creation_date()
+        max_creation_date = min_creation_date
         folder_count: dict[Path, int] = {}
 
-        for picture in picture_list:
+        for picture in self._picture_list:
+            creation_date = picture.get_creation_date()
+            min_creation_date = min(min_creation_date, creation_date)
+            max_creation_date = max(max_creation_date, creation_date)
+
             folder_path = picture.get_path().parent
-            folder_name = folder_path.name
+            folder_count[folder_path] = folder_count.get(folder_path, 0) + 1
+
+        return GroupSummary(
+            first_path=first_picture.get_path(),
+            first_creation_date=first_picture.get_creation_date(),
+            min_creation_date=min_creation_date,
+            max_creation_date=max_creation_date,
+            folder_count=folder_count,
+        )
 
-            if (
-                folder_name != "NOT_GROUPED"
-                and folder_name != self._get_other_folder_name()
-            ):
-                if folder_path not in folder_count:
-                    folder_count[folder_path] = 0
+    def get_summary(self) -> GroupSummary:
+        if self._summary is None:
+            self._summary = self._compute_summary()
+
+        return self._summary
+
+    def _get_first_path(self) -> Path:
+        return self.get_summary().first_path
+
+    def _get_first_creation_date(self) -> datetime:
+        return self.get_summary().first_creation_date
+
+    def _get_min_creation_date(self) -> datetime:
+        return self.get_summary().min_creation_date
+
+    def _get_paths(self) -> Iterable[Path]:
+        return (picture.get_path() for picture in self._picture_list)
+
+    def _get_hashes(self) -> Iterable[str]:
+        return (picture.get_hash() for picture in self._picture_list)
+
+    def _count_pictures_per_folder_path(self) -> dict[Path, int]:
+        """Number of pictures per folder, in order of first appearance"""
+        return self.get_summary().folder_count
+
+    def _log_pictures(self) -> None:
+        for picture in self._picture_list:
+            self._logger.debug(
+                f"Picture {picture.get_path()} created on {picture.get_creation_date()}"
+            )
 
-                folder_count[folder_path] += 1
+    def _count_pictures_per_folder(self) -> dict[Path, int]:
+        other_folder_name = self._get_other_folder_name()
 
-        return folder_count
+        return {
+            folder_path: count
+            for folder_path, count in self._count_pictures_per_folder_path().items()
+            if folder_path.name != "NOT_GROUPED"
+            and folder_path.name != other_folder_name
+        }
 
     def _get_ordered_folder_list(self, folder_count: dict[Path, int]) -> list[Path]:
         def picture_count(item) -> int:
@@ -73,24 +154,19 @@ class PictureGroup(iPictureGroup):
 
     def _add_not_grouped_folder(self, folder_list: list[Path]) -> list[Path]:
         if len(folder_list) == 0:
-            first_picture: iPictureData = self._picture_list[0]
-            root_folder = first_picture.get_path().parent.parent
+            root_folder = self._get_first_path().parent.parent
             folder_list = [
                 root_folder
-                / Path(
-                    f"{first_picture.get_creation_date().date()} <EVENT_DESCRIPTION>"
-                )
+                / Path(f"{self._get_first_creation_date().date()} <EVENT_DESCRIPTION>")
             ]
 
         return folder_list
 
     def _get_other_folder_name(self) -> str:
-        first_picture: iPictureData = self._picture_list[0]
-        return f"{first_picture.get_creation_date().date().year} OTHER"
+        return f"{self._get_first_creation_date().date().year} OTHER"
 
     def _get_too_small_group_folder_name(self) -> list[Path]:
-        first_picture: iPictureData = self._picture_list[0]
-        root_folder = first_picture.get_path().parent.parent
+        root_folder = self._get_first_path().parent.parent
         return [root_folder / Path(self._get_other_folder_name())]
 
     def __init__(
@@ -98,23 +174,32 @@ class PictureGroup(iPictureGroup):
     ) -> None:
         self._picture_list = picture_list
 
+        self._init_group(min_group_size=min_group_size)
+
+    def _init_group(self, min_group_size: int) -> None:
         self._min_group_size = min_group_size
 
         self._logger = logging.getLogger("app.picture_group_entity")
 
         self._logger.debug(f"Minimum group size {self._min_group_size}")
 
-        if len(self._picture_list) == 0:
+        if self._get_picture_count() == 0:
             raise Exception("A group must contain at least one picture path")
 
-        if len(self._picture_list) >= self._min_group_size:
+        self._summary = None
+        self._folder_list = None
+        self._editable = None
+
+    def _get_folder_list(self) -> list[Path]:
+        if self._folder_list is not None:
+            return self._folder_list
+
+        if self._get_picture_count() >= self._min_group_size:
             # The group is large enough, so we can proceed with the grouping
-            self._logger.debug(f"Size is OK {len(self._picture_list)} pictures")
+            self._logger.debug(f"Size is OK {self._get_picture_count()} pictures")
 
             # Count the number of pictures in each folder (excluding "NOT_GROUPED")
-            self._picture_path_count = self._count_pictures_per_folder(
-                self._picture_list
-            )
+            self._picture_path_count = self._count_pictures_per_folder()
 
             # Sort the folders by the number of pictures in descending order
             self._folder_list = self._get_ordered_folder_list(self._picture_path_count)
@@ -123,7 +208,7 @@ class PictureGroup(iPictureGroup):
             self._folder_list = self._add_not_grouped_folder(self._folder_list)
         else:
             self._logger.debug(
-                f"Group too small, only {len(self._picture_list)} pictures"
+                f"Group too small, only {self._get_picture_count()} pictures"
             )
 
             # The group is too small all pictures shall go to <YEAR> OTHER folder
@@ -133,54 +218,34 @@ class PictureGroup(iPictureGroup):
             f"PictureGroup initialized target path is ${self._folder_list[0]}"
         )
 
-        for picture in self._picture_list:
-            self._logger.debug(
-                f"Picture {picture.get_path()} created on {picture.get_creation_date()}"
-            )
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._log_pictures()
+
+        return self._folder_list
 
     def get_picture_list(self) -> list[iPictureData]:
         return self._picture_list
 
     def get_folder_path(self) -> Path:
-        return self._folder_list[0]
+        return self._get_folder_list()[0]
 
     def list_pictures_to_move(self) -> list[tuple[Path, Path]]:
+        folder_path = self.get_folder_path()
         output: list[tuple[Path, Path]] = []
 
-        for picture in self._picture_list:
-            if self.get_folder_path() != picture.get_path().parent:
-                origin_path = picture.get_path()
-                target_path = self.get_folder_path() / picture.get_path().name
-
-                output.append((origin_path, target_path))
+        for path in self._get_paths():
+            if folder_path != path.parent:
+                output.append((path, folder_path / path.name))
 
         return output
 
-    def _remove_date_from_name(self, folder_name: str) -> str:
-        pattern = re.compile(r"\d{4}-\d{2}")
-        match = re.match(pattern, folder_name)
-
-        if match is not None:
-            return re.sub(pattern, "", folder_name).strip()
-        else:
-            return folder_name
-
     def _get_folder_name_with_date(self, folder_name: str) -> str:
-        min_date = min(picture.get_creation_date() for picture in self._picture_list)
+        min_date = self._get_min_creation_date()
 
         return f"{min_date.date()} {folder_name}".strip()
 
-    def _is_raw_camera_folder(self, folder_name: str) -> bool:
-        strings_to_exclude = ["CANON", "FUJI", "APPLE"]
-
-        for string in strings_to_exclude:
-            if string in folder_name:
-                return True
-
-        return False
-
     def get_new_folder_name(
-        self, picture_repository: iPictureDataRepository, verbose=False
+        self, folder_name_index: iFolderNameIndexRepository, verbose=False
     ) -> Path:
         if not self.is_editable():
             raise NotEditableGroupException("This group is not editable")
@@ -190,32 +255,21 @@ class PictureGroup(iPictureGroup):
         if verbose:
             self._logger.info("get_new_folder_name VERBOSE MODE ENABLED")
 
-        for picture in self._picture_list:
-            folder_name_list = picture_repository.get_parents_folder_list(
-                picture.get_hash()
+        for picture_hash in self._get_hashes():
+            # Camera folders and dates are removed when the index is built
+            hash_folder_name_count = folder_name_index.get_folder_name_count(
+                picture_hash
             )
 
-            if verbose:
-                for folder_name in folder_name_list:
+            for folder_name, count in hash_folder_name_count.items():
+                if verbose:
                     self._logger.debug(
-                        f"Folder : {folder_name} for hash {picture.get_hash()}"
+                        f"Folder : {folder_name} for hash {picture_hash}"
                     )
 
-            folder_name_whitout_camera_folder = [
-                folder
-                for folder in folder_name_list
-                if not self._is_raw_camera_folder(folder)
-            ]
-
-            clean_folder_name_list = [
-                self._remove_date_from_name(folder_name)
-                for folder_name in folder_name_whitout_camera_folder
-            ]
-
-            for folder_name in clean_folder_name_list:
                 if folder_name not in folder_name_count:
                     folder_name_count[folder_name] = 0
-                folder_name_count[folder_name] += 1
+                folder_name_count[folder_name] += count
 
         if len(folder_name_count) == 0:
             return self.get_folder_path()
@@ -231,21 +285,127 @@ class PictureGroup(iPictureGroup):
 
         new_folder_name_with_date = self._get_folder_name_with_date(new_folder_name)
 
-        return self._picture_list[0].get_path().parent.parent / Path(
-            new_folder_name_with_date
-        )
+        return self._get_first_path().parent.parent / Path(new_folder_name_with_date)
 
     def is_editable(self) -> bool:
-        folder_name_set: set[str] = {self._picture_list[0].get_path().parent.name}
+        if self._editable is None:
+            self._editable = self._is_editable()
 
-        for picture in self._picture_list:
-            folder_name_set.add(picture.get_path().parent.name)
+        return self._editable
+
+    def _is_editable(self) -> bool:
+        folder_name_set: set[str] = {
+            folder_path.name for folder_path in self._count_pictures_per_folder_path()
+        }
 
         if len(folder_name_set) > 1:
             raise NotUniqueFolderException(
                 f"This group contains more than one folder {folder_name_set}"
             )
 
-        pattern = re.compile(r"^\d{4}-\d{2}-\d{2} <EVENT_DESCRIPTION>$")
+        return (
+            re.match(EVENT_DESCRIPTION_FOLDER_PATTERN, list(folder_name_set)[0])
+            is not None
+        )
+
+
+class TablePictureGroup(PictureGroup):
+    """Group of PictureTable rows, pictures are only materialized when listed"""
+
+    def __init__(
+        self,
+        picture_table: PictureTable,
+        indices: np.ndarray,
+        min_group_size: int = MIN_GROUP_SIZE,
+    ) -> None:
+        self._picture_table = picture_table
+        self._indices = indices
+
+        self._init_group(min_group_size=min_group_size)
+
+    def _get_picture_count(self) -> int:
+        return len(self._indices)
+
+    def _compute_summary(self) -> GroupSummary:
+        first_index = int(self._indices[0])
+        timestamps = self._picture_table.get_timestamps()[self._indices]
+
+        return GroupSummary(
+            first_path=self._picture_table.get_path(first_index),
+            first_creation_date=self._picture_table.get_creation_date(first_index),
+            min_creation_date=self._picture_table.timestamp_to_datetime(
+                int(timestamps.min())
+            ),
+            max_creation_date=self._picture_table.timestamp_to_datetime(
+                int(timestamps.max())
+            ),
+            folder_count=self._count_folder_ids(),
+        )
+
+    def _get_paths(self) -> Iterable[Path]:
+        return (self._picture_table.get_path(int(index)) for index in self._indices)
+
+    def _get_hashes(self) -> Iterable[str]:
+        return (self._picture_table.get_hash(int(index)) for index in self._indices)
+
+    def _count_folder_ids(self) -> dict[Path, int]:
+        folder_ids = self._picture_table.get_folder_ids()[self._indices]
+        unique_folder_ids, first_positions, counts = np.unique(
+            folder_ids, return_index=True, return_counts=True
+        )
+        folders = self._picture_table.get_folders()
+
+        return {
+            folders[unique_folder_ids[position]]: int(counts[position])
+            for position in np.argsort(first_positions)
+        }
 
-        return re.match(pattern, list(folder_name_set)[0]) is not None
+    def _log_pictures(self) -> None:
+        self._logger.debug(
+            f"{self._get_picture_count()} pictures from "
+            f"{self._get_min_creation_date()}"
+        )
+
+    def get_picture_list(self) -> list[iPictureData]:
+        return [
+            self._picture_table.get_picture_data(int(index)) for index in self._indices
+        ]
+
+    def list_pictures_to_move(self) -> list[tuple[Path, Path]]:
+        folder_path = self.get_folder_path()
+        folder_id = self._picture_table.get_folder_id(folder_path)
+        indices = self._indices
+
+        # Paths are only built for the pictures not already in the folder
+        if folder_id is not None:
+            indices = indices[
+                self._picture_table.get_folder_ids()[indices] != folder_id
+            ]
+
+        output: list[tuple[Path, Path]] = []
+
+        for index in indices:
+            path = self._picture_table.get_path(int(index))
+            output.append((path, folder_path / path.name))
+
+        return output
+
+
+class EventPictureGroup(TablePictureGroup):
+    """New pictures joining an existing event folder"""
+
+    def __init__(
+        self, picture_table: PictureTable, indices: np.ndarray, event: EventFolder
+    ) -> None:
+        self._event = event
+
+        super().__init__(picture_table=picture_table, indices=indices)
+
+    def get_event(self) -> EventFolder:
+        return self._event
+
+    def get_folder_path(self) -> Path:
+        return self._event.folder_path
+
+    def is_editable(self) -> bool:
+        return False
@@ -0,0 +1,194 @@
+from array import array
+from datetime import datetime, timezone
+import os
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from app.entities.picture_data import iPictureData, PictureData
+
+# Perceptual hashes are 64 bits, written as 16 hexadecimal characters
+HASH_HEX_LENGTH = 16
+
+
+class PictureTableException(Exception):
+    pass
+
+
+def hash_to_int(picture_hash: str) -> int:
+    if len(picture_hash) != HASH_HEX_LENGTH:
+        raise PictureTableException(f"Hash {picture_hash} is not a 64 bits hash")
+
+    try:
+        return int(picture_hash, 16)
+    except ValueError:
+        raise PictureTableException(f"Hash {picture_hash} is not hexadecimal")
+
+
+def int_to_hash(picture_hash: int) -> str:
+    return f"{picture_hash:0{HASH_HEX_LENGTH}x}"
+
+
+class PictureTable:
+    """Pictures stored column by column, with interned folder and file name ids"""
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        hashes: np.ndarray,
+        hash_known: np.ndarray,
+        folder_ids: np.ndarray,
+        name_ids: np.ndarray,
+        folders: list[Path],
+        names: list[str],
+        current_timezone: timezone = timezone.utc,
+    ) -> None:
+        self._timestamps = timestamps
+        self._hashes = hashes
+        self._hash_known = hash_known
+        self._folder_ids = folder_ids
+        self._name_ids = name_ids
+        self._folders = folders
+        self._names = names
+        self._current_timezone = current_timezone
+
+        self._unique_hashes: Union[np.ndarray, None] = None
+        self._folder_id_map: Union[dict[Path, int], None] = None
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def get_timestamps(self) -> np.ndarray:
+        return self._timestamps
+
+    def get_hashes(self) -> np.ndarray:
+        return self._hashes
+
+    def get_folder_ids(self) -> np.ndarray:
+        return self._folder_ids
+
+    def get_folders(self) -> list[Path]:
+        return self._folders
+
+    def get_folder_id(self, folder_path: Path) -> Union[int, None]:
+        """None if no picture of the table is in the folder"""
+        if self._folder_id_map is None:
+            self._folder_id_map = {
+                folder: folder_id for folder_id, folder in enumerate(self._folders)
+            }
+
+        return self._folder_id_map.get(folder_path)
+
+    def get_timezone(self) -> timezone:
+        return self._current_timezone
+
+    def get_folder(self, index: int) -> Path:
+        return self._folders[self._folder_ids[index]]
+
+    def get_path(self, index: int) -> Path:
+        return self.get_folder(index) / self._names[self._name_ids[index]]
+
+    def get_creation_date(self, index: int) -> datetime:
+        return self.timestamp_to_datetime(int(self._timestamps[index]))
+
+    def get_hash(self, index: int) -> str:
+        if not self._hash_known[index]:
+            raise PictureTableException(f"No hash for {self.get_path(index)}")
+
+        return int_to_hash(int(self._hashes[index]))
+
+    def get_picture_data(self, index: int) -> iPictureData:
+        return PictureData(
+            path=self.get_path(index),
+            creation_date=self.get_creation_date(index),
+            hash=self.get_hash(index),
+        )
+
+    def timestamp_to_datetime(self, timestamp: int) -> datetime:
+        return datetime.fromtimestamp(timestamp, tz=self._current_timezone)
+
+    def get_unique_hashes(self) -> np.ndarray:
+        """Sorted known hashes, computed on first call"""
+        if self._unique_hashes is None:
+            self._unique_hashes = np.unique(self._hashes[self._hash_known])
+
+        return self._unique_hashes
+
+    def contains_hash(self, picture_hash: str) -> bool:
+        try:
+            value = np.uint64(hash_to_int(picture_hash))
+        except PictureTableException:
+            # Such a hash cannot be stored in the table
+            return False
+
+        unique_hashes = self.get_unique_hashes()
+        position = np.searchsorted(unique_hashes, value)
+
+        return bool(position < len(unique_hashes) and unique_hashes[position] == value)
+
+
+class PictureTableBuilder:
+    def __init__(self, current_timezone: timezone = timezone.utc) -> None:
+        self._current_timezone = current_timezone
+
+        # Typed buffers, rows are not kept as Python objects while building
+        self._timestamps = array("q")
+        self._hashes = array("Q")
+        self._hash_known = array("B")
+        self._folder_ids = array("i")
+        self._name_ids = array("i")
+
+        self._folder_id_map: dict[str, int] = {}
+        self._folders: list[Path] = []
+        self._name_id_map: dict[str, int] = {}
+        self._names: list[str] = []
+
+    def _intern_folder(self, folder: str) -> int:
+        folder_id = self._folder_id_map.get(folder)
+
+        if folder_id is None:
+            folder_id = len(self._folders)
+            self._folder_id_map[folder] = folder_id
+            self._folders.append(Path(folder))
+
+        return folder_id
+
+    def _intern_name(self, name: str) -> int:
+        name_id = self._name_id_map.get(name)
+
+        if name_id is None:
+            name_id = len(self._names)
+            self._name_id_map[name] = name_id
+            self._names.append(name)
+
+        return name_id
+
+    def add(self, path: Path, timestamp: int, picture_hash: Union[int, None]) -> None:
+        self._timestamps.append(timestamp)
+        self._hashes.append(0 if picture_hash is None else picture_hash)
+        self._hash_known.append(picture_hash is not None)
+
+        # Splitting the string is much faster than Path.parent and Path.name
+        folder, name = os.path.split(path)
+        self._folder_ids.append(self._intern_folder(folder))
+        self._name_ids.append(self._intern_name(name))
+
+    def add_picture_data(self, data: iPictureData, with_hash: bool = True) -> None:
+        self.add(
+            path=data.get_path(),
+            timestamp=int(data.get_creation_date().timestamp()),
+            picture_hash=hash_to_int(data.get_hash()) if with_hash else None,
+        )
+
+    def build(self) -> PictureTable:
+        return PictureTable(
+            timestamps=np.array(self._timestamps, dtype=np.int64),
+            hashes=np.array(self._hashes, dtype=np.uint64),
+            hash_known=np.array(self._hash_known, dtype=bool),
+            folder_ids=np.array(self._folder_ids, dtype=np.int32),
+            name_ids=np.array(self._name_ids, dtype=np.int32),
+            folders=self._folders,
+            names=self._names,
+            current_timezone=self._current_timezone,
+        )
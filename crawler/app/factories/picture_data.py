@@ -1,10 +1,34 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
+import logging
+import os
 from pathlib import Path
 import re
+from typing import Iterable, Union
 
-from app.entities.picture_data import PictureData, iPictureData
-from app.entities.picture import Picture
+from app.entities.picture_data import (
+    ALL_PICTURE_DATA_FIELDS,
+    FileStat,
+    LazyPictureData,
+    PictureData,
+    PictureDataField,
+    PictureFile,
+    iPictureData,
+)
+from app.entities.picture import (
+    DEFAULT_DATETIME,
+    MalformedImageFileException,
+    Picture,
+    extract_exif_date_time,
+)
+from app.entities.picture_table import (
+    HASH_HEX_LENGTH,
+    PictureTableBuilder,
+)
+from app.tools.exif import ExifHeaderException, ExifHeaderReader
+
+# <creation timestamp>-<hash>.jpg, as written by backup
+STANDARD_FILE_NAME_PATTERN = re.compile(r"^([0-9]{1,10})-([a-f0-9]+).jpg$")
 
 
 class NotStandardFileNameException(Exception):
@@ -19,16 +43,52 @@ class iPictureDataFactory(ABC):
         pass
 
     @abstractmethod
-    def compute_data(self, path: Path, current_timezone: timezone) -> iPictureData:
+    def add_standard_paths_to_table(
+        self, table_builder: PictureTableBuilder, path_list: Iterable[Path]
+    ) -> list[Path]:
+        """Adds pictures with a standard file name, returns the other paths"""
+        pass
+
+    @abstractmethod
+    def read_picture_file(self, path: Path) -> PictureFile:
+        pass
+
+    @abstractmethod
+    def compute_data(
+        self,
+        path: Path,
+        current_timezone: timezone,
+        fields: Iterable[PictureDataField] = ALL_PICTURE_DATA_FIELDS,
+        picture_file: Union[PictureFile, None] = None,
+    ) -> iPictureData:
+        """Computes fields right away, the other ones on first access. The file is
+        not read again when picture_file is given"""
+        pass
+
+    @abstractmethod
+    def compute_creation_date(
+        self,
+        path: Path,
+        current_timezone: timezone,
+        content: Union[bytes, None] = None,
+    ) -> datetime:
+        pass
+
+    @abstractmethod
+    def compute_hash(self, path: Path, content: Union[bytes, None] = None) -> str:
         pass
 
 
 class PictureDataFactory(iPictureDataFactory):
+    def __init__(self, fast_hash: bool = False) -> None:
+        self._fast_hash = fast_hash
+        self._exif_header_reader = ExifHeaderReader()
+        self._logger = logging.getLogger("app.picture_data_factory")
+
     def from_standard_path(
         self, path: Path, current_timezone: timezone
     ) -> iPictureData:
-        pattern = re.compile(r"^([0-9]{1,10})-([a-f0-9]+).jpg$")
-        m = re.match(pattern, path.name)
+        m = re.match(STANDARD_FILE_NAME_PATTERN, path.name)
 
         if m is None:
             raise NotStandardFileNameException(f"File name {path.name} is malformed")
@@ -44,11 +104,94 @@ class PictureDataFactory(iPictureDataFactory):
             hash=hash_value,
         )
 
-    def compute_data(self, path: Path, current_timezone: timezone) -> iPictureData:
-        picture = Picture(path=path, current_timezone=current_timezone)
+    def add_standard_paths_to_table(
+        self, table_builder: PictureTableBuilder, path_list: Iterable[Path]
+    ) -> list[Path]:
+        not_standard_path_list: list[Path] = []
 
-        return PictureData(
+        for path in path_list:
+            m = STANDARD_FILE_NAME_PATTERN.match(os.path.basename(path))
+
+            # Hashes that do not fit in 64 bits cannot be stored in the table
+            if m is None or len(m.group(2)) != HASH_HEX_LENGTH:
+                not_standard_path_list.append(path)
+                continue
+
+            table_builder.add(
+                path=path,
+                timestamp=int(m.group(1)),
+                picture_hash=int(m.group(2), 16),
+            )
+
+        return not_standard_path_list
+
+    def read_picture_file(self, path: Path) -> PictureFile:
+        try:
+            return PictureFile.read(path)
+        except OSError:
+            raise MalformedImageFileException(str(path))
+
+    def compute_data(
+        self,
+        path: Path,
+        current_timezone: timezone,
+        fields: Iterable[PictureDataField] = ALL_PICTURE_DATA_FIELDS,
+        picture_file: Union[PictureFile, None] = None,
+    ) -> iPictureData:
+        content = None if picture_file is None else picture_file.content
+
+        def load_creation_date() -> datetime:
+            return self.compute_creation_date(
+                path=path, current_timezone=current_timezone, content=content
+            )
+
+        def load_hash() -> str:
+            return self.compute_hash(path=path, content=content)
+
+        if picture_file is not None:
+            file_stat = picture_file.file_stat
+        else:
+            try:
+                # Taken before reading the file, a change while computing is detected
+                file_stat = FileStat.from_path(path)
+            except OSError:
+                raise MalformedImageFileException(str(path))
+
+        picture_data = LazyPictureData(
             path=path,
-            creation_date=picture.get_exif_creation_time(),
-            hash=picture.get_hash(),
+            creation_date_loader=load_creation_date,
+            hash_loader=load_hash,
+            file_stat=file_stat,
         )
+        picture_data.load(fields)
+
+        return picture_data
+
+    def compute_creation_date(
+        self,
+        path: Path,
+        current_timezone: timezone,
+        content: Union[bytes, None] = None,
+    ) -> datetime:
+        try:
+            # Only reads the JPEG header, without opening the image through Pillow
+            date_tags = self._exif_header_reader.read_date_tags(path, content=content)
+        except ExifHeaderException as e:
+            self._logger.debug(f"Falling back to full EXIF loading for {path}: {e}")
+            picture = Picture(
+                path=path, current_timezone=current_timezone, content=content
+            )
+
+            return picture.get_exif_creation_time()
+
+        if date_tags.date_time_original is None:
+            return DEFAULT_DATETIME
+
+        return extract_exif_date_time(
+            raw_date_time=date_tags.date_time_original,
+            current_timezone=current_timezone,
+            path=path,
+        )
+
+    def compute_hash(self, path: Path, content: Union[bytes, None] = None) -> str:
+        return Picture(path=path, fast_hash=self._fast_hash, content=content).get_hash()
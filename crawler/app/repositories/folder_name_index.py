@@ -0,0 +1,242 @@
+from abc import ABC, abstractmethod
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import sqlite3
+from typing import Union
+
+from app.repositories.picture_data import (
+    CACHE_JSONL_FILE_NAME,
+    CACHE_SQLITE_FILE_NAME,
+    get_index_key,
+)
+from app.tools.file import write_file_atomically
+
+FOLDER_NAME_INDEX_FILE_NAME = "folder_name_index.json"
+FOLDER_NAME_INDEX_VERSION = 1
+
+# Folders created by the cameras say nothing about the event
+RAW_CAMERA_FOLDER_STRINGS = ["CANON", "FUJI", "APPLE"]
+
+DATE_PREFIX_PATTERN = re.compile(r"\d{4}-\d{2}")
+
+
+def is_raw_camera_folder(folder_name: str) -> bool:
+    for string in RAW_CAMERA_FOLDER_STRINGS:
+        if string in folder_name:
+            return True
+
+    return False
+
+
+def remove_date_from_name(folder_name: str) -> str:
+    if re.match(DATE_PREFIX_PATTERN, folder_name) is not None:
+        return re.sub(DATE_PREFIX_PATTERN, "", folder_name).strip()
+    else:
+        return folder_name
+
+
+def clean_folder_name(folder_name: str) -> Union[str, None]:
+    """Event name of a folder, None for camera folders"""
+    if is_raw_camera_folder(folder_name):
+        return None
+
+    return remove_date_from_name(folder_name)
+
+
+class FolderNameIndex:
+    """Cleaned folder names each picture hash has been recorded in"""
+
+    def __init__(self, counts: Union[dict[str, dict[str, int]], None] = None) -> None:
+        self._counts: dict[str, dict[str, int]] = {} if counts is None else counts
+
+    def add(self, picture_hash: str, folder_name: str) -> None:
+        clean_name = clean_folder_name(folder_name)
+
+        if clean_name is None:
+            return
+
+        folder_name_count = self._counts.setdefault(picture_hash, {})
+        folder_name_count[clean_name] = folder_name_count.get(clean_name, 0) + 1
+
+    def get_folder_name_count(self, picture_hash: str) -> dict[str, int]:
+        return self._counts.get(picture_hash, {})
+
+    def get_counts(self) -> dict[str, dict[str, int]]:
+        return self._counts
+
+
+class iFolderNameIndexRepository(ABC):
+    @abstractmethod
+    def get_folder_name_count(self, picture_hash: str) -> dict[str, int]:
+        """Cleaned folder names the picture was recorded in, with their counts"""
+        pass
+
+
+class FolderNameIndexRepository(iFolderNameIndexRepository):
+    """Index of cache.jsonl saved next to it, only the lines appended since the
+    last save are read"""
+
+    def __init__(self, cache_file_path: Path, index_file_path: Path) -> None:
+        self._cache_file_path = cache_file_path
+        self._index_file_path = index_file_path
+
+        self._logger = logging.getLogger("app.folder_name_index_repository")
+
+        self._index = FolderNameIndex()
+        self._open()
+
+    def _open(self) -> None:
+        try:
+            file = open(self._cache_file_path, "rb")
+        except FileNotFoundError:
+            self._logger.warning(f"Cache file {self._cache_file_path} not found")
+            return
+
+        with file:
+            inode = os.fstat(file.fileno()).st_ino
+            content = self._load(file, inode)
+
+            if content is None:
+                indexed_size = 0
+                last_line_offset = 0
+            else:
+                self._index = FolderNameIndex(content["hashes"])
+                indexed_size = content["indexed_size"]
+                last_line_offset = content["last_line_offset"]
+
+            new_indexed_size, last_line_offset = self._index_lines(
+                file, start=indexed_size, last_line_offset=last_line_offset
+            )
+
+            if content is None or new_indexed_size != indexed_size:
+                file.seek(last_line_offset)
+                last_line = file.read(new_indexed_size - last_line_offset)
+
+                self._save(
+                    inode=inode,
+                    indexed_size=new_indexed_size,
+                    last_line_offset=last_line_offset,
+                    last_line_key=get_index_key(last_line.decode("UTF-8")),
+                )
+
+    def _load(self, file, inode: int) -> Union[dict, None]:
+        try:
+            with open(self._index_file_path, "r") as index_file:
+                content = json.load(index_file)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            self._logger.warning(f"Ignoring unreadable {self._index_file_path}: {e}")
+            return None
+
+        if (
+            content.get("version") != FOLDER_NAME_INDEX_VERSION
+            or content["inode"] != inode
+        ):
+            self._logger.info(f"Index {self._index_file_path} is outdated")
+            return None
+
+        # Inodes are reused, the last indexed line must still be the same
+        file.seek(content["last_line_offset"])
+        last_line = file.read(content["indexed_size"] - content["last_line_offset"])
+
+        if get_index_key(last_line.decode("UTF-8")) != content["last_line_key"]:
+            self._logger.info(f"Index {self._index_file_path} is outdated")
+            return None
+
+        return content
+
+    def _index_lines(self, file, start: int, last_line_offset: int) -> tuple[int, int]:
+        """Indexes the lines after start, returns the end and the start of the last
+        complete line"""
+        file.seek(start)
+        position = start
+
+        for line in file:
+            if not line.endswith(b"\n"):
+                self._logger.warning(
+                    f"Ignoring incomplete last line of {self._cache_file_path}"
+                )
+                break
+
+            if len(line.strip()) > 0:
+                try:
+                    record = json.loads(line)
+                    self._index.add(
+                        picture_hash=record["hash"],
+                        folder_name=os.path.basename(os.path.dirname(record["path"])),
+                    )
+                except (ValueError, KeyError, TypeError) as e:
+                    # Left by an append after an incomplete line
+                    self._logger.warning(
+                        f"Ignoring unreadable line of {self._cache_file_path}: {e}"
+                    )
+
+            last_line_offset = position
+            position += len(line)
+
+        return position, last_line_offset
+
+    def _save(
+        self, inode: int, indexed_size: int, last_line_offset: int, last_line_key: int
+    ) -> None:
+        content = {
+            "version": FOLDER_NAME_INDEX_VERSION,
+            "inode": inode,
+            "indexed_size": indexed_size,
+            "last_line_offset": last_line_offset,
+            "last_line_key": last_line_key,
+            "hashes": self._index.get_counts(),
+        }
+
+        try:
+            write_file_atomically(
+                self._index_file_path,
+                lambda file: file.write(json.dumps(content).encode("UTF-8")),
+            )
+        except OSError as e:
+            # The index is rebuilt from cache.jsonl on the next run
+            self._logger.warning(f"Unable to write {self._index_file_path}: {e}")
+
+    def get_folder_name_count(self, picture_hash: str) -> dict[str, int]:
+        return self._index.get_folder_name_count(picture_hash)
+
+
+class SqliteFolderNameIndexRepository(iFolderNameIndexRepository):
+    """Built from the SQLite cache in one query, nothing else is saved"""
+
+    def __init__(self, database_path: Path) -> None:
+        self._index = FolderNameIndex()
+
+        connection = sqlite3.connect(database_path)
+
+        try:
+            for path, picture_hash in connection.execute(
+                "SELECT path, hash FROM picture_data"
+            ):
+                self._index.add(
+                    picture_hash=picture_hash,
+                    folder_name=os.path.basename(os.path.dirname(path)),
+                )
+        finally:
+            connection.close()
+
+    def get_folder_name_count(self, picture_hash: str) -> dict[str, int]:
+        return self._index.get_folder_name_count(picture_hash)
+
+
+def folder_name_index_repository_factory(
+    backup_folder_path: Path,
+) -> iFolderNameIndexRepository:
+    database_path = backup_folder_path / CACHE_SQLITE_FILE_NAME
+
+    if database_path.is_file():
+        return SqliteFolderNameIndexRepository(database_path=database_path)
+
+    return FolderNameIndexRepository(
+        cache_file_path=backup_folder_path / CACHE_JSONL_FILE_NAME,
+        index_file_path=backup_folder_path / FOLDER_NAME_INDEX_FILE_NAME,
+    )
@@ -0,0 +1,89 @@
+from abc import ABC, abstractmethod
+import json
+import logging
+from pathlib import Path
+from typing import NamedTuple
+
+from app.tools.file import write_file_atomically
+
+FOLDER_SNAPSHOT_FILE_NAME = "folder_snapshot.json"
+FOLDER_SNAPSHOT_VERSION = 2
+
+# Stored for folders that must be listed again on the next run
+UNKNOWN_MTIME_NS = -1
+
+# Folders modified this close to their listing may change again without their
+# mtime changing, FAT file systems store mtime with a 2 seconds resolution
+RACY_MTIME_WINDOW_NS = 2 * 10**9
+
+
+class SnapshotEntry(NamedTuple):
+    """Pictures and sub folders of a folder when its mtime was mtime_ns"""
+
+    mtime_ns: int
+    picture_name_list: list[str]
+    folder_name_list: list[str]
+
+
+class iFolderSnapshotRepository(ABC):
+    @abstractmethod
+    def load(self) -> dict[str, SnapshotEntry]:
+        """Snapshot entries by folder path relative to the snapshot root"""
+        pass
+
+    @abstractmethod
+    def save(self, snapshot_entries: dict[str, SnapshotEntry]) -> None:
+        pass
+
+
+class FolderSnapshotRepository(iFolderSnapshotRepository):
+    def __init__(self, snapshot_file_path: Path) -> None:
+        self._snapshot_file_path = snapshot_file_path
+
+        self._logger = logging.getLogger("app.folder_snapshot_repository")
+
+    def load(self) -> dict[str, SnapshotEntry]:
+        try:
+            with open(self._snapshot_file_path, "r") as file:
+                content = json.load(file)
+        except FileNotFoundError:
+            self._logger.info(f"Snapshot {self._snapshot_file_path} not found")
+            return {}
+        except ValueError as e:
+            self._logger.warning(f"Ignoring unreadable {self._snapshot_file_path}: {e}")
+            return {}
+
+        if content.get("version") != FOLDER_SNAPSHOT_VERSION:
+            self._logger.warning(f"Ignoring outdated {self._snapshot_file_path}")
+            return {}
+
+        return {
+            folder: SnapshotEntry(
+                mtime_ns=entry["mtime_ns"],
+                picture_name_list=entry["pictures"],
+                folder_name_list=entry["folders"],
+            )
+            for folder, entry in content["folders"].items()
+        }
+
+    def save(self, snapshot_entries: dict[str, SnapshotEntry]) -> None:
+        content = {
+            "version": FOLDER_SNAPSHOT_VERSION,
+            "folders": {
+                folder: {
+                    "mtime_ns": entry.mtime_ns,
+                    "pictures": entry.picture_name_list,
+                    "folders": entry.folder_name_list,
+                }
+                for folder, entry in snapshot_entries.items()
+            },
+        }
+
+        try:
+            write_file_atomically(
+                self._snapshot_file_path,
+                lambda file: file.write(json.dumps(content).encode("UTF-8")),
+            )
+        except OSError as e:
+            # The snapshot is rebuilt from the folders on the next run
+            self._logger.warning(f"Unable to write {self._snapshot_file_path}: {e}")
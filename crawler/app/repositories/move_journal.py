@@ -0,0 +1,152 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+import json
+import logging
+import os
+from pathlib import Path
+from typing import NamedTuple, TextIO, Union
+
+MOVE_JOURNAL_FILE_NAME = "move_journal.jsonl"
+
+
+class MoveJournalStatus(Enum):
+    PLANNED = "planned"
+    FINISHED = "finished"
+    UNDONE = "undone"
+
+
+class Move(NamedTuple):
+    origin_path: Path
+    target_path: Path
+
+
+class MoveJournal(NamedTuple):
+    move_list: list[Move]
+    done_index_set: set[int]
+    status: MoveJournalStatus
+    created_folder_list: list[Path]
+
+
+class iMoveJournalRepository(ABC):
+    @abstractmethod
+    def load(self) -> Union[MoveJournal, None]:
+        """Journal of the last run, None if there is none"""
+        pass
+
+    @abstractmethod
+    def start(self, move_list: list[Move]) -> None:
+        """Replaces the previous journal, the moves are on disk once it returns"""
+        pass
+
+    @abstractmethod
+    def record_done(self, move_index: int) -> None:
+        pass
+
+    @abstractmethod
+    def record_created_folder(self, folder_path: Path) -> None:
+        """On disk once it returns, before the folder is created"""
+        pass
+
+    @abstractmethod
+    def set_status(self, status: MoveJournalStatus) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class MoveJournalRepository(iMoveJournalRepository):
+    """Append only JSON lines file, a planned status line followed by a line per
+    move, then a line per move done, per folder created and per status change"""
+
+    def __init__(self, journal_file_path: Path) -> None:
+        self._journal_file_path = journal_file_path
+        self._file: Union[TextIO, None] = None
+
+        self._logger = logging.getLogger("app.move_journal_repository")
+
+    def _get_file(self) -> TextIO:
+        if self._file is None:
+            self._file = open(self._journal_file_path, "a")
+
+        return self._file
+
+    def _write_line(self, content: dict, sync: bool) -> None:
+        file = self._get_file()
+        file.write(json.dumps(content) + "\n")
+
+        if sync:
+            file.flush()
+            os.fsync(file.fileno())
+
+    def load(self) -> Union[MoveJournal, None]:
+        move_list: list[Move] = []
+        done_index_set: set[int] = set()
+        created_folder_list: list[Path] = []
+        status: Union[MoveJournalStatus, None] = None
+
+        try:
+            with open(self._journal_file_path, "r") as file:
+                for line in file:
+                    try:
+                        content = json.loads(line)
+                    except ValueError:
+                        # Last line of an interrupted run
+                        self._logger.warning(f"Ignoring journal line {line.strip()}")
+                        continue
+
+                    if "move" in content:
+                        move_list.append(
+                            Move(
+                                origin_path=Path(content["move"][0]),
+                                target_path=Path(content["move"][1]),
+                            )
+                        )
+                    elif "done" in content:
+                        done_index_set.add(content["done"])
+                    elif "created" in content:
+                        created_folder_list.append(Path(content["created"]))
+                    else:
+                        status = MoveJournalStatus(content["status"])
+        except FileNotFoundError:
+            return None
+
+        if status is None:
+            return None
+
+        return MoveJournal(
+            move_list=move_list,
+            done_index_set=done_index_set,
+            status=status,
+            created_folder_list=created_folder_list,
+        )
+
+    def start(self, move_list: list[Move]) -> None:
+        self.close()
+
+        with open(self._journal_file_path, "w") as file:
+            file.write(json.dumps({"status": MoveJournalStatus.PLANNED.value}) + "\n")
+            file.writelines(
+                json.dumps({"move": [str(move.origin_path), str(move.target_path)]})
+                + "\n"
+                for move in move_list
+            )
+            file.flush()
+            os.fsync(file.fileno())
+
+    def record_done(self, move_index: int) -> None:
+        # Not synced, a move done but not recorded is found again from the files
+        self._write_line({"done": move_index}, sync=False)
+
+    def record_created_folder(self, folder_path: Path) -> None:
+        # Synced, a folder created but not recorded would be left by undo
+        self._write_line({"created": str(folder_path)}, sync=True)
+
+    def set_status(self, status: MoveJournalStatus) -> None:
+        self._write_line({"status": status.value}, sync=True)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
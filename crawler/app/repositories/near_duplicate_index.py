@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+import logging
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from app.entities.near_duplicate_index import CHUNK_COUNT, NearDuplicateIndex
+from app.tools.file import write_file_atomically
+
+NEAR_DUPLICATE_INDEX_FILE_NAME = "near_duplicate_index.npz"
+NEAR_DUPLICATE_INDEX_VERSION = 1
+
+
+class iNearDuplicateIndexRepository(ABC):
+    @abstractmethod
+    def load(self, signature: str) -> Union[NearDuplicateIndex, None]:
+        """None unless the index was saved with the same signature"""
+        pass
+
+    @abstractmethod
+    def save(self, index: NearDuplicateIndex, signature: str) -> None:
+        pass
+
+
+class NearDuplicateIndexRepository(iNearDuplicateIndexRepository):
+    def __init__(self, index_file_path: Path) -> None:
+        self._index_file_path = index_file_path
+
+        self._logger = logging.getLogger("app.near_duplicate_index_repository")
+
+    def load(self, signature: str) -> Union[NearDuplicateIndex, None]:
+        try:
+            with np.load(self._index_file_path) as content:
+                version = int(content["version"])
+                saved_signature = str(content["signature"])
+                hashes = content["hashes"]
+                chunk_orders = content["chunk_orders"]
+        except FileNotFoundError:
+            self._logger.info(f"Index {self._index_file_path} not found")
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            self._logger.warning(f"Ignoring unreadable {self._index_file_path}: {e}")
+            return None
+
+        if version != NEAR_DUPLICATE_INDEX_VERSION or saved_signature != signature:
+            self._logger.info(f"Index {self._index_file_path} is outdated")
+            return None
+
+        if chunk_orders.shape != (CHUNK_COUNT, len(hashes)):
+            self._logger.warning(f"Ignoring malformed {self._index_file_path}")
+            return None
+
+        return NearDuplicateIndex(hashes=hashes, chunk_orders=chunk_orders)
+
+    def save(self, index: NearDuplicateIndex, signature: str) -> None:
+        if index.has_added_hashes():
+            index = index.rebuild()
+
+        try:
+            write_file_atomically(
+                self._index_file_path,
+                lambda file: np.savez(
+                    file,
+                    version=np.int64(NEAR_DUPLICATE_INDEX_VERSION),
+                    signature=np.str_(signature),
+                    hashes=index.get_hashes(),
+                    chunk_orders=index.get_chunk_orders(),
+                ),
+            )
+        except OSError as e:
+            # The index is built again on the next run
+            self._logger.warning(f"Unable to write {self._index_file_path}: {e}")
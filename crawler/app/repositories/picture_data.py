@@ -1,9 +1,20 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
+import hashlib
+import json
 import logging
+import mmap
+import os
 from pathlib import Path
-from typing import Union
+import sqlite3
+import struct
+import time
+from typing import BinaryIO, Union
 
-from app.entities.picture_data import iPictureData, PictureData
+import numpy as np
+
+from app.entities.picture_data import FileStat, iPictureData, PictureData
+from app.tools.file import write_file_atomically
 
 
 class iPictureDataRepository(ABC):
@@ -19,6 +30,150 @@ class iPictureDataRepository(ABC):
     def get_parents_folder_list(self, picture_hash: str) -> list[str]:
         pass
 
+    @abstractmethod
+    def flush(self) -> None:
+        """Persist recorded data that may still be buffered"""
+        pass
+
+    @abstractmethod
+    def compact(self) -> int:
+        """Rewrite the storage with one record per path, returns removed records"""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+CACHE_JSONL_FILE_NAME = "cache.jsonl"
+CACHE_SQLITE_FILE_NAME = "cache.sqlite"
+
+SQLITE_BATCH_SIZE = 500
+
+# Used when recording a lot of pictures, buffered records are written every
+# DEFAULT_FLUSH_COUNT records or DEFAULT_FLUSH_INTERVAL seconds
+DEFAULT_FLUSH_COUNT = 100
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# path, creation_date, hash, size, mtime_ns, inode
+SqliteRow = tuple[str, str, str, Union[int, None], Union[int, None], Union[int, None]]
+
+# cache.jsonl is compacted when loaded if it has this many lines per distinct path
+COMPACTION_RATIO = 2.0
+
+# Sidecar index of cache.jsonl: magic, jsonl inode, indexed byte size, entry count
+# followed by the path keys, hash keys and line offsets as uint64 arrays
+INDEX_FILE_SUFFIX = ".idx"
+INDEX_MAGIC = b"KAIDX001"
+INDEX_HEADER = struct.Struct("<8sQQQ")
+
+# Read backwards by blocks when looking for the end of the last complete line
+TRUNCATE_BLOCK_SIZE = 4096
+
+
+def get_index_key(value: str) -> int:
+    digest = hashlib.blake2b(value.encode("UTF-8"), digest_size=8).digest()
+
+    return int.from_bytes(digest, "little")
+
+
+class WriteBuffer:
+    """Tells when buffered records should be written"""
+
+    def __init__(self, flush_count: int, flush_interval: Union[float, None]) -> None:
+        self._flush_count = flush_count
+        self._flush_interval = flush_interval
+        self._last_flush_time = time.monotonic()
+
+    def is_full(self, pending_count: int) -> bool:
+        if pending_count >= self._flush_count:
+            return True
+
+        if self._flush_interval is None:
+            return False
+
+        return time.monotonic() - self._last_flush_time >= self._flush_interval
+
+    def flushed(self) -> None:
+        self._last_flush_time = time.monotonic()
+
+
+class JsonlFileWriter:
+    """Appends records to a JSON lines file by batches"""
+
+    def __init__(
+        self,
+        file_path: Path,
+        flush_count: int,
+        flush_interval: Union[float, None],
+        fsync: bool,
+    ) -> None:
+        self._file_path = file_path
+        self._write_buffer = WriteBuffer(
+            flush_count=flush_count, flush_interval=flush_interval
+        )
+        self._fsync = fsync
+        self._pending_lines: list[str] = []
+
+        self._logger = logging.getLogger("app.picture_data_repository")
+
+        self._truncate_incomplete_line()
+
+    def _truncate_incomplete_line(self) -> None:
+        """A crash while writing can leave an incomplete last line, it is removed
+        so that records are not appended to it"""
+        try:
+            file = open(self._file_path, "r+b")
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            self._logger.warning(f"Unable to check {self._file_path}: {e}")
+            return
+
+        with file:
+            file_size = file.seek(0, os.SEEK_END)
+            position = file_size
+
+            while position > 0:
+                block_start = max(0, position - TRUNCATE_BLOCK_SIZE)
+                file.seek(block_start)
+                line_end = file.read(position - block_start).rfind(b"\n")
+
+                if line_end != -1:
+                    position = block_start + line_end + 1
+                    break
+
+                position = block_start
+
+            if position != file_size:
+                self._logger.warning(
+                    f"Removing incomplete last line of {self._file_path}"
+                )
+                file.truncate(position)
+
+    def write(self, data: iPictureData) -> None:
+        self._pending_lines.append(PictureData.to_json(data) + "\n")
+
+        if self._write_buffer.is_full(len(self._pending_lines)):
+            self.flush()
+
+    def flush(self) -> None:
+        if len(self._pending_lines) == 0:
+            return
+
+        with open(self._file_path, "a+") as file:
+            file.writelines(self._pending_lines)
+
+            if self._fsync:
+                file.flush()
+                os.fsync(file.fileno())
+
+        self._pending_lines = []
+        self._write_buffer.flushed()
+
+    def discard(self) -> None:
+        self._pending_lines = []
+
 
 class PictureDataRepository(iPictureDataRepository):
     def _get_data_from_file(self) -> list[iPictureData]:
@@ -26,9 +181,15 @@ class PictureDataRepository(iPictureDataRepository):
 
         try:
             with open(self._cache_file_path, "r") as file:
-                lines = file.readlines()
-                for line in lines:
-                    output.append(PictureData.from_json(line.strip()))
+                for line in file:
+                    if not line.endswith("\n"):
+                        self._logger.warning(
+                            f"Ignoring incomplete last line of {self._cache_file_path}"
+                        )
+                        break
+
+                    if len(line.strip()) > 0:
+                        output.append(PictureData.from_json(line.strip()))
         except FileNotFoundError:
             self._logger.warning(
                 f"Cache file {self._cache_file_path} not found. Creating a new one."
@@ -38,23 +199,48 @@ class PictureDataRepository(iPictureDataRepository):
         return output
 
     def _index_data(self, data: iPictureData) -> None:
+        previous_data = self._data.get(data.get_path())
+
+        if previous_data is not None and previous_data.get_hash() != data.get_hash():
+            self._folder_data[previous_data.get_hash()].discard(data.get_path())
+
         self._data[data.get_path()] = data
 
         picture_hash = data.get_hash()
 
         if picture_hash not in self._folder_data:
-            self._folder_data[picture_hash] = []
+            self._folder_data[picture_hash] = set()
 
-        self._folder_data[picture_hash].append(data.get_path())
+        self._folder_data[picture_hash].add(data.get_path())
 
     def _write_data_to_file(self, data: iPictureData) -> None:
-        with open(self._cache_file_path, "a+") as file:
-            file.write(PictureData.to_json(data) + "\n")
+        self._writer.write(data)
+        self._line_count += 1
+
+    def _needs_compaction(self) -> bool:
+        if self._compaction_ratio is None or len(self._data) == 0:
+            return False
+
+        return self._line_count > self._compaction_ratio * len(self._data)
 
-    def __init__(self, cache_file_path: Path) -> None:
+    def __init__(
+        self,
+        cache_file_path: Path,
+        compaction_ratio: Union[float, None] = COMPACTION_RATIO,
+        flush_count: int = 1,
+        flush_interval: Union[float, None] = None,
+        fsync: bool = False,
+    ) -> None:
         self._cache_file_path = cache_file_path
+        self._compaction_ratio = compaction_ratio
+        self._writer = JsonlFileWriter(
+            file_path=cache_file_path,
+            flush_count=flush_count,
+            flush_interval=flush_interval,
+            fsync=fsync,
+        )
         self._data: dict[Path, iPictureData] = {}
-        self._folder_data: dict[str, list[Path]] = {}
+        self._folder_data: dict[str, set[Path]] = {}
 
         self._logger = logging.getLogger("app.picture_data_repository")
         self._logger.info(
@@ -62,10 +248,14 @@ class PictureDataRepository(iPictureDataRepository):
         )
 
         picture_data_list = self._get_data_from_file()
+        self._line_count = len(picture_data_list)
 
         for picture_data in picture_data_list:
             self._index_data(data=picture_data)
 
+        if self._needs_compaction():
+            self.compact()
+
     def get(self, path: Path) -> Union[iPictureData, None]:
         if path in self._data:
             self._logger.debug(f"Found {path} PictureData in cache")
@@ -90,3 +280,575 @@ class PictureDataRepository(iPictureDataRepository):
             return unique_folders
         else:
             return []
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+    def compact(self) -> int:
+        removed_line_count = self._line_count - len(self._data)
+
+        self._logger.info(
+            f"Compacting {self._cache_file_path}: {self._line_count} lines for "
+            f"{len(self._data)} pictures"
+        )
+
+        write_file_atomically(
+            self._cache_file_path,
+            lambda file: file.writelines(
+                (PictureData.to_json(data) + "\n").encode("UTF-8")
+                for data in self._data.values()
+            ),
+        )
+
+        # Buffered records are part of the compacted file
+        self._writer.discard()
+        self._line_count = len(self._data)
+
+        return removed_line_count
+
+
+class IndexedPictureDataRepository(iPictureDataRepository):
+    """Memory maps cache.jsonl and only parses the records that are looked up"""
+
+    def __init__(
+        self,
+        cache_file_path: Path,
+        compaction_ratio: Union[float, None] = COMPACTION_RATIO,
+        flush_count: int = 1,
+        flush_interval: Union[float, None] = None,
+        fsync: bool = False,
+    ) -> None:
+        self._cache_file_path = cache_file_path
+        self._index_file_path = cache_file_path.with_name(
+            f"{cache_file_path.name}{INDEX_FILE_SUFFIX}"
+        )
+        self._compaction_ratio = compaction_ratio
+        self._writer = JsonlFileWriter(
+            file_path=cache_file_path,
+            flush_count=flush_count,
+            flush_interval=flush_interval,
+            fsync=fsync,
+        )
+        # Records of this session, they are not in the memory map
+        self._recorded_data: dict[Path, iPictureData] = {}
+        self._recorded_folder_data: dict[str, set[Path]] = {}
+
+        self._file: Union[BinaryIO, None] = None
+        self._mmap: Union[mmap.mmap, None] = None
+
+        self._logger = logging.getLogger("app.picture_data_repository")
+        self._logger.info(
+            "Init IndexedPictureDataRepository Cache file path is: "
+            f"{self._cache_file_path}"
+        )
+
+        self._open()
+
+        if self._needs_compaction():
+            self.compact()
+
+    def _set_index(
+        self, path_keys: np.ndarray, hash_keys: np.ndarray, offsets: np.ndarray
+    ) -> None:
+        self._path_keys = path_keys
+        self._hash_keys = hash_keys
+        self._offsets = offsets
+
+        # Stable sorts keep the entries of a key in file order
+        self._path_order = np.argsort(path_keys, kind="stable")
+        self._sorted_path_keys = path_keys[self._path_order]
+        self._hash_order = np.argsort(hash_keys, kind="stable")
+        self._sorted_hash_keys = hash_keys[self._hash_order]
+
+    def _open(self) -> None:
+        empty = np.zeros(0, dtype=np.uint64)
+        self._set_index(empty, empty, empty)
+
+        try:
+            self._file = open(self._cache_file_path, "rb")
+        except FileNotFoundError:
+            self._logger.warning(
+                f"Cache file {self._cache_file_path} not found. Creating a new one."
+            )
+            return
+
+        file_stat = os.fstat(self._file.fileno())
+
+        if file_stat.st_size == 0:
+            return
+
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        index = self._read_index_file(
+            inode=file_stat.st_ino, file_size=file_stat.st_size
+        )
+
+        if index is None:
+            indexed_size = 0
+        else:
+            indexed_size, path_keys, hash_keys, offsets = index
+            self._set_index(path_keys, hash_keys, offsets)
+
+        new_indexed_size = self._index_lines(start=indexed_size)
+
+        if index is None or new_indexed_size != indexed_size:
+            self._write_index_file(
+                inode=file_stat.st_ino, indexed_size=new_indexed_size
+            )
+
+    def _read_index_file(
+        self, inode: int, file_size: int
+    ) -> Union[tuple[int, np.ndarray, np.ndarray, np.ndarray], None]:
+        try:
+            with open(self._index_file_path, "rb") as file:
+                content = file.read()
+        except FileNotFoundError:
+            return None
+
+        if len(content) < INDEX_HEADER.size:
+            return None
+
+        magic, index_inode, indexed_size, count = INDEX_HEADER.unpack_from(content)
+
+        if (
+            magic != INDEX_MAGIC
+            or index_inode != inode
+            or indexed_size > file_size
+            or len(content) != INDEX_HEADER.size + 3 * 8 * count
+        ):
+            self._logger.info(f"Index {self._index_file_path} is outdated")
+            return None
+
+        assert self._mmap is not None
+
+        # The indexed part of the file must end with a complete line
+        if indexed_size > 0 and self._mmap[indexed_size - 1] != ord("\n"):
+            self._logger.info(f"Index {self._index_file_path} is outdated")
+            return None
+
+        arrays = np.frombuffer(content, dtype="<u8", offset=INDEX_HEADER.size)
+        path_keys, hash_keys, offsets = arrays.astype(np.uint64).reshape(3, count)
+
+        # Inodes are reused, the last indexed line must still be the same record
+        if count > 0 and self._read_path_key(int(offsets[-1])) != int(path_keys[-1]):
+            self._logger.info(f"Index {self._index_file_path} is outdated")
+            return None
+
+        return indexed_size, path_keys, hash_keys, offsets
+
+    def _read_path_key(self, offset: int) -> Union[int, None]:
+        assert self._mmap is not None
+
+        line_end = self._mmap.find(b"\n", offset)
+
+        try:
+            return get_index_key(json.loads(self._mmap[offset:line_end])["path"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _write_index_file(self, inode: int, indexed_size: int) -> None:
+        content = [
+            INDEX_HEADER.pack(INDEX_MAGIC, inode, indexed_size, len(self._offsets))
+        ] + [
+            array.astype("<u8").tobytes()
+            for array in (self._path_keys, self._hash_keys, self._offsets)
+        ]
+
+        try:
+            write_file_atomically(
+                self._index_file_path, lambda file: file.writelines(content)
+            )
+        except OSError as e:
+            # The index is rebuilt from cache.jsonl on the next run
+            self._logger.warning(f"Unable to write {self._index_file_path}: {e}")
+
+    def _index_lines(self, start: int) -> int:
+        """Indexes the lines after start, returns the end of the last complete line"""
+        assert self._mmap is not None
+
+        path_keys: list[int] = []
+        hash_keys: list[int] = []
+        offsets: list[int] = []
+
+        position = start
+
+        while position < len(self._mmap):
+            line_end = self._mmap.find(b"\n", position)
+
+            if line_end == -1:
+                self._logger.warning(
+                    f"Ignoring incomplete last line of {self._cache_file_path}"
+                )
+                break
+
+            line = self._mmap[position:line_end].strip()
+
+            if len(line) > 0:
+                try:
+                    record = json.loads(line)
+                    path_key = get_index_key(record["path"])
+                    hash_key = get_index_key(record["hash"])
+                except (ValueError, KeyError, TypeError) as e:
+                    # Left by an append after an incomplete line
+                    self._logger.warning(
+                        f"Ignoring unreadable line of {self._cache_file_path}: {e}"
+                    )
+                else:
+                    path_keys.append(path_key)
+                    hash_keys.append(hash_key)
+                    offsets.append(position)
+
+            position = line_end + 1
+
+        if len(offsets) > 0:
+            self._set_index(
+                np.concatenate([self._path_keys, np.array(path_keys, np.uint64)]),
+                np.concatenate([self._hash_keys, np.array(hash_keys, np.uint64)]),
+                np.concatenate([self._offsets, np.array(offsets, np.uint64)]),
+            )
+
+        return position
+
+    def _close_file(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _needs_compaction(self) -> bool:
+        if self._compaction_ratio is None or len(self._path_keys) == 0:
+            return False
+
+        distinct_path_count = len(np.unique(self._path_keys))
+
+        return len(self._path_keys) > self._compaction_ratio * distinct_path_count
+
+    def _read_entry(self, entry: int) -> iPictureData:
+        assert self._mmap is not None
+
+        offset = int(self._offsets[entry])
+        line_end = self._mmap.find(b"\n", offset)
+
+        return PictureData.from_json(self._mmap[offset:line_end].decode("UTF-8"))
+
+    def _find_entries(
+        self, sorted_keys: np.ndarray, order: np.ndarray, key: int
+    ) -> np.ndarray:
+        """Entries matching the key, latest first"""
+        start = np.searchsorted(sorted_keys, np.uint64(key), side="left")
+        end = np.searchsorted(sorted_keys, np.uint64(key), side="right")
+
+        return order[start:end][::-1]
+
+    def _get_from_file(self, path: Path) -> Union[iPictureData, None]:
+        entries = self._find_entries(
+            self._sorted_path_keys, self._path_order, get_index_key(str(path))
+        )
+
+        for entry in entries:
+            data = self._read_entry(entry)
+
+            if data.get_path() == path:
+                return data
+
+        return None
+
+    def get(self, path: Path) -> Union[iPictureData, None]:
+        if path in self._recorded_data:
+            return self._recorded_data[path]
+
+        data = self._get_from_file(path)
+
+        if data is None:
+            self._logger.debug(f"{path} not found in PictureData cache")
+        else:
+            self._logger.debug(f"Found {path} PictureData in cache")
+
+        return data
+
+    def record(self, data: iPictureData) -> bool:
+        path = data.get_path()
+        previous_data = self._recorded_data.get(path)
+
+        if previous_data is not None and previous_data.get_hash() != data.get_hash():
+            self._recorded_folder_data[previous_data.get_hash()].discard(path)
+
+        self._recorded_data[path] = data
+        self._recorded_folder_data.setdefault(data.get_hash(), set()).add(path)
+        self._writer.write(data)
+
+        return True
+
+    def get_parents_folder_list(self, picture_hash: str) -> list[str]:
+        paths = set(self._recorded_folder_data.get(picture_hash, set()))
+
+        entries = self._find_entries(
+            self._sorted_hash_keys, self._hash_order, get_index_key(picture_hash)
+        )
+
+        for entry in entries:
+            path = self._read_entry(entry).get_path()
+
+            if path in paths or path in self._recorded_data:
+                continue
+
+            # The picture may have been recorded again with another hash since
+            latest_data = self._get_from_file(path)
+
+            if latest_data is not None and latest_data.get_hash() == picture_hash:
+                paths.add(path)
+
+        return list(set(str(path.parent.name) for path in paths))
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._close_file()
+
+    def compact(self) -> int:
+        self.flush()
+        self._close_file()
+
+        removed_line_count = PictureDataRepository(
+            cache_file_path=self._cache_file_path, compaction_ratio=None
+        ).compact()
+
+        self._recorded_data = {}
+        self._recorded_folder_data = {}
+        self._open()
+
+        return removed_line_count
+
+
+class SqlitePictureDataRepository(iPictureDataRepository):
+    """Looks up pictures on demand in a SQLite file instead of loading everything"""
+
+    def _create_schema(self) -> None:
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs on checkpoints, FULL syncs every commit
+        self._connection.execute(
+            f"PRAGMA synchronous={'FULL' if self._fsync else 'NORMAL'}"
+        )
+
+        with self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS picture_data (
+                    path TEXT PRIMARY KEY,
+                    creation_date TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    inode INTEGER
+                )
+                """)
+            # Caches migrated before the file stat was recorded lack its columns
+            column_name_set = set(
+                row[1]
+                for row in self._connection.execute("PRAGMA table_info(picture_data)")
+            )
+
+            for column_name in ["size", "mtime_ns", "inode"]:
+                if column_name not in column_name_set:
+                    self._connection.execute(
+                        f"ALTER TABLE picture_data ADD COLUMN {column_name} INTEGER"
+                    )
+
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS picture_data_hash ON picture_data (hash)"
+            )
+
+    def __init__(
+        self,
+        database_path: Path,
+        flush_count: int = SQLITE_BATCH_SIZE,
+        flush_interval: Union[float, None] = None,
+        fsync: bool = False,
+    ) -> None:
+        self._database_path = database_path
+        self._write_buffer = WriteBuffer(
+            flush_count=flush_count, flush_interval=flush_interval
+        )
+        self._fsync = fsync
+        self._pending_data: dict[Path, iPictureData] = {}
+
+        self._logger = logging.getLogger("app.picture_data_repository")
+        self._logger.info(
+            f"Init SqlitePictureDataRepository database path is: {database_path}"
+        )
+
+        self._connection = sqlite3.connect(database_path)
+        self._create_schema()
+
+    def _to_row(self, data: iPictureData) -> SqliteRow:
+        file_stat = data.get_file_stat()
+
+        return (
+            str(data.get_path()),
+            data.get_creation_date().isoformat(),
+            data.get_hash(),
+            None if file_stat is None else file_stat.size,
+            None if file_stat is None else file_stat.mtime_ns,
+            None if file_stat is None else file_stat.inode,
+        )
+
+    def _insert_rows(self, rows: list[SqliteRow]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO picture_data "
+                "(path, creation_date, hash, size, mtime_ns, inode) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def get(self, path: Path) -> Union[iPictureData, None]:
+        if path in self._pending_data:
+            return self._pending_data[path]
+
+        row = self._connection.execute(
+            "SELECT creation_date, hash, size, mtime_ns, inode FROM picture_data "
+            "WHERE path = ?",
+            (str(path),),
+        ).fetchone()
+
+        if row is None:
+            self._logger.debug(f"{path} not found in PictureData cache")
+            return None
+
+        self._logger.debug(f"Found {path} PictureData in cache")
+        return PictureData(
+            path=path,
+            creation_date=datetime.fromisoformat(row[0]),
+            hash=row[1],
+            file_stat=None if row[2] is None else FileStat(*row[2:]),
+        )
+
+    def record(self, data: iPictureData) -> bool:
+        self._pending_data[data.get_path()] = data
+
+        if self._write_buffer.is_full(len(self._pending_data)):
+            self.flush()
+
+        return True
+
+    def get_parents_folder_list(self, picture_hash: str) -> list[str]:
+        self.flush()
+
+        rows = self._connection.execute(
+            "SELECT path FROM picture_data WHERE hash = ?", (picture_hash,)
+        ).fetchall()
+
+        return list(set(str(Path(row[0]).parent.name) for row in rows))
+
+    def flush(self) -> None:
+        if len(self._pending_data) == 0:
+            return
+
+        self._insert_rows([self._to_row(data) for data in self._pending_data.values()])
+        self._pending_data = {}
+        self._write_buffer.flushed()
+
+    def import_jsonl(self, cache_file_path: Path) -> int:
+        """Copies a cache.jsonl file in the database, returns the number of lines"""
+        self.flush()
+
+        line_count = 0
+        rows: list[SqliteRow] = []
+
+        with open(cache_file_path, "r") as file:
+            for line in file:
+                if line.strip() == "":
+                    continue
+
+                rows.append(self._to_row(PictureData.from_json(line.strip())))
+                line_count += 1
+
+                if len(rows) >= SQLITE_BATCH_SIZE:
+                    self._insert_rows(rows)
+                    rows = []
+
+        self._insert_rows(rows)
+
+        self._logger.info(f"Imported {line_count} lines from {cache_file_path}")
+
+        return line_count
+
+    def compact(self) -> int:
+        # Rows are unique per path already, only reclaim the free pages
+        self.flush()
+        self._connection.execute("VACUUM")
+
+        return 0
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+
+
+def picture_data_repository_factory(
+    backup_folder_path: Path,
+    flush_count: int = DEFAULT_FLUSH_COUNT,
+    flush_interval: Union[float, None] = DEFAULT_FLUSH_INTERVAL,
+    fsync: bool = False,
+    indexed: bool = False,
+) -> iPictureDataRepository:
+    """Uses the SQLite cache once it has been created with migrate_cache"""
+    database_path = backup_folder_path / CACHE_SQLITE_FILE_NAME
+
+    repository: iPictureDataRepository
+
+    if database_path.is_file():
+        repository = SqlitePictureDataRepository(
+            database_path=database_path,
+            flush_count=flush_count,
+            flush_interval=flush_interval,
+            fsync=fsync,
+        )
+    elif indexed:
+        repository = IndexedPictureDataRepository(
+            cache_file_path=backup_folder_path / CACHE_JSONL_FILE_NAME,
+            flush_count=flush_count,
+            flush_interval=flush_interval,
+            fsync=fsync,
+        )
+    else:
+        repository = PictureDataRepository(
+            cache_file_path=backup_folder_path / CACHE_JSONL_FILE_NAME,
+            flush_count=flush_count,
+            flush_interval=flush_interval,
+            fsync=fsync,
+        )
+
+    return repository
+
+
+def migrate_cache_to_sqlite(backup_folder_path: Path) -> int:
+    cache_file_path = backup_folder_path / CACHE_JSONL_FILE_NAME
+    database_path = backup_folder_path / CACHE_SQLITE_FILE_NAME
+
+    if not cache_file_path.is_file():
+        raise FileNotFoundError(f"Cache file {cache_file_path} not found")
+
+    if database_path.is_file():
+        raise FileExistsError(f"Cache has already been migrated to {database_path}")
+
+    repository = SqlitePictureDataRepository(database_path=database_path)
+
+    try:
+        line_count = repository.import_jsonl(cache_file_path)
+    except Exception:
+        # Do not leave a partial database that would be used instead of the file
+        repository.close()
+        database_path.unlink()
+        raise
+
+    repository.close()
+
+    return line_count
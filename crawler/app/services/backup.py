@@ -1,18 +1,29 @@
 from abc import ABC, abstractmethod
 from datetime import timezone
+import hashlib
 import logging
 import os
 from pathlib import Path
+from typing import Union
 
+from app.entities.near_duplicate_index import NearDuplicateIndex
 from app.entities.picture_data import iPictureData
+from app.entities.picture_table import PictureTableException, hash_to_int
 from app.factories.picture_data import iPictureDataFactory, NotStandardFileNameException
-from app.tools.file import iFileTools
+from app.repositories.near_duplicate_index import iNearDuplicateIndexRepository
+from app.tools.file import CopyMode, iFileTools
 
 
 class iBackupService(ABC):
     @abstractmethod
-    def backup(self, origin_path: Path, data: iPictureData) -> bool:
-        """Backup to the backup folder returns True if new file is created"""
+    def backup(
+        self,
+        origin_path: Path,
+        data: iPictureData,
+        content: Union[bytes, None] = None,
+    ) -> bool:
+        """Backup to the backup folder returns True if new file is created. The
+        content of the origin file is used when given, instead of reading it"""
         pass
 
     @abstractmethod
@@ -20,6 +31,11 @@ class iBackupService(ABC):
         """Find file by hash"""
         pass
 
+    @abstractmethod
+    def flush(self) -> None:
+        """Persist the known hashes"""
+        pass
+
 
 class LocalFileBackupService(iBackupService):
     def _create_hash_set(self, path_list: list[Path]) -> set[str]:
@@ -43,10 +59,24 @@ class LocalFileBackupService(iBackupService):
         backup_folder_path: Path,
         picture_data_factory: iPictureDataFactory,
         file_tools: iFileTools,
+        copy_mode: CopyMode = CopyMode.COPY,
+        tolerance: int = 0,
+        near_duplicate_index_repository: Union[
+            iNearDuplicateIndexRepository, None
+        ] = None,
     ) -> None:
+        """The hashes of the backup folder are recovered from the standard names of
+        its pictures, listed from a snapshot when file_tools keeps one. With a
+        tolerance, pictures whose hash differs by at most that many bits from a
+        backed up one are not backed up again"""
         self._backup_folder_path = backup_folder_path
+        self._copy_mode = copy_mode
         self._picture_data_factory = picture_data_factory
         self._file_tools = file_tools
+        self._hash_set_changed = False
+        self._tolerance = tolerance
+        self._near_duplicate_index_repository = near_duplicate_index_repository
+        self._near_duplicate_index: Union[NearDuplicateIndex, None] = None
 
         self._logger = logging.getLogger("app.file_service")
         self._logger.info(
@@ -57,6 +87,43 @@ class LocalFileBackupService(iBackupService):
             self._file_tools.list_pictures(root_path=self._backup_folder_path)
         )
 
+        if self._tolerance > 0:
+            self._near_duplicate_index = self._load_near_duplicate_index()
+
+    def _get_near_duplicate_index_signature(self) -> str:
+        """Digest of the backed up hashes, the saved index is used while they are
+        the same"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update("\n".join(sorted(self._hash_set)).encode("UTF-8"))
+
+        return digest.hexdigest()
+
+    def _load_near_duplicate_index(self) -> NearDuplicateIndex:
+        signature = self._get_near_duplicate_index_signature()
+
+        if self._near_duplicate_index_repository is not None:
+            near_duplicate_index = self._near_duplicate_index_repository.load(signature)
+
+            if near_duplicate_index is not None:
+                return near_duplicate_index
+
+        near_duplicate_index = NearDuplicateIndex.from_hash_list(self._hash_set)
+        self._logger.info(
+            f"Built near duplicate index of {len(near_duplicate_index)} hashes"
+        )
+
+        self._save_near_duplicate_index(near_duplicate_index, signature)
+
+        return near_duplicate_index
+
+    def _save_near_duplicate_index(
+        self, near_duplicate_index: NearDuplicateIndex, signature: str
+    ) -> None:
+        if self._near_duplicate_index_repository is None:
+            return
+
+        self._near_duplicate_index_repository.save(near_duplicate_index, signature)
+
     def __get_folder_path(self, data: iPictureData) -> Path:
         return (
             self._backup_folder_path
@@ -70,29 +137,81 @@ class LocalFileBackupService(iBackupService):
         )
 
     def __file_already_exists(self, picture_hash: str) -> bool:
-        return picture_hash in self._hash_set
+        if picture_hash in self._hash_set:
+            return True
 
-    def backup(self, origin_path: Path, data: iPictureData) -> bool:
+        if self._near_duplicate_index is None:
+            return False
+
+        try:
+            value = hash_to_int(picture_hash)
+        except PictureTableException:
+            return False
+
+        near_hash_list = self._near_duplicate_index.find(value, self._tolerance)
+
+        if len(near_hash_list) > 0:
+            self._logger.debug(
+                f"Hash {picture_hash} is within {self._tolerance} bits of "
+                f"{len(near_hash_list)} backed up hashes"
+            )
+            return True
+
+        return False
+
+    def backup(
+        self,
+        origin_path: Path,
+        data: iPictureData,
+        content: Union[bytes, None] = None,
+    ) -> bool:
         if self.__file_already_exists(data.get_hash()):
             self._logger.debug(f"File {origin_path} already backed up, SKIPPING")
             return False
 
-        with open(origin_path, "rb") as picture_file:
-            new_file_path = self.__get_file_path(data=data)
-            self._logger.debug(f"Backing up {origin_path} to {new_file_path}")
-            os.makedirs(new_file_path.parent, exist_ok=True)
-            with open(new_file_path, "wb+") as new_picture_file:
-                new_picture_file.write(picture_file.read())
-                os.utime(
-                    new_file_path,
-                    (
-                        data.get_creation_date().timestamp(),
-                        data.get_creation_date().timestamp(),
-                    ),
-                )
+        new_file_path = self.__get_file_path(data=data)
+
+        self._logger.debug(f"Backing up {origin_path} to {new_file_path}")
+        os.makedirs(new_file_path.parent, exist_ok=True)
+
+        copy_mode = self._file_tools.copy_file(
+            origin_path=origin_path,
+            target_path=new_file_path,
+            copy_mode=self._copy_mode,
+            content=content,
+        )
+
+        # A hard link shares its times with the original file, left untouched
+        if copy_mode != CopyMode.HARDLINK:
+            os.utime(
+                new_file_path,
+                (
+                    data.get_creation_date().timestamp(),
+                    data.get_creation_date().timestamp(),
+                ),
+            )
 
         self._hash_set.add(data.get_hash())
+        self._hash_set_changed = True
+
+        if self._near_duplicate_index is not None:
+            try:
+                self._near_duplicate_index.add(hash_to_int(data.get_hash()))
+            except PictureTableException:
+                pass
+
         return True
 
     def hash_exists(self, picture_hash: str) -> bool:
         return self.__file_already_exists(picture_hash)
+
+    def flush(self) -> None:
+        """The backup folder is listed again on the next run, only the near duplicate
+        index of the new hashes is saved"""
+        if self._near_duplicate_index is None or not self._hash_set_changed:
+            return
+
+        self._save_near_duplicate_index(
+            self._near_duplicate_index, self._get_near_duplicate_index_signature()
+        )
+        self._hash_set_changed = False
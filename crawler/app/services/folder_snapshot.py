@@ -0,0 +1,159 @@
+import os
+from pathlib import Path
+import time
+from typing import Iterable, Iterator
+
+from app.repositories.folder_snapshot import (
+    FOLDER_SNAPSHOT_FILE_NAME,
+    RACY_MTIME_WINDOW_NS,
+    UNKNOWN_MTIME_NS,
+    FolderSnapshotRepository,
+    SnapshotEntry,
+    iFolderSnapshotRepository,
+)
+from app.tools.file import DEFAULT_PRUNED_FOLDER_NAMES, FileTools
+
+
+class FolderSnapshotFileTools(FileTools):
+    """Lists pictures under the snapshot root from a snapshot of its folders, only
+    the folders whose mtime changed since the last walk are listed again"""
+
+    def __init__(
+        self,
+        snapshot_root_path: Path,
+        folder_snapshot_repository: iFolderSnapshotRepository,
+        pruned_folder_names: Iterable[str] = DEFAULT_PRUNED_FOLDER_NAMES,
+        workers: int = 1,
+        rebuild_snapshot: bool = False,
+    ) -> None:
+        """With rebuild_snapshot, the saved snapshot is ignored and every folder is
+        listed again on the first walk"""
+        super().__init__(pruned_folder_names=pruned_folder_names, workers=workers)
+
+        self._snapshot_root_path = snapshot_root_path
+        self._folder_snapshot_repository = folder_snapshot_repository
+        self._rebuild_snapshot = rebuild_snapshot
+
+    def _get_folder_key(self, folder_path: Path) -> str:
+        return folder_path.relative_to(self._snapshot_root_path).as_posix()
+
+    def _is_in_subtree(self, folder_key: str, root_key: str) -> bool:
+        return (
+            root_key == "."
+            or folder_key == root_key
+            or folder_key.startswith(f"{root_key}/")
+        )
+
+    def _scan_folder(self, folder_path: Path) -> SnapshotEntry:
+        folder_listing = self.list_folder(folder_path)
+        mtime_ns = folder_listing.mtime_ns
+
+        if time.time_ns() - mtime_ns < RACY_MTIME_WINDOW_NS:
+            mtime_ns = UNKNOWN_MTIME_NS
+
+        return SnapshotEntry(
+            mtime_ns=mtime_ns,
+            picture_name_list=[path.name for path in folder_listing.picture_path_list],
+            folder_name_list=[path.name for path in folder_listing.folder_path_list],
+        )
+
+    def _walk_snapshot(self, root_path: Path) -> Iterator[tuple[Path, SnapshotEntry]]:
+        if self._rebuild_snapshot:
+            snapshot_entries: dict[str, SnapshotEntry] = {}
+            self._rebuild_snapshot = False
+        else:
+            snapshot_entries = self._folder_snapshot_repository.load()
+
+        walked_entries: dict[str, SnapshotEntry] = {}
+        scanned_folder_count = 0
+
+        folder_path_stack = [root_path]
+
+        while len(folder_path_stack) > 0:
+            folder_path = folder_path_stack.pop()
+            folder_key = self._get_folder_key(folder_path)
+
+            try:
+                mtime_ns = os.stat(folder_path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+
+            snapshot_entry = snapshot_entries.get(folder_key)
+
+            # Sub folders are always walked, their changes do not show in the
+            # mtime of their parent
+            if snapshot_entry is None or snapshot_entry.mtime_ns != mtime_ns:
+                try:
+                    snapshot_entry = self._scan_folder(folder_path)
+                except OSError as e:
+                    self._logger.warning(f"Skipping folder {folder_path}: {e}")
+                    continue
+
+                scanned_folder_count += 1
+
+            walked_entries[folder_key] = snapshot_entry
+
+            yield folder_path, snapshot_entry
+
+            folder_path_stack.extend(
+                folder_path / folder_name
+                for folder_name in snapshot_entry.folder_name_list
+            )
+
+        self._logger.info(
+            f"Listed {scanned_folder_count} of {len(walked_entries)} folders, the "
+            "other ones were unchanged since the last walk"
+        )
+
+        # Entries outside of the walked sub tree are kept as they were
+        root_key = self._get_folder_key(root_path)
+        refreshed_entries = {
+            folder_key: snapshot_entry
+            for folder_key, snapshot_entry in snapshot_entries.items()
+            if not self._is_in_subtree(folder_key, root_key)
+        }
+        refreshed_entries.update(walked_entries)
+
+        if refreshed_entries != snapshot_entries:
+            self._folder_snapshot_repository.save(refreshed_entries)
+
+    def _iter_pictures_from_snapshot(self, root_path: Path) -> Iterator[Path]:
+        for folder_path, snapshot_entry in self._walk_snapshot(root_path):
+            for picture_name in snapshot_entry.picture_name_list:
+                yield folder_path / picture_name
+
+    def _iter_folder_pictures_from_snapshot(
+        self, root_path: Path
+    ) -> Iterator[tuple[Path, list[Path]]]:
+        for folder_path, snapshot_entry in self._walk_snapshot(root_path):
+            yield folder_path, [
+                folder_path / picture_name
+                for picture_name in snapshot_entry.picture_name_list
+            ]
+
+    def iter_pictures(self, root_path: Path) -> Iterator[Path]:
+        if not root_path.is_relative_to(self._snapshot_root_path):
+            return super().iter_pictures(root_path)
+
+        return self._iter_pictures_from_snapshot(root_path)
+
+    def iter_folder_pictures(
+        self, root_path: Path
+    ) -> Iterator[tuple[Path, list[Path]]]:
+        if not root_path.is_relative_to(self._snapshot_root_path):
+            return super().iter_folder_pictures(root_path)
+
+        return self._iter_folder_pictures_from_snapshot(root_path)
+
+
+def folder_snapshot_file_tools_factory(
+    backup_folder_path: Path, workers: int = 1, rebuild_snapshot: bool = False
+) -> FolderSnapshotFileTools:
+    return FolderSnapshotFileTools(
+        snapshot_root_path=backup_folder_path,
+        folder_snapshot_repository=FolderSnapshotRepository(
+            backup_folder_path / FOLDER_SNAPSHOT_FILE_NAME
+        ),
+        workers=workers,
+        rebuild_snapshot=rebuild_snapshot,
+    )
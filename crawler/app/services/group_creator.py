@@ -2,8 +2,17 @@ from abc import ABC, abstractmethod
 from datetime import timedelta
 from pathlib import Path
 
+import numpy as np
+
 from app.entities.picture_data import iPictureData
-from app.entities.picture_group import PictureGroup, iPictureGroup
+from app.entities.picture_group import (
+    EventFolder,
+    EventPictureGroup,
+    PictureGroup,
+    TablePictureGroup,
+    iPictureGroup,
+)
+from app.entities.picture_table import PictureTable
 
 
 class iGroupCreatorService(ABC):
@@ -19,6 +28,25 @@ class iGroupCreatorService(ABC):
     ) -> list[iPictureGroup]:
         pass
 
+    @abstractmethod
+    def get_table_group_list_from_time(
+        self, picture_table: PictureTable
+    ) -> list[iPictureGroup]:
+        pass
+
+    @abstractmethod
+    def get_table_group_list_from_folders(
+        self, picture_table: PictureTable
+    ) -> list[iPictureGroup]:
+        pass
+
+    @abstractmethod
+    def get_table_group_list_incremental(
+        self, picture_table: PictureTable, event_list: list[EventFolder]
+    ) -> list[iPictureGroup]:
+        """Groups new pictures, joining the existing events close enough in time"""
+        pass
+
 
 class GroupCreatorService(iGroupCreatorService):
     def __init__(
@@ -38,31 +66,17 @@ class GroupCreatorService(iGroupCreatorService):
     def get_group_list_from_time(
         self, picture_list: list[iPictureData]
     ) -> list[iPictureGroup]:
-        sorted_picture_list = sorted(picture_list, key=lambda x: x.get_creation_date())
-        grouped_picture_path = []
-        current_group = []
-
-        previous_picture = None
-
-        for picture in sorted_picture_list:
-            if previous_picture is None:
-                current_group.append(picture)
-            else:
-                time_difference = (
-                    picture.get_creation_date() - previous_picture.get_creation_date()
-                )
-
-                if time_difference <= self._hours_btw_picture:
-                    current_group.append(picture)
-                else:
-                    grouped_picture_path.append(current_group)
-                    current_group = [picture]
-
-            previous_picture = picture
-
-        grouped_picture_path.append(current_group)
-
-        return self._convert_to_group(grouped_picture_path)
+        timestamps = np.array(
+            [picture.get_creation_date().timestamp() for picture in picture_list],
+            dtype=np.float64,
+        )
+
+        return self._convert_to_group(
+            [
+                [picture_list[index] for index in indices]
+                for indices in self._split_on_time_gaps(timestamps)
+            ]
+        )
 
     def get_group_list_from_folders(
         self, picture_list: list[iPictureData]
@@ -81,3 +95,113 @@ class GroupCreatorService(iGroupCreatorService):
             group_list.append(PictureGroup(pictures))
 
         return group_list
+
+    def _split_on_changes(
+        self, order: np.ndarray, boundaries: np.ndarray
+    ) -> list[np.ndarray]:
+        """Splits row indices sorted by order where boundaries is True"""
+        return np.split(order, np.flatnonzero(boundaries) + 1)
+
+    def _split_on_time_gaps(self, timestamps: np.ndarray) -> list[np.ndarray]:
+        """Row indices sorted by time, split where two pictures are further apart
+        than the maximum gap"""
+        order = np.argsort(timestamps, kind="stable")
+        max_gap = self._hours_btw_picture.total_seconds()
+
+        return self._split_on_changes(order, np.diff(timestamps[order]) > max_gap)
+
+    def get_table_group_list_from_time(
+        self, picture_table: PictureTable
+    ) -> list[iPictureGroup]:
+        if len(picture_table) == 0:
+            return []
+
+        # Groups are views on the sorted row indices, rows are only turned into
+        # paths when listing the pictures to move
+        return [
+            TablePictureGroup(
+                picture_table=picture_table,
+                indices=indices,
+                min_group_size=self._minimum_group_size,
+            )
+            for indices in self._split_on_time_gaps(picture_table.get_timestamps())
+        ]
+
+    def get_table_group_list_from_folders(
+        self, picture_table: PictureTable
+    ) -> list[iPictureGroup]:
+        if len(picture_table) == 0:
+            return []
+
+        # Folder ids are given in order of first appearance
+        folder_ids = picture_table.get_folder_ids()
+        order = np.argsort(folder_ids, kind="stable")
+
+        return [
+            TablePictureGroup(picture_table=picture_table, indices=indices)
+            for indices in self._split_on_changes(
+                order, np.diff(folder_ids[order]) != 0
+            )
+        ]
+
+    def get_table_group_list_incremental(
+        self, picture_table: PictureTable, event_list: list[EventFolder]
+    ) -> list[iPictureGroup]:
+        if len(picture_table) == 0:
+            return []
+
+        timestamps = picture_table.get_timestamps()
+        max_gap = int(self._hours_btw_picture.total_seconds())
+
+        sorted_event_list = sorted(event_list, key=lambda event: event.min_timestamp)
+        min_timestamps = np.array(
+            [event.min_timestamp for event in sorted_event_list], dtype=np.int64
+        )
+        # Non decreasing, events ending after a timestamp are found by bisection
+        max_timestamps = np.maximum.accumulate(
+            np.array(
+                [event.max_timestamp for event in sorted_event_list], dtype=np.int64
+            )
+        )
+
+        group_list: list[iPictureGroup] = []
+
+        for indices in self._split_on_time_gaps(timestamps):
+            start = int(timestamps[indices[0]]) - max_gap
+            end = int(timestamps[indices[-1]]) + max_gap
+
+            event_candidate_list = [
+                sorted_event_list[position]
+                for position in range(
+                    int(np.searchsorted(max_timestamps, start, side="left")),
+                    int(np.searchsorted(min_timestamps, end, side="right")),
+                )
+                if sorted_event_list[position].max_timestamp >= start
+            ]
+
+            # Like a full regroup, the event with the most pictures is kept
+            event = max(
+                event_candidate_list,
+                key=lambda event: event.picture_count,
+                default=None,
+            )
+
+            if (
+                event is not None
+                and len(indices) + event.picture_count >= self._minimum_group_size
+            ):
+                group_list.append(
+                    EventPictureGroup(
+                        picture_table=picture_table, indices=indices, event=event
+                    )
+                )
+            else:
+                group_list.append(
+                    TablePictureGroup(
+                        picture_table=picture_table,
+                        indices=indices,
+                        min_group_size=self._minimum_group_size,
+                    )
+                )
+
+        return group_list
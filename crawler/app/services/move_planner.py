@@ -0,0 +1,211 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import logging
+import os
+from pathlib import Path
+from typing import Union
+
+from app.repositories.move_journal import (
+    Move,
+    MoveJournal,
+    MoveJournalStatus,
+    iMoveJournalRepository,
+)
+
+# Renames are metadata operations, a few threads hide the file system latency
+DEFAULT_MOVE_WORKERS = 4
+
+
+class MovePlannerException(Exception):
+    pass
+
+
+class iMovePlannerService(ABC):
+    @abstractmethod
+    def move(self, move_list: list[Move]) -> int:
+        """Moves the files, returns the number of files moved"""
+        pass
+
+    @abstractmethod
+    def resume(self) -> int:
+        """Finishes the moves of an interrupted run"""
+        pass
+
+    @abstractmethod
+    def undo(self) -> int:
+        """Moves back the files moved by the last run"""
+        pass
+
+
+class MovePlannerService(iMovePlannerService):
+    def __init__(
+        self,
+        move_journal_repository: Union[iMoveJournalRepository, None] = None,
+        workers: int = DEFAULT_MOVE_WORKERS,
+    ) -> None:
+        self._move_journal_repository = move_journal_repository
+        self._workers = workers
+
+        self._logger = logging.getLogger("app.move_planner")
+
+    def _is_done(self, move: Move) -> bool:
+        return not os.path.lexists(move.origin_path) and os.path.lexists(
+            move.target_path
+        )
+
+    def _move_file(self, move: Move) -> bool:
+        # os.rename would silently replace an existing file
+        if os.path.lexists(move.target_path):
+            self._logger.warning(
+                f"{move.target_path} already exists, {move.origin_path} not moved"
+            )
+            return False
+
+        try:
+            os.rename(move.origin_path, move.target_path)
+        except FileNotFoundError:
+            self._logger.warning(f"{move.origin_path} not found, not moved")
+            return False
+
+        return True
+
+    def _create_folder(self, folder_path: Path, record: bool) -> None:
+        """Folders created are journaled first, undo only removes those"""
+        missing_folder_list: list[Path] = []
+        missing_folder_path = folder_path
+
+        while not os.path.isdir(missing_folder_path):
+            missing_folder_list.append(missing_folder_path)
+            missing_folder_path = missing_folder_path.parent
+
+        if len(missing_folder_list) == 0:
+            return
+
+        if record and self._move_journal_repository is not None:
+            for missing_folder_path in reversed(missing_folder_list):
+                self._move_journal_repository.record_created_folder(missing_folder_path)
+
+        os.makedirs(folder_path, exist_ok=True)
+
+    def _run_moves(
+        self, indexed_move_list: list[tuple[int, Move]], record: bool
+    ) -> int:
+        """Moves are grouped by target folder, each folder is created once"""
+        moves_by_folder: dict[Path, list[tuple[int, Move]]] = {}
+
+        for move_index, move in indexed_move_list:
+            moves_by_folder.setdefault(move.target_path.parent, []).append(
+                (move_index, move)
+            )
+
+        moved_count = 0
+
+        with ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix="move"
+        ) as executor:
+            pending: dict[Future, int] = {}
+
+            for folder_path, folder_move_list in moves_by_folder.items():
+                self._create_folder(folder_path, record=record)
+
+                for move_index, move in folder_move_list:
+                    pending[executor.submit(self._move_file, move)] = move_index
+
+            # Journal lines are written from this thread only
+            for future in as_completed(pending):
+                if not future.result():
+                    continue
+
+                moved_count += 1
+
+                if record and self._move_journal_repository is not None:
+                    self._move_journal_repository.record_done(pending[future])
+
+        return moved_count
+
+    def _set_status(self, status: MoveJournalStatus) -> None:
+        assert self._move_journal_repository is not None
+
+        self._move_journal_repository.set_status(status)
+        self._move_journal_repository.close()
+
+    def _load_journal(self) -> Union[MoveJournal, None]:
+        if self._move_journal_repository is None:
+            raise MovePlannerException("No move journal is kept")
+
+        return self._move_journal_repository.load()
+
+    def move(self, move_list: list[Move]) -> int:
+        if self._move_journal_repository is not None:
+            journal = self._move_journal_repository.load()
+
+            if journal is not None and journal.status == MoveJournalStatus.PLANNED:
+                raise MovePlannerException(
+                    "The moves of the previous run were interrupted, resume or undo "
+                    "them first"
+                )
+
+            self._move_journal_repository.start(move_list)
+
+        moved_count = self._run_moves(list(enumerate(move_list)), record=True)
+
+        if self._move_journal_repository is not None:
+            self._set_status(MoveJournalStatus.FINISHED)
+
+        return moved_count
+
+    def resume(self) -> int:
+        journal = self._load_journal()
+
+        if journal is None or journal.status != MoveJournalStatus.PLANNED:
+            self._logger.info("No interrupted moves to resume")
+            return 0
+
+        # Moves done after the last journal line was written are found from the files
+        indexed_move_list = [
+            (move_index, move)
+            for move_index, move in enumerate(journal.move_list)
+            if move_index not in journal.done_index_set and not self._is_done(move)
+        ]
+
+        self._logger.info(
+            f"Resuming {len(indexed_move_list)} of {len(journal.move_list)} moves"
+        )
+
+        moved_count = self._run_moves(indexed_move_list, record=True)
+        self._set_status(MoveJournalStatus.FINISHED)
+
+        return moved_count
+
+    def undo(self) -> int:
+        journal = self._load_journal()
+
+        if journal is None or journal.status == MoveJournalStatus.UNDONE:
+            self._logger.info("No moves to undo")
+            return 0
+
+        indexed_move_list = [
+            (
+                move_index,
+                Move(origin_path=move.target_path, target_path=move.origin_path),
+            )
+            for move_index, move in enumerate(journal.move_list)
+            if self._is_done(move)
+        ]
+
+        self._logger.info(
+            f"Undoing {len(indexed_move_list)} of {len(journal.move_list)} moves"
+        )
+
+        moved_count = self._run_moves(indexed_move_list, record=False)
+
+        # Only the folders created by the moves are removed, once empty
+        for folder_path in sorted(set(journal.created_folder_list), reverse=True):
+            try:
+                os.rmdir(folder_path)
+            except OSError:
+                pass
+
+        self._set_status(MoveJournalStatus.UNDONE)
+
+        return moved_count
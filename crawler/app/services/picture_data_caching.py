@@ -3,7 +3,7 @@ import logging
 from pathlib import Path
 from typing import Union
 
-from app.entities.picture_data import iPictureData
+from app.entities.picture_data import FileStat, iPictureData
 from app.repositories.picture_data import iPictureDataRepository
 
 
@@ -20,6 +20,10 @@ class iPictureDataCachingService(ABC):
     def add_to_cache(self, data: iPictureData) -> bool:
         pass
 
+    @abstractmethod
+    def flush(self) -> None:
+        pass
+
 
 class LocalFilePictureDataCachingService(iPictureDataCachingService):
     def __init__(self, picture_data_repo: iPictureDataRepository) -> None:
@@ -27,7 +31,25 @@ class LocalFilePictureDataCachingService(iPictureDataCachingService):
         self._logger = logging.getLogger("app.picture_id_service")
 
     def get_from_cache(self, picture_path: Path) -> Union[iPictureData | None]:
-        return self._picture_data_repo.get(picture_path)
+        picture_data = self._picture_data_repo.get(picture_path)
+
+        if picture_data is None:
+            return None
+
+        try:
+            file_stat = FileStat.from_path(picture_path)
+        except OSError:
+            return None
+
+        # Cached data is only valid if the file has not been replaced or modified
+        if picture_data.get_file_stat() != file_stat:
+            self._logger.debug(f"{picture_path} changed since it was cached")
+            return None
+
+        return picture_data
 
     def add_to_cache(self, data: iPictureData) -> bool:
         return self._picture_data_repo.record(data)
+
+    def flush(self) -> None:
+        self._picture_data_repo.flush()
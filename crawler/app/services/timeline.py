@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+from datetime import timezone
+import logging
+from pathlib import Path
+from typing import NamedTuple, Union
+
+from app.entities.picture_group import EventFolder
+from app.entities.picture_table import PictureTableBuilder
+from app.factories.picture_data import iPictureDataFactory
+from app.tools.file import iFileTools
+
+NOT_GROUPED_FOLDER_NAME = "NOT_GROUPED"
+# Folders of pictures too far from any event, <YEAR> OTHER
+OTHER_FOLDER_SUFFIX = " OTHER"
+
+
+class Timeline(NamedTuple):
+    event_list: list[EventFolder]
+    new_picture_path_list: list[Path]
+
+
+class iTimelineService(ABC):
+    @abstractmethod
+    def get_timeline(self) -> Timeline:
+        """Existing events and pictures waiting to be grouped"""
+        pass
+
+
+class TimelineService(iTimelineService):
+    """Events are <YEAR>/<EVENT> folders of the backup, their time span is read from
+    the standard names of their pictures. With the folder snapshot file tools, only
+    the folders changed since the last walk are listed again"""
+
+    def __init__(
+        self,
+        backup_folder_path: Path,
+        file_tools: iFileTools,
+        picture_data_factory: iPictureDataFactory,
+    ) -> None:
+        self._backup_folder_path = backup_folder_path
+        self._file_tools = file_tools
+        self._picture_data_factory = picture_data_factory
+
+        self._logger = logging.getLogger("app.timeline_service")
+
+    def _get_event_folder(
+        self, folder_path: Path, picture_path_list: list[Path]
+    ) -> Union[EventFolder, None]:
+        table_builder = PictureTableBuilder(current_timezone=timezone.utc)
+        self._picture_data_factory.add_standard_paths_to_table(
+            table_builder=table_builder, path_list=picture_path_list
+        )
+        timestamps = table_builder.build().get_timestamps()
+
+        if len(timestamps) == 0:
+            return None
+
+        return EventFolder(
+            folder_path=folder_path,
+            min_timestamp=int(timestamps.min()),
+            max_timestamp=int(timestamps.max()),
+            picture_count=len(timestamps),
+        )
+
+    def get_timeline(self) -> Timeline:
+        event_list: list[EventFolder] = []
+        new_picture_path_list: list[Path] = []
+
+        for folder_path, picture_path_list in self._file_tools.iter_folder_pictures(
+            self._backup_folder_path
+        ):
+            # Sub folders of the events are not events themselves
+            if len(folder_path.relative_to(self._backup_folder_path).parts) != 2:
+                continue
+
+            if folder_path.name == NOT_GROUPED_FOLDER_NAME:
+                new_picture_path_list.extend(picture_path_list)
+                continue
+
+            if folder_path.name.endswith(OTHER_FOLDER_SUFFIX):
+                continue
+
+            event_folder = self._get_event_folder(folder_path, picture_path_list)
+
+            if event_folder is not None:
+                event_list.append(event_folder)
+
+        self._logger.info(
+            f"Found {len(event_list)} event folders and {len(new_picture_path_list)} "
+            "pictures to group"
+        )
+
+        return Timeline(
+            event_list=event_list, new_picture_path_list=new_picture_path_list
+        )
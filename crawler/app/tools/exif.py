@@ -0,0 +1,163 @@
+import io
+from pathlib import Path
+import struct
+from typing import BinaryIO, NamedTuple, Union
+
+# The APP1 EXIF segment is expected within the first bytes of the file, right after
+# SOI and an optional APP0 (JFIF) segment
+EXIF_HEADER_MAX_OFFSET = 64 * 1024
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_MARKER_APP1 = 0xE1
+JPEG_MARKER_SOS = 0xDA
+JPEG_MARKER_EOI = 0xD9
+JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+
+EXIF_IDENTIFIER = b"Exif\x00\x00"
+
+TIFF_TYPE_ASCII = 2
+TIFF_TAG_EXIF_IFD_POINTER = 0x8769
+TIFF_TAG_DATE_TIME_ORIGINAL = 0x9003
+TIFF_TAG_OFFSET_TIME_ORIGINAL = 0x9011
+
+
+class ExifHeaderException(Exception):
+    pass
+
+
+class ExifDateTags(NamedTuple):
+    date_time_original: Union[str, None]
+    offset_time_original: Union[str, None]
+
+
+class ExifHeaderReader:
+    """Reads EXIF date tags from the JPEG APP1 segment without decoding the image"""
+
+    def __init__(self, max_offset: int = EXIF_HEADER_MAX_OFFSET) -> None:
+        self._max_offset = max_offset
+
+    def _read(self, file: BinaryIO, size: int) -> bytes:
+        data = file.read(size)
+
+        if len(data) != size:
+            raise ExifHeaderException("Unexpected end of file")
+
+        return data
+
+    def _read_exif_segment(self, file: BinaryIO) -> bytes:
+        if self._read(file, 2) != JPEG_SOI:
+            raise ExifHeaderException("Not a JPEG file")
+
+        while file.tell() < self._max_offset:
+            if self._read(file, 1) != b"\xff":
+                raise ExifHeaderException("Malformed JPEG marker")
+
+            marker = self._read(file, 1)[0]
+
+            if marker == 0xFF:
+                # Fill byte, the marker is the next byte
+                file.seek(-1, 1)
+                continue
+
+            if marker in JPEG_STANDALONE_MARKERS:
+                continue
+
+            if marker in (JPEG_MARKER_SOS, JPEG_MARKER_EOI):
+                raise ExifHeaderException("No EXIF segment before image data")
+
+            (segment_length,) = struct.unpack(">H", self._read(file, 2))
+
+            if segment_length < 2:
+                raise ExifHeaderException("Malformed JPEG segment length")
+
+            if marker == JPEG_MARKER_APP1:
+                segment = self._read(file, segment_length - 2)
+
+                if segment.startswith(EXIF_IDENTIFIER):
+                    return segment.removeprefix(EXIF_IDENTIFIER)
+            else:
+                file.seek(segment_length - 2, 1)
+
+        raise ExifHeaderException(f"No EXIF segment in first {self._max_offset} bytes")
+
+    def _read_ifd(self, tiff: bytes, byte_order: str, offset: int) -> dict[int, tuple]:
+        (entry_count,) = struct.unpack_from(f"{byte_order}H", tiff, offset)
+
+        entries = {}
+
+        for index in range(entry_count):
+            tag, value_type, count = struct.unpack_from(
+                f"{byte_order}HHI", tiff, offset + 2 + index * 12
+            )
+            entries[tag] = (value_type, count, offset + 2 + index * 12 + 8)
+
+        return entries
+
+    def _get_ascii(
+        self, tiff: bytes, byte_order: str, entries: dict[int, tuple], tag: int
+    ) -> Union[str, None]:
+        if tag not in entries:
+            return None
+
+        value_type, count, value_offset = entries[tag]
+
+        if value_type != TIFF_TYPE_ASCII:
+            raise ExifHeaderException(f"Unexpected type {value_type} for tag {tag}")
+
+        if count > 4:
+            (value_offset,) = struct.unpack_from(f"{byte_order}I", tiff, value_offset)
+
+        value_end = value_offset + count
+        value = tiff[value_offset:value_end]
+
+        if len(value) != count:
+            raise ExifHeaderException(f"Truncated value for tag {tag}")
+
+        return value.rstrip(b"\x00").decode("UTF-8")
+
+    def _parse_tiff(self, tiff: bytes) -> ExifDateTags:
+        if tiff[:2] == b"II":
+            byte_order = "<"
+        elif tiff[:2] == b"MM":
+            byte_order = ">"
+        else:
+            raise ExifHeaderException("Malformed TIFF header")
+
+        magic, ifd0_offset = struct.unpack_from(f"{byte_order}HI", tiff, 2)
+
+        if magic != 42:
+            raise ExifHeaderException("Malformed TIFF header")
+
+        ifd0 = self._read_ifd(tiff, byte_order, ifd0_offset)
+
+        if TIFF_TAG_EXIF_IFD_POINTER not in ifd0:
+            return ExifDateTags(date_time_original=None, offset_time_original=None)
+
+        (exif_ifd_offset,) = struct.unpack_from(
+            f"{byte_order}I", tiff, ifd0[TIFF_TAG_EXIF_IFD_POINTER][2]
+        )
+        exif_ifd = self._read_ifd(tiff, byte_order, exif_ifd_offset)
+
+        return ExifDateTags(
+            date_time_original=self._get_ascii(
+                tiff, byte_order, exif_ifd, TIFF_TAG_DATE_TIME_ORIGINAL
+            ),
+            offset_time_original=self._get_ascii(
+                tiff, byte_order, exif_ifd, TIFF_TAG_OFFSET_TIME_ORIGINAL
+            ),
+        )
+
+    def read_date_tags(
+        self, path: Path, content: Union[bytes, None] = None
+    ) -> ExifDateTags:
+        """Reads the file at path unless its content is given"""
+        try:
+            if content is None:
+                with open(path, "rb") as file:
+                    tiff = self._read_exif_segment(file)
+            else:
+                tiff = self._read_exif_segment(io.BytesIO(content))
+
+            return self._parse_tiff(tiff)
+        except (ExifHeaderException, OSError, struct.error, UnicodeDecodeError) as e:
+            raise ExifHeaderException(f"{path}: {e}")
@@ -1,6 +1,76 @@
 from abc import ABC, abstractmethod
+import contextlib
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from enum import Enum
+import errno
+import io
+import logging
 import os
 from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, NamedTuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, not available on Windows
+    fcntl = None  # type: ignore
+
+# Compared to lower case file names
+PICTURE_EXTENSIONS = (".jpg", ".jpeg")
+
+# Folders not walked when listing pictures, backup writes its debug logs in logs
+DEFAULT_PRUNED_FOLDER_NAMES = frozenset({"logs", ".Trashes", ".thumbnails"})
+
+# Fallback copy buffer size, memory use does not depend on the file size
+COPY_CHUNK_SIZE = 1024 * 1024
+# Bytes requested per copy_file_range or sendfile call
+KERNEL_COPY_SIZE = 64 * 1024 * 1024
+
+# linux/fs.h FICLONE ioctl, shares the data blocks of two files (btrfs, xfs)
+FICLONE = 0x40049409
+
+# Kernel copies fail with these when the file systems do not support them
+KERNEL_COPY_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+}
+
+
+class CopyMode(Enum):
+    COPY = "copy"
+    REFLINK = "reflink"
+    HARDLINK = "hardlink"
+
+
+class FolderListing(NamedTuple):
+    mtime_ns: int
+    picture_path_list: list[Path]
+    folder_path_list: list[Path]
+
+
+def is_picture_name(file_name: str) -> bool:
+    return file_name.lower().endswith(PICTURE_EXTENSIONS)
+
+
+def write_file_atomically(file_path: Path, write: Callable[[BinaryIO], object]) -> None:
+    """Written next to the file then renamed, an interrupted write leaves the
+    previous file untouched"""
+    temporary_file_path = file_path.with_name(f"{file_path.name}.tmp")
+
+    try:
+        with open(temporary_file_path, "wb") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary_file_path, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            temporary_file_path.unlink()
+
+        raise
 
 
 class iFileTools(ABC):
@@ -9,6 +79,36 @@ class iFileTools(ABC):
         """List all pictures in the given path"""
         pass
 
+    @abstractmethod
+    def iter_pictures(self, root_path: Path) -> Iterator[Path]:
+        """Yield pictures in the given path while walking it"""
+        pass
+
+    @abstractmethod
+    def iter_folder_pictures(
+        self, root_path: Path
+    ) -> Iterator[tuple[Path, list[Path]]]:
+        """Yield the given path and all its sub folders with the pictures directly
+        in them while walking it"""
+        pass
+
+    @abstractmethod
+    def list_folder(self, folder_path: Path) -> FolderListing:
+        """List pictures and sub folders directly in the given folder"""
+        pass
+
+    @abstractmethod
+    def copy_file(
+        self,
+        origin_path: Path,
+        target_path: Path,
+        copy_mode: CopyMode,
+        content: Union[bytes, None] = None,
+    ) -> CopyMode:
+        """Copy file to target path, returns the mode actually used. When given,
+        content is written instead of reading the origin file again"""
+        pass
+
     @abstractmethod
     def move_file(self, origin_path: Path, target_path: Path):
         """Move file from origin to target path"""
@@ -21,14 +121,221 @@ class iFileTools(ABC):
 
 
 class FileTools(iFileTools):
-    def __init__(self) -> None:
-        pass
+    def __init__(
+        self,
+        pruned_folder_names: Iterable[str] = DEFAULT_PRUNED_FOLDER_NAMES,
+        workers: int = 1,
+    ) -> None:
+        """With more than one worker, folders are listed in parallel threads which
+        helps on high latency file systems (NFS, SMB)"""
+        self._pruned_folder_names = frozenset(pruned_folder_names)
+        self._workers = workers
+
+        self._logger = logging.getLogger("app.file_tools")
+
+    def _scan_directory(self, folder_path: str) -> tuple[list[str], list[str]]:
+        picture_path_list: list[str] = []
+        folder_path_list: list[str] = []
+
+        try:
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    # Uses the entry type returned with the listing, without stat
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self._pruned_folder_names:
+                            folder_path_list.append(entry.path)
+                    elif is_picture_name(entry.name):
+                        picture_path_list.append(entry.path)
+        except OSError as e:
+            self._logger.warning(f"Skipping folder {folder_path}: {e}")
+
+        return picture_path_list, folder_path_list
+
+    def _walk_sequential(self, root_path: Path) -> Iterator[tuple[str, list[str]]]:
+        folder_path_stack = [os.fspath(root_path)]
+
+        while len(folder_path_stack) > 0:
+            folder_path = folder_path_stack.pop()
+            picture_path_list, folder_path_list = self._scan_directory(folder_path)
+
+            yield folder_path, picture_path_list
+
+            folder_path_stack.extend(folder_path_list)
+
+    def _walk_parallel(self, root_path: Path) -> Iterator[tuple[str, list[str]]]:
+        with ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix="file_tools"
+        ) as executor:
+            pending: dict[Future, str] = {}
+
+            def submit(folder_path: str) -> None:
+                pending[executor.submit(self._scan_directory, folder_path)] = (
+                    folder_path
+                )
+
+            submit(os.fspath(root_path))
+
+            while len(pending) > 0:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    folder_path = pending.pop(future)
+                    picture_path_list, folder_path_list = future.result()
+
+                    for sub_folder_path in folder_path_list:
+                        submit(sub_folder_path)
+
+                    yield folder_path, picture_path_list
+
+    def _walk(self, root_path: Path) -> Iterator[tuple[str, list[str]]]:
+        """Yields each folder with the pictures directly in it"""
+        if self._workers > 1:
+            return self._walk_parallel(root_path)
+
+        return self._walk_sequential(root_path)
+
+    def iter_pictures(self, root_path: Path) -> Iterator[Path]:
+        for _, picture_path_list in self._walk(root_path):
+            for picture_path in picture_path_list:
+                yield Path(picture_path)
+
+    def iter_folder_pictures(
+        self, root_path: Path
+    ) -> Iterator[tuple[Path, list[Path]]]:
+        for folder_path, picture_path_list in self._walk(root_path):
+            yield Path(folder_path), [Path(path) for path in picture_path_list]
 
     def list_pictures(self, root_path: Path) -> list[Path]:
-        small_case_jpg = [x for x in root_path.glob("**/*.jpg")]
-        capital_case_jpg = [x for x in root_path.glob("**/*.JPG")]
+        return list(self.iter_pictures(root_path))
+
+    def list_folder(self, folder_path: Path) -> FolderListing:
+        picture_path_list: list[Path] = []
+        folder_path_list: list[Path] = []
+
+        # Taken before listing, a change while listing shows on the next run
+        mtime_ns = os.stat(folder_path).st_mtime_ns
+
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                # Same policy as _scan_directory, only pruned folders are skipped
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in self._pruned_folder_names:
+                        folder_path_list.append(folder_path / entry.name)
+                elif is_picture_name(entry.name):
+                    picture_path_list.append(folder_path / entry.name)
+
+        return FolderListing(
+            mtime_ns=mtime_ns,
+            picture_path_list=picture_path_list,
+            folder_path_list=folder_path_list,
+        )
+
+    def _reflink(self, origin_file: BinaryIO, target_file: BinaryIO) -> bool:
+        if fcntl is None:
+            return False
+
+        try:
+            fcntl.ioctl(target_file.fileno(), FICLONE, origin_file.fileno())
+        except OSError:
+            return False
+
+        return True
+
+    def _copy_file_range(self, origin_fd: int, target_fd: int, offset: int) -> int:
+        return os.copy_file_range(
+            origin_fd, target_fd, KERNEL_COPY_SIZE, offset, offset
+        )
+
+    def _sendfile(self, origin_fd: int, target_fd: int, offset: int) -> int:
+        # sendfile writes at the current position of the target
+        os.lseek(target_fd, offset, os.SEEK_SET)
+        return os.sendfile(target_fd, origin_fd, offset, KERNEL_COPY_SIZE)
+
+    def _get_kernel_copy_list(self) -> list[Callable[[int, int, int], int]]:
+        kernel_copy_list: list[Callable[[int, int, int], int]] = []
+
+        if hasattr(os, "copy_file_range"):
+            kernel_copy_list.append(self._copy_file_range)
+
+        if hasattr(os, "sendfile"):
+            kernel_copy_list.append(self._sendfile)
+
+        return kernel_copy_list
+
+    def _copy_content(
+        self, origin_file: io.BufferedReader, target_file: io.BufferedWriter
+    ) -> None:
+        origin_fd = origin_file.fileno()
+        target_fd = target_file.fileno()
+        size = os.fstat(origin_fd).st_size
+        offset = 0
+
+        # The data does not go through Python, each method carries on from the
+        # offset where the previous one stopped
+        for kernel_copy in self._get_kernel_copy_list():
+            try:
+                while offset < size:
+                    copied = kernel_copy(origin_fd, target_fd, offset)
+
+                    if copied == 0:
+                        break
+
+                    offset += copied
+            except OSError as e:
+                if e.errno not in KERNEL_COPY_UNSUPPORTED_ERRNOS:
+                    raise
+
+            if offset >= size:
+                return
+
+        origin_file.seek(offset)
+        target_file.seek(offset)
+
+        buffer = bytearray(COPY_CHUNK_SIZE)
+        view = memoryview(buffer)
+
+        while True:
+            read_size = origin_file.readinto(buffer)
+
+            if not read_size:
+                return
+
+            target_file.write(view[:read_size])
+
+    def copy_file(
+        self,
+        origin_path: Path,
+        target_path: Path,
+        copy_mode: CopyMode,
+        content: Union[bytes, None] = None,
+    ) -> CopyMode:
+        if copy_mode == CopyMode.HARDLINK:
+            try:
+                os.link(origin_path, target_path)
+                return CopyMode.HARDLINK
+            except OSError:
+                # Not on the same file system, or links are not supported
+                pass
+
+        if content is not None and copy_mode != CopyMode.REFLINK:
+            with open(target_path, "wb") as target_file:
+                target_file.write(content)
+
+            return CopyMode.COPY
+
+        with open(origin_path, "rb") as origin_file:
+            with open(target_path, "wb") as target_file:
+                if copy_mode == CopyMode.REFLINK and self._reflink(
+                    origin_file, target_file
+                ):
+                    return CopyMode.REFLINK
+
+                if content is not None:
+                    target_file.write(content)
+                else:
+                    self._copy_content(origin_file, target_file)
 
-        return [*small_case_jpg, *capital_case_jpg]
+        return CopyMode.COPY
 
     def move_file(self, origin_path: Path, target_path: Path):
         if not target_path.parent.exists():
@@ -0,0 +1,13 @@
+import signal
+import sys
+
+
+def install_exit_signal_handlers() -> None:
+    """Exit on termination signals so that finally blocks and atexit run"""
+
+    def exit_on_signal(signum, frame):
+        sys.exit(128 + signum)
+
+    for signal_name in ["SIGTERM", "SIGHUP"]:
+        if hasattr(signal, signal_name):
+            signal.signal(getattr(signal, signal_name), exit_on_signal)
@@ -1,20 +1,60 @@
 from abc import ABC
+from collections.abc import Sized
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import timezone
+from enum import Enum
+from functools import partial
 import logging
 from progressbar import ProgressBar
 from pathlib import Path
+import queue
+import threading
+from typing import Any, Iterable, Iterator, Union
 from app.services.backup import LocalFileBackupService, iBackupService
+from app.services.folder_snapshot import folder_snapshot_file_tools_factory
 from app.services.picture_data_caching import (
     LocalFilePictureDataCachingService,
     iPictureDataCachingService,
 )
-from app.repositories.picture_data import PictureDataRepository
+from app.repositories.near_duplicate_index import (
+    NEAR_DUPLICATE_INDEX_FILE_NAME,
+    NearDuplicateIndexRepository,
+)
+from app.repositories.picture_data import (
+    DEFAULT_FLUSH_COUNT,
+    DEFAULT_FLUSH_INTERVAL,
+    picture_data_repository_factory,
+)
+from app.entities.picture_data import (
+    ALL_PICTURE_DATA_FIELDS,
+    PictureDataField,
+    PictureFile,
+    iPictureData,
+)
 from app.entities.picture import PictureException
 from app.factories.picture_data import PictureDataFactory, iPictureDataFactory
-from app.tools.file import FileTools, iFileTools
+from app.tools.file import CopyMode, iFileTools
+
+# Files read ahead of the writer stage for each worker of the pool
+PIPELINE_IN_FLIGHT_PER_WORKER = 2
+# Paths discovered ahead of the writer stage, the walk waits beyond it
+PIPELINE_DISCOVERED_COUNT = 1000
+
+# Path, future of its picture data and content read by the reader stage
+PipelineResult = tuple[Path, Future, Union[PictureFile, None]]
+
+
+class PipelineEvent(Enum):
+    DISCOVERED = "discovered"
+    COMPUTED = "computed"
+    DISCOVERY_DONE = "discovery_done"
 
 
 class baseUseCase(ABC):
+    # Fields of the computed picture data the use case relies on, the other ones
+    # are only computed if accessed
+    _picture_data_fields: tuple[PictureDataField, ...] = ALL_PICTURE_DATA_FIELDS
+
     def __init__(
         self, file_tools: iFileTools, picture_data_factory: iPictureDataFactory
     ):
@@ -29,6 +69,30 @@ class baseUseCase(ABC):
 
         return picture_list
 
+    def iter_pictures(self, root_path: Path) -> Iterator[Path]:
+        """Yields pictures while the folders are walked, so they can be processed
+        before the walk ends"""
+        self._logger.info(f"Listing pictures in {root_path}")
+        picture_count = 0
+
+        for picture_path in self._file_tools.iter_pictures(root_path=root_path):
+            picture_count = picture_count + 1
+            yield picture_path
+
+        self._logger.info(f"Found {picture_count} pictures")
+
+    def _start_progress_bar(self, pictures: Iterable[Path]) -> ProgressBar:
+        """Open ended while the pictures are still being discovered"""
+        # None leaves the progress bar open ended
+        max_value: Union[int, None] = (
+            len(pictures) if isinstance(pictures, Sized) else None
+        )
+
+        progress_bar = ProgressBar()
+        progress_bar.start(max_value=max_value)
+
+        return progress_bar
+
 
 class BackupUseCase(baseUseCase):
     def __init__(
@@ -45,49 +109,324 @@ class BackupUseCase(baseUseCase):
         self._backup_service = backup_service
         self._picture_data_caching_service = picture_data_caching_service
 
-    def _backup_picture(self, picture_path: Path, strict_mode: bool) -> bool:
-        picture_data = None
+    def _get_cached_data(
+        self, picture_path: Path, strict_mode: bool
+    ) -> Union[iPictureData, None]:
+        if strict_mode:
+            return None
+
+        return self._picture_data_caching_service.get_from_cache(
+            picture_path=picture_path
+        )
+
+    def _compute_picture_data(
+        self, picture_path: Path, picture_file: Union[PictureFile, None] = None
+    ) -> iPictureData:
+        self._logger.debug(f"Computing picture data for {picture_path}")
+        return self._picture_data_factory.compute_data(
+            path=picture_path,
+            current_timezone=timezone.utc,
+            fields=self._picture_data_fields,
+            picture_file=picture_file,
+        )
+
+    def _backup_computed_picture(
+        self,
+        picture_path: Path,
+        picture_data_future: Future,
+        picture_file: Union[PictureFile, None],
+    ) -> bool:
+        try:
+            picture_data = picture_data_future.result()
+        except PictureException as e:
+            self._logger.warning(
+                f"Failed to compute picture id for {picture_path}: {e}"
+            )
+            return False
+
+        assert picture_file is not None
+
+        self._picture_data_caching_service.add_to_cache(data=picture_data)
+
+        return self._backup_service.backup(
+            origin_path=picture_path, data=picture_data, content=picture_file.content
+        )
+
+    def _discover_pictures(
+        self,
+        picture_paths: Iterable[Path],
+        event_queue: "queue.Queue[tuple[PipelineEvent, Any]]",
+        discovered: threading.Semaphore,
+        stop_event: threading.Event,
+    ) -> None:
+        """Discovery stage, walks the folders while pictures are processed"""
+        error: Union[Exception, None] = None
 
-        if not strict_mode:
-            picture_data = self._picture_data_caching_service.get_from_cache(
-                picture_path=picture_path
+        try:
+            for picture_path in picture_paths:
+                # Released by the writer, caps the number of paths held in memory
+                discovered.acquire()
+
+                if stop_event.is_set():
+                    return
+
+                event_queue.put((PipelineEvent.DISCOVERED, picture_path))
+        except Exception as e:
+            # Raised in the writer stage
+            error = e
+        finally:
+            event_queue.put((PipelineEvent.DISCOVERY_DONE, error))
+
+    def _read_pictures(
+        self,
+        read_queue: "queue.Queue[Union[Path, None]]",
+        executor: ThreadPoolExecutor,
+        event_queue: "queue.Queue[tuple[PipelineEvent, Any]]",
+        in_flight: threading.Semaphore,
+        stop_event: threading.Event,
+    ) -> None:
+        """Reader stage, reads each file then hands its content to the pool"""
+
+        def put_computed(
+            picture_path: Path, picture_file: PictureFile, done: Future
+        ) -> None:
+            event_queue.put(
+                (PipelineEvent.COMPUTED, (picture_path, done, picture_file))
             )
 
-        if picture_data is None:
+        while True:
+            picture_path = read_queue.get()
+
+            if picture_path is None:
+                return
+
+            # Released by the writer, caps the number of files held in memory
+            in_flight.acquire()
+
+            if stop_event.is_set():
+                return
+
             try:
-                self._logger.debug(f"Computing picture data for {picture_path}")
-                picture_data = self._picture_data_factory.compute_data(
-                    path=picture_path, current_timezone=timezone.utc
+                picture_file = self._picture_data_factory.read_picture_file(
+                    picture_path
                 )
-                self._picture_data_caching_service.add_to_cache(data=picture_data)
-            except PictureException as e:
-                self._logger.warning(
-                    f"Failed to compute picture id for {picture_path}: {e}"
-                )
-                return False
+            except Exception as e:
+                # Raised in the writer stage when it gets the result
+                future: Future = Future()
+                future.set_exception(e)
+                event_queue.put((PipelineEvent.COMPUTED, (picture_path, future, None)))
+                continue
 
-        return self._backup_service.backup(origin_path=picture_path, data=picture_data)
+            future = executor.submit(
+                self._compute_picture_data,
+                picture_path=picture_path,
+                picture_file=picture_file,
+            )
+            # The content is kept for the writer, the file is not read again to
+            # be copied
+            future.add_done_callback(partial(put_computed, picture_path, picture_file))
 
-    def backup(
-        self, picture_list_to_backup: list[Path], strict_mode: bool = False
-    ) -> int:
-        self._logger.info(f"Starting backup of {len(picture_list_to_backup)} pictures")
-        if strict_mode:
-            self._logger.info("Strict mode is enabled, all ids will be recomputed")
+    def _backup_picture(self, picture_path: Path, strict_mode: bool) -> bool:
+        picture_data = self._get_cached_data(
+            picture_path=picture_path, strict_mode=strict_mode
+        )
 
-        progress_bar = ProgressBar()
-        progress_bar.start(max_value=len(picture_list_to_backup))
-        progress_bar_count = 0
+        if picture_data is not None:
+            return self._backup_service.backup(
+                origin_path=picture_path, data=picture_data
+            )
+
+        try:
+            # Read once, the content is used to compute the data and to copy
+            picture_file = self._picture_data_factory.read_picture_file(picture_path)
+            picture_data = self._compute_picture_data(
+                picture_path=picture_path, picture_file=picture_file
+            )
+            self._picture_data_caching_service.add_to_cache(data=picture_data)
+        except PictureException as e:
+            self._logger.warning(
+                f"Failed to compute picture id for {picture_path}: {e}"
+            )
+            return False
+
+        return self._backup_service.backup(
+            origin_path=picture_path, data=picture_data, content=picture_file.content
+        )
 
+    def _backup_sequential(
+        self,
+        picture_paths: Iterable[Path],
+        strict_mode: bool,
+        progress_bar: ProgressBar,
+    ) -> int:
         new_picture_count = 0
+        progress_bar_count = 0
 
-        for picture_path in picture_list_to_backup:
+        for picture_path in picture_paths:
             if self._backup_picture(picture_path=picture_path, strict_mode=strict_mode):
                 new_picture_count = new_picture_count + 1
 
             progress_bar_count = progress_bar_count + 1
             progress_bar.update(progress_bar_count)
 
+        # The pictures are all discovered, the progress bar can be completed
+        progress_bar.max_value = progress_bar_count
+
+        return new_picture_count
+
+    def _backup_parallel(
+        self,
+        picture_paths: Iterable[Path],
+        strict_mode: bool,
+        progress_bar: ProgressBar,
+        workers: int,
+    ) -> int:
+        # Pipeline of a discovery thread walking the folders, a reader thread, a
+        # pool computing picture data from the read content and this thread as the
+        # single writer. Cache lookups, cache records and copies stay in this
+        # thread so the cache and the hash set stay consistent
+        new_picture_count = 0
+        progress_bar_count = 0
+        discovered_count = 0
+        pending_count = 0
+        discovery_done = False
+
+        event_queue: "queue.Queue[tuple[PipelineEvent, Any]]" = queue.Queue()
+        read_queue: "queue.Queue[Union[Path, None]]" = queue.Queue()
+        discovered = threading.Semaphore(PIPELINE_DISCOVERED_COUNT)
+        in_flight_count = PIPELINE_IN_FLIGHT_PER_WORKER * workers
+        in_flight = threading.Semaphore(in_flight_count)
+        stop_event = threading.Event()
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="picture_data"
+        ) as executor:
+            thread_list = [
+                threading.Thread(
+                    target=self._discover_pictures,
+                    name="picture_discovery",
+                    kwargs={
+                        "picture_paths": picture_paths,
+                        "event_queue": event_queue,
+                        "discovered": discovered,
+                        "stop_event": stop_event,
+                    },
+                    daemon=True,
+                ),
+                threading.Thread(
+                    target=self._read_pictures,
+                    name="picture_reader",
+                    kwargs={
+                        "read_queue": read_queue,
+                        "executor": executor,
+                        "event_queue": event_queue,
+                        "in_flight": in_flight,
+                        "stop_event": stop_event,
+                    },
+                    daemon=True,
+                ),
+            ]
+
+            for thread in thread_list:
+                thread.start()
+
+            try:
+                while not discovery_done or pending_count > 0:
+                    event, value = event_queue.get()
+
+                    if event == PipelineEvent.DISCOVERY_DONE:
+                        if value is not None:
+                            raise value
+
+                        discovery_done = True
+                        progress_bar.max_value = discovered_count
+                        continue
+
+                    if event == PipelineEvent.DISCOVERED:
+                        discovered_count = discovered_count + 1
+                        picture_data = self._get_cached_data(
+                            picture_path=value, strict_mode=strict_mode
+                        )
+
+                        if picture_data is None:
+                            read_queue.put(value)
+                            pending_count = pending_count + 1
+                            continue
+
+                        is_new = self._backup_service.backup(
+                            origin_path=value, data=picture_data
+                        )
+                    else:
+                        picture_path, future, picture_file = value
+                        is_new = self._backup_computed_picture(
+                            picture_path=picture_path,
+                            picture_data_future=future,
+                            picture_file=picture_file,
+                        )
+
+                        # Released once copied, the content is no longer needed
+                        del value, picture_file
+                        in_flight.release()
+                        pending_count = pending_count - 1
+
+                    discovered.release()
+
+                    if is_new:
+                        new_picture_count = new_picture_count + 1
+
+                    progress_bar_count = progress_bar_count + 1
+                    progress_bar.update(progress_bar_count)
+            finally:
+                # Unblocks the other stages if the writer stopped on an error
+                stop_event.set()
+                discovered.release(PIPELINE_DISCOVERED_COUNT)
+                in_flight.release(in_flight_count)
+                read_queue.put(None)
+
+                for thread in thread_list:
+                    thread.join()
+
+        return new_picture_count
+
+    def backup(
+        self,
+        picture_list_to_backup: Iterable[Path],
+        strict_mode: bool = False,
+        workers: int = 1,
+    ) -> int:
+        """Pictures can be given as a generator, they are backed up while it is
+        consumed"""
+        if isinstance(picture_list_to_backup, Sized):
+            self._logger.info(
+                f"Starting backup of {len(picture_list_to_backup)} pictures"
+            )
+        else:
+            self._logger.info("Starting backup of pictures as they are found")
+
+        if strict_mode:
+            self._logger.info("Strict mode is enabled, all ids will be recomputed")
+
+        progress_bar = self._start_progress_bar(picture_list_to_backup)
+
+        try:
+            if workers > 1:
+                self._logger.info(f"Computing picture data with {workers} workers")
+                new_picture_count = self._backup_parallel(
+                    picture_paths=picture_list_to_backup,
+                    strict_mode=strict_mode,
+                    progress_bar=progress_bar,
+                    workers=workers,
+                )
+            else:
+                new_picture_count = self._backup_sequential(
+                    picture_paths=picture_list_to_backup,
+                    strict_mode=strict_mode,
+                    progress_bar=progress_bar,
+                )
+        finally:
+            self._picture_data_caching_service.flush()
+            self._backup_service.flush()
+
         progress_bar.finish()
 
         self._logger.info(
@@ -97,18 +436,40 @@ class BackupUseCase(baseUseCase):
         return new_picture_count
 
 
-def backup_use_case_factory(backup_folder_path: Path) -> BackupUseCase:
-    picture_data_repo = PictureDataRepository(
-        cache_file_path=Path(f"{backup_folder_path}/cache.jsonl")
+def backup_use_case_factory(
+    backup_folder_path: Path,
+    fast_hash: bool = False,
+    cache_flush_count: int = DEFAULT_FLUSH_COUNT,
+    cache_flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    cache_fsync: bool = False,
+    rebuild_snapshot: bool = False,
+    copy_mode: CopyMode = CopyMode.COPY,
+    scan_workers: int = 1,
+    tolerance: int = 0,
+) -> BackupUseCase:
+    picture_data_repo = picture_data_repository_factory(
+        backup_folder_path=backup_folder_path,
+        flush_count=cache_flush_count,
+        flush_interval=cache_flush_interval,
+        fsync=cache_fsync,
+        indexed=True,
     )
 
-    picture_data_factory = PictureDataFactory()
-    file_tools = FileTools()
+    picture_data_factory = PictureDataFactory(fast_hash=fast_hash)
+    # The backup folder is listed from its snapshot, the target one is walked
+    file_tools = folder_snapshot_file_tools_factory(
+        backup_folder_path, workers=scan_workers, rebuild_snapshot=rebuild_snapshot
+    )
 
     file_service = LocalFileBackupService(
         backup_folder_path=backup_folder_path,
         picture_data_factory=picture_data_factory,
         file_tools=file_tools,
+        copy_mode=copy_mode,
+        tolerance=tolerance,
+        near_duplicate_index_repository=NearDuplicateIndexRepository(
+            backup_folder_path / NEAR_DUPLICATE_INDEX_FILE_NAME
+        ),
     )
     picture_id_service = LocalFilePictureDataCachingService(
         picture_data_repo=picture_data_repo
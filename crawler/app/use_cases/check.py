@@ -1,55 +1,103 @@
 from datetime import timezone
 from pathlib import Path
-
-from progressbar import ProgressBar
-
+from typing import Iterable, Union
+
+from app.entities.near_duplicate_index import NearDuplicateIndex
+from app.entities.picture_data import PictureDataField
+from app.entities.picture_table import (
+    PictureTable,
+    PictureTableBuilder,
+    PictureTableException,
+    hash_to_int,
+)
 from app.factories.picture_data import PictureDataFactory, iPictureDataFactory
+from app.services.folder_snapshot import folder_snapshot_file_tools_factory
 from app.tools.file import FileTools, iFileTools
 from app.use_cases.backup import baseUseCase
 
 
 class CheckUseCase(baseUseCase):
+    _picture_data_fields = (PictureDataField.HASH,)
+
     def __init__(
-        self, file_tools: iFileTools, picture_data_factory: iPictureDataFactory
+        self,
+        file_tools: iFileTools,
+        picture_data_factory: iPictureDataFactory,
+        tolerance: int = 0,
     ):
+        """With a tolerance, pictures whose hash differs by at most that many bits
+        from a backed up one are considered backed up"""
         super().__init__(
             file_tools=file_tools, picture_data_factory=picture_data_factory
         )
+        self._tolerance = tolerance
+
+    def _is_backed_up(
+        self,
+        picture_hash: str,
+        backup_table: PictureTable,
+        near_duplicate_index: Union[NearDuplicateIndex, None],
+    ) -> bool:
+        if backup_table.contains_hash(picture_hash):
+            return True
+
+        if near_duplicate_index is None:
+            return False
+
+        try:
+            return near_duplicate_index.contains(
+                hash_to_int(picture_hash), self._tolerance
+            )
+        except PictureTableException:
+            return False
 
     def check_pictures(
         self,
-        backup_list: list[Path],
-        picture_list: list[Path],
+        backup_list: Iterable[Path],
+        picture_list: Iterable[Path],
         current_timezone=timezone.utc,
     ) -> int:
-        hash_set = set()
+        """Both lists can be given as generators, they are consumed once"""
+        self._logger.info("Indexing already backuped up pictures")
 
-        self._logger.info(f"Indexing {len(backup_list)} already backuped up pictures")
-        for backup_path in backup_list:
-            try:
-                picture_data = self._picture_data_factory.from_standard_path(
-                    path=backup_path, current_timezone=current_timezone
-                )
-                hash_set.add(picture_data.get_hash())
-            except Exception as e:
-                self._logger.debug(f"Error processing {backup_path}: {e}")
+        table_builder = PictureTableBuilder(current_timezone=current_timezone)
+
+        not_standard_path_list = self._picture_data_factory.add_standard_paths_to_table(
+            table_builder=table_builder, path_list=backup_list
+        )
+
+        for backup_path in not_standard_path_list:
+            self._logger.debug(f"Error processing {backup_path}: not a standard name")
 
-        self._logger.info(f"Found {len(hash_set)} unique hashes in backup list")
+        backup_table = table_builder.build()
 
-        self._logger.info(f"Checking {len(picture_list)} pictures against backup list")
+        self._logger.info(f"Indexed {len(backup_table)} backed up pictures")
+        unique_hash_count = len(backup_table.get_unique_hashes())
+        self._logger.info(f"Found {unique_hash_count} unique hashes in backup list")
+
+        near_duplicate_index = (
+            NearDuplicateIndex(backup_table.get_unique_hashes())
+            if self._tolerance > 0
+            else None
+        )
+
+        self._logger.info("Checking pictures against backup list")
 
         not_in_backup_count = 0
 
-        progress_bar = ProgressBar()
-        progress_bar.start(max_value=len(picture_list))
+        progress_bar = self._start_progress_bar(picture_list)
         progress_bar_count = 0
 
         for picture_path in picture_list:
             try:
                 picture_data = self._picture_data_factory.compute_data(
-                    path=picture_path, current_timezone=current_timezone
+                    path=picture_path,
+                    current_timezone=current_timezone,
+                    fields=self._picture_data_fields,
                 )
-                if picture_data.get_hash() not in hash_set:
+                if not self._is_backed_up(
+                    picture_data.get_hash(), backup_table, near_duplicate_index
+                ):
                     self._logger.info(f"Picture {picture_path} has not been backed up")
                     not_in_backup_count += 1
             except Exception as e:
@@ -67,10 +115,21 @@ class CheckUseCase(baseUseCase):
             self._logger.info("All pictures have been backed up")
 
 
-def check_use_case_factory() -> CheckUseCase:
-    picture_data_factory = PictureDataFactory()
-    file_tools = FileTools()
+def check_use_case_factory(
+    fast_hash: bool = False,
+    backup_folder_path: Union[Path, None] = None,
+    tolerance: int = 0,
+) -> CheckUseCase:
+    picture_data_factory = PictureDataFactory(fast_hash=fast_hash)
+    # Folders of the backup are listed from a snapshot when it is given
+    file_tools = (
+        FileTools()
+        if backup_folder_path is None
+        else folder_snapshot_file_tools_factory(backup_folder_path)
+    )
 
     return CheckUseCase(
-        file_tools=file_tools, picture_data_factory=picture_data_factory
+        file_tools=file_tools,
+        picture_data_factory=picture_data_factory,
+        tolerance=tolerance,
     )
@@ -1,88 +1,164 @@
 from datetime import timezone
 from pathlib import Path
-
-from app.entities.picture_data import iPictureData
+from typing import Iterable, Union
+
+from app.entities.picture_data import PictureDataField
+from app.entities.picture_group import iPictureGroup
+from app.entities.picture_table import PictureTable, PictureTableBuilder
+from app.repositories.move_journal import (
+    MOVE_JOURNAL_FILE_NAME,
+    Move,
+    MoveJournalRepository,
+)
 from app.tools.file import FileTools, iFileTools
 from app.use_cases.backup import baseUseCase
+from app.services.folder_snapshot import folder_snapshot_file_tools_factory
 from app.services.group_creator import GroupCreatorService, iGroupCreatorService
-from app.factories.picture_data import (
-    NotStandardFileNameException,
-    PictureDataFactory,
-    iPictureDataFactory,
-)
+from app.services.move_planner import MovePlannerService, iMovePlannerService
+from app.services.timeline import TimelineService, iTimelineService
+from app.factories.picture_data import PictureDataFactory, iPictureDataFactory
 from app.entities.picture import PictureException
 
 
 class GroupUseCase(baseUseCase):
+    _picture_data_fields = (PictureDataField.CREATION_DATE,)
+
     def __init__(
         self,
         file_tools: iFileTools,
         picture_data_factory: iPictureDataFactory,
         group_creator_service: iGroupCreatorService,
+        move_planner_service: iMovePlannerService,
+        timeline_service: Union[iTimelineService, None] = None,
     ):
         super().__init__(
             file_tools=file_tools, picture_data_factory=picture_data_factory
         )
 
         self._group_creator_service = group_creator_service
+        self._move_planner_service = move_planner_service
+        self._timeline_service = timeline_service
 
-    def group(self, picture_list: list[Path]):
-        picture_data_list: list[iPictureData] = []
+    def _build_picture_table(self, picture_list: Iterable[Path]) -> PictureTable:
+        table_builder = PictureTableBuilder(current_timezone=timezone.utc)
 
-        for picture_path in picture_list:
+        not_standard_path_list = self._picture_data_factory.add_standard_paths_to_table(
+            table_builder=table_builder, path_list=picture_list
+        )
+
+        for picture_path in not_standard_path_list:
+            self._logger.warning(f"Found non standard path for picture {picture_path}")
             try:
-                picture_data = self._picture_data_factory.from_standard_path(
-                    path=picture_path, current_timezone=timezone.utc
+                picture_data = self._picture_data_factory.compute_data(
+                    path=picture_path,
+                    current_timezone=timezone.utc,
+                    fields=self._picture_data_fields,
                 )
-                picture_data_list.append(picture_data)
-            except NotStandardFileNameException as e:
+
+                table_builder.add_picture_data(picture_data, with_hash=False)
+            except PictureException as e:
                 self._logger.warning(
-                    f"Found non standard path for picture {picture_path}: {e}"
+                    f"Failed to compute picture id for {picture_path}: {e}"
                 )
-                try:
-                    picture_data = self._picture_data_factory.compute_data(
-                        path=picture_path, current_timezone=timezone.utc
-                    )
 
-                    picture_data_list.append(picture_data)
-                except PictureException as e:
-                    self._logger.warning(
-                        f"Failed to compute picture id for {picture_path}: {e}"
-                    )
+        picture_table = table_builder.build()
 
-        self._logger.info(f"Found {len(picture_data_list)} to be analyzed for grouping")
+        self._logger.info(f"Found {len(picture_table)} to be analyzed for grouping")
 
-        picture_group_list = self._group_creator_service.get_group_list_from_time(
-            picture_list=picture_data_list
-        )
+        return picture_table
 
-        pictures_to_move: list[tuple[Path, Path]] = []
+    def _move_pictures(self, picture_group_list: list[iPictureGroup]) -> None:
+        pictures_to_move: list[Move] = []
 
         for group in picture_group_list:
-            pictures_to_move.extend(group.list_pictures_to_move())
+            pictures_to_move.extend(
+                Move(origin_path=origin_path, target_path=target_path)
+                for origin_path, target_path in group.list_pictures_to_move()
+            )
 
         self._logger.info(
             f"Found {len(pictures_to_move)} pictures that need to be moved"
         )
 
-        for picture in pictures_to_move:
-            self._file_tools.move_file(origin_path=picture[0], target_path=picture[1])
+        moved_count = self._move_planner_service.move(pictures_to_move)
+
+        self._logger.info(f"Grouping completed, {moved_count} pictures moved")
+
+    def group(self, picture_list: Iterable[Path]):
+        picture_table = self._build_picture_table(picture_list)
+
+        picture_group_list = self._group_creator_service.get_table_group_list_from_time(
+            picture_table=picture_table
+        )
+
+        self._move_pictures(picture_group_list)
 
-        self._logger.info("Grouping completed")
+    def group_incremental(self):
+        """Only groups NOT_GROUPED pictures, joining them to the existing events
+        close enough in time"""
+        if self._timeline_service is None:
+            raise Exception("Incremental grouping needs the backup folder")
+
+        timeline = self._timeline_service.get_timeline()
+
+        picture_table = self._build_picture_table(timeline.new_picture_path_list)
+
+        picture_group_list = (
+            self._group_creator_service.get_table_group_list_incremental(
+                picture_table=picture_table, event_list=timeline.event_list
+            )
+        )
+
+        self._move_pictures(picture_group_list)
+
+    def resume(self) -> None:
+        moved_count = self._move_planner_service.resume()
+
+        self._logger.info(f"Grouping resumed, {moved_count} pictures moved")
+
+    def undo(self) -> None:
+        moved_count = self._move_planner_service.undo()
+
+        self._logger.info(f"Grouping undone, {moved_count} pictures moved back")
 
 
 def group_use_case_factory(
-    hours_btw_pictures: int, minimun_group_size: int
+    hours_btw_pictures: int,
+    minimun_group_size: int,
+    backup_folder_path: Union[Path, None] = None,
 ) -> GroupUseCase:
     picture_data_factory = PictureDataFactory()
-    file_tools = FileTools()
+    # Folders of the backup are listed from a snapshot when it is given
+    file_tools = (
+        FileTools()
+        if backup_folder_path is None
+        else folder_snapshot_file_tools_factory(backup_folder_path)
+    )
 
     group_creator_service = GroupCreatorService(
         hours_btw_picture=hours_btw_pictures, minimum_group_size=minimun_group_size
     )
 
+    if backup_folder_path is None:
+        move_planner_service = MovePlannerService()
+        timeline_service = None
+    else:
+        # Moves are journaled in the backup folder so they can be resumed or undone
+        move_planner_service = MovePlannerService(
+            move_journal_repository=MoveJournalRepository(
+                backup_folder_path / MOVE_JOURNAL_FILE_NAME
+            )
+        )
+        timeline_service = TimelineService(
+            backup_folder_path=backup_folder_path,
+            file_tools=file_tools,
+            picture_data_factory=picture_data_factory,
+        )
+
     return GroupUseCase(
         file_tools=file_tools,
         picture_data_factory=picture_data_factory,
         group_creator_service=group_creator_service,
+        move_planner_service=move_planner_service,
+        timeline_service=timeline_service,
     )
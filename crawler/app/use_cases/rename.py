@@ -1,11 +1,17 @@
 from datetime import timezone
 from pathlib import Path
+from typing import Iterable, Iterator
 from app.use_cases.backup import baseUseCase
-from app.repositories.picture_data import PictureDataRepository, iPictureDataRepository
+from app.repositories.folder_name_index import (
+    folder_name_index_repository_factory,
+    iFolderNameIndexRepository,
+)
 from app.services.group_creator import GroupCreatorService, iGroupCreatorService
-from app.entities.picture_data import iPictureData
+from app.entities.picture_group import EVENT_DESCRIPTION_FOLDER_PATTERN
+from app.entities.picture_table import PictureTableBuilder
 from app.factories.picture_data import PictureDataFactory, iPictureDataFactory
-from app.tools.file import FileTools, iFileTools
+from app.services.folder_snapshot import folder_snapshot_file_tools_factory
+from app.tools.file import iFileTools
 
 
 class RenameUseCase(baseUseCase):
@@ -13,42 +19,61 @@ class RenameUseCase(baseUseCase):
         self,
         file_tools: iFileTools,
         picture_data_factory: iPictureDataFactory,
-        picture_repository: iPictureDataRepository,
+        folder_name_index: iFolderNameIndexRepository,
         group_creator_service: iGroupCreatorService,
     ):
         super().__init__(
             file_tools=file_tools, picture_data_factory=picture_data_factory
         )
-        self._picture_data_repository = picture_repository
+        self._folder_name_index = folder_name_index
         self._group_creator_service = group_creator_service
 
-    def rename_folders(
-        self, picture_path_list: list[Path], dry_run=False, verbose=False
-    ) -> None:
+    def iter_candidate_pictures(self, root_path: Path) -> Iterator[Path]:
+        """Pictures of the folders that can be renamed, the pictures of the other
+        folders are not parsed"""
+        folder_count = 0
+        candidate_folder_count = 0
+
+        for folder_path, picture_path_list in self._file_tools.iter_folder_pictures(
+            root_path
+        ):
+            folder_count += 1
+
+            if EVENT_DESCRIPTION_FOLDER_PATTERN.match(folder_path.name) is None:
+                continue
+
+            candidate_folder_count += 1
+
+            yield from picture_path_list
+
         self._logger.info(
-            f"Extracting picture data from {len(picture_path_list)} pictures"
+            f"Found {candidate_folder_count} folders to rename out of {folder_count}"
         )
 
+    def rename_folders(
+        self, picture_path_list: Iterable[Path], dry_run=False, verbose=False
+    ) -> None:
+        self._logger.info("Extracting picture data from file names")
+
         if verbose:
             self._logger.info("VERBOSE MODE ENABLED, showing details of each rename")
 
-        picture_data_list: list[iPictureData] = [
-            self._picture_data_factory.from_standard_path(
-                picture_path, current_timezone=timezone.utc
-            )
-            for picture_path in picture_path_list
-        ]
-        picture_data_list = [
-            picture_data
-            for picture_data in picture_data_list
-            if picture_data is not None
-        ]
+        table_builder = PictureTableBuilder(current_timezone=timezone.utc)
+
+        not_standard_path_list = self._picture_data_factory.add_standard_paths_to_table(
+            table_builder=table_builder, path_list=picture_path_list
+        )
+
+        for picture_path in not_standard_path_list:
+            self._logger.warning(f"Found non standard path for picture {picture_path}")
+
+        picture_table = table_builder.build()
 
         self._logger.info(
-            f"Found {len(picture_data_list)} pictures with valid data for renaming"
+            f"Found {len(picture_table)} pictures with valid data for renaming"
         )
-        group_list = self._group_creator_service.get_group_list_from_folders(
-            picture_data_list
+        group_list = self._group_creator_service.get_table_group_list_from_folders(
+            picture_table
         )
 
         self._logger.info(f"Found {len(group_list)} directory to rename")
@@ -56,7 +81,7 @@ class RenameUseCase(baseUseCase):
         for group in group_list:
             if group.is_editable():
                 new_folder_name = group.get_new_folder_name(
-                    picture_repository=self._picture_data_repository,
+                    folder_name_index=self._folder_name_index,
                     verbose=verbose,
                 )
                 folder_path = group.get_folder_path()
@@ -81,18 +106,19 @@ class RenameUseCase(baseUseCase):
 
 
 def rename_use_case_factory(backup_folder_path: Path) -> RenameUseCase:
-    picture_data_repo = PictureDataRepository(
-        cache_file_path=Path(f"{backup_folder_path}/cache.jsonl")
+    # Only the folder names are needed, the picture data cache is not loaded
+    folder_name_index = folder_name_index_repository_factory(
+        backup_folder_path=backup_folder_path
     )
 
     picture_data_factory = PictureDataFactory()
-    file_tools = FileTools()
+    file_tools = folder_snapshot_file_tools_factory(backup_folder_path)
 
     group_creator_service = GroupCreatorService()
 
     return RenameUseCase(
         file_tools=file_tools,
         picture_data_factory=picture_data_factory,
-        picture_repository=picture_data_repo,
+        folder_name_index=folder_name_index,
         group_creator_service=group_creator_service,
     )
@@ -9,6 +9,16 @@ from pathlib import Path
 
 from app.tools.logger import init_console_log, init_file_log
 from app.tools.config_file import ConfigFileManager
+from app.tools.shutdown import install_exit_signal_handlers
+from app.tools.file import CopyMode
+from app.entities.near_duplicate_index import MAX_TOLERANCE
+from app.services.move_planner import MovePlannerException
+from app.repositories.picture_data import (
+    DEFAULT_FLUSH_COUNT,
+    DEFAULT_FLUSH_INTERVAL,
+    migrate_cache_to_sqlite,
+    picture_data_repository_factory,
+)
 
 from app.use_cases.backup import backup_use_case_factory
 from app.use_cases.group import group_use_case_factory
@@ -22,7 +32,7 @@ logger = logging.getLogger("app.crawl")
 
 @click.group()
 def cli():
-    pass
+    install_exit_signal_handlers()
 
 
 @cli.command()
@@ -56,8 +66,81 @@ def init(backup_path: str, force: bool):
     is_flag=True,
 )
 @click.option("--debug", help="Writes debug log to file", is_flag=True)
+@click.option(
+    "--workers",
+    help="Number of threads used to compute picture data",
+    default=1,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--fast_hash",
+    help="Hash a downscaled draft of each picture, faster but hashes may differ "
+    "by a few bits from the ones already in the backup",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--cache_flush_count",
+    help="Number of cache records buffered before being written",
+    default=DEFAULT_FLUSH_COUNT,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--cache_flush_interval",
+    help="Maximum number of seconds cache records stay buffered",
+    default=DEFAULT_FLUSH_INTERVAL,
+    type=click.FloatRange(min=0),
+)
+@click.option(
+    "--cache_fsync",
+    help="Sync the cache to disk each time records are written",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--rebuild_snapshot",
+    help="List the whole backup folder instead of the folders changed since the "
+    "last run to find the pictures already backed up",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--copy_mode",
+    help="reflink shares the data blocks on file systems supporting it (btrfs, "
+    "xfs), hardlink links the files when on the same file system and leaves "
+    "their times untouched. Both fall back to copy",
+    default=CopyMode.COPY.value,
+    type=click.Choice([copy_mode.value for copy_mode in CopyMode]),
+)
+@click.option(
+    "--scan_workers",
+    help="Number of threads listing the folders of the target directory, helps "
+    "on network shares",
+    default=1,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--tolerance",
+    help="Number of bits a picture hash may differ from a backed up one and still "
+    f"be the same picture, from 0 to {MAX_TOLERANCE}",
+    default=0,
+    type=click.IntRange(min=0, max=MAX_TOLERANCE),
+)
 @click.argument("target_path", type=click.Path(exists=True))
-def backup(target_path: str, strict: bool, debug: str):
+def backup(
+    target_path: str,
+    strict: bool,
+    debug: str,
+    workers: int,
+    fast_hash: bool,
+    cache_flush_count: int,
+    cache_flush_interval: float,
+    cache_fsync: bool,
+    rebuild_snapshot: bool,
+    copy_mode: str,
+    scan_workers: int,
+    tolerance: int,
+):
     """
     (NEW) Copy new pictures found in target directory to backup directory
     """
@@ -77,13 +160,25 @@ def backup(target_path: str, strict: bool, debug: str):
 
     target_folder_path = Path(target_path)
 
-    backup_use_case = backup_use_case_factory(backup_folder_path=backup_folder_path)
+    backup_use_case = backup_use_case_factory(
+        backup_folder_path=backup_folder_path,
+        fast_hash=fast_hash,
+        cache_flush_count=cache_flush_count,
+        cache_flush_interval=cache_flush_interval,
+        cache_fsync=cache_fsync,
+        rebuild_snapshot=rebuild_snapshot,
+        copy_mode=CopyMode(copy_mode),
+        scan_workers=scan_workers,
+        tolerance=tolerance,
+    )
 
-    file_list = backup_use_case.list_pictures(root_path=target_folder_path)
+    # Backup starts while the target directory is still being walked
+    picture_paths = backup_use_case.iter_pictures(root_path=target_folder_path)
 
     backup_use_case.backup(
-        picture_list_to_backup=file_list,
+        picture_list_to_backup=picture_paths,
         strict_mode=strict,
+        workers=workers,
     )
 
 
@@ -101,10 +196,47 @@ def backup(target_path: str, strict: bool, debug: str):
 @click.option(
     "--group_size", help="Minimum number of pictures for a group", default=10, type=int
 )
-def group(delta: int, path: Union[str, None], debug: bool, group_size: int):
+@click.option(
+    "--resume",
+    help="Finish moving the pictures of an interrupted run",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--undo",
+    help="Move back the pictures moved by the last run",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--incremental",
+    help="Only group NOT_GROUPED pictures, existing event folders are kept as "
+    "they are and joined by the pictures within delta of them",
+    default=False,
+    is_flag=True,
+)
+def group(
+    delta: int,
+    path: Union[str, None],
+    debug: bool,
+    group_size: int,
+    resume: bool,
+    undo: bool,
+    incremental: bool,
+):
     """
     (NEW) Group pictures event
     """
+    if sum([resume, undo, incremental]) > 1:
+        raise click.UsageError(
+            "--resume, --undo and --incremental cannot be used together"
+        )
+
+    if path is not None and (resume or undo or incremental):
+        raise click.UsageError(
+            "--path cannot be used with --resume, --undo or --incremental"
+        )
+
     config = configparser.ConfigParser()
     config.read(ConfigFileManager().config_file_path)
 
@@ -124,13 +256,28 @@ def group(delta: int, path: Union[str, None], debug: bool, group_size: int):
         folder_path_to_group = Path(path)
 
     group_use_case = group_use_case_factory(
-        hours_btw_pictures=delta, minimun_group_size=group_size
+        hours_btw_pictures=delta,
+        minimun_group_size=group_size,
+        backup_folder_path=backup_folder_path,
     )
 
-    pictures_list = group_use_case.list_pictures(
-        root_path=folder_path_to_group,
-    )
-    group_use_case.group(picture_list=pictures_list)
+    try:
+        if resume:
+            group_use_case.resume()
+        elif undo:
+            group_use_case.undo()
+        elif incremental:
+            group_use_case.group_incremental()
+        else:
+            pictures_list = group_use_case.iter_pictures(
+                root_path=folder_path_to_group,
+            )
+            group_use_case.group(picture_list=pictures_list)
+    except MovePlannerException as e:
+        raise click.ClickException(
+            f"{e}, run group --resume to finish them or group --undo to move the "
+            "pictures back"
+        )
 
 
 @cli.command()
@@ -160,12 +307,12 @@ def rename(dry_run: bool, sub_folder: Union[str, None] = None):
     verbose_mode = sub_folder is not None
 
     if sub_folder is not None:
-        picture_path_list = rename_use_case.list_pictures(
+        picture_path_list = rename_use_case.iter_candidate_pictures(
             root_path=Path(sub_folder),  # type: ignore
         )
         logger.warning(f"Try to rename only sub folder {sub_folder}")
     else:
-        picture_path_list = rename_use_case.list_pictures(
+        picture_path_list = rename_use_case.iter_candidate_pictures(
             root_path=backup_folder_path,
         )
 
@@ -175,8 +322,22 @@ def rename(dry_run: bool, sub_folder: Union[str, None] = None):
 
 
 @cli.command()
+@click.option(
+    "--fast_hash",
+    help="Hash a downscaled draft of each picture, faster but hashes may differ "
+    "by a few bits from the ones already in the backup",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--tolerance",
+    help="Number of bits a picture hash may differ from a backed up one and still "
+    f"be the same picture, from 0 to {MAX_TOLERANCE}",
+    default=0,
+    type=click.IntRange(min=0, max=MAX_TOLERANCE),
+)
 @click.argument("check_path", type=click.Path(exists=True))
-def check(check_path: str):
+def check(check_path: str, fast_hash: bool, tolerance: int):
     """
     Check all pictures in check_path have already been backed up.
     """
@@ -185,11 +346,13 @@ def check(check_path: str):
 
     backup_folder_path = Path(config["backup"]["path"])
 
-    check_use_case = check_use_case_factory()
+    check_use_case = check_use_case_factory(
+        fast_hash=fast_hash, backup_folder_path=backup_folder_path, tolerance=tolerance
+    )
 
-    backup_list = check_use_case.list_pictures(root_path=backup_folder_path)
+    backup_list = check_use_case.iter_pictures(root_path=backup_folder_path)
 
-    picture_list = check_use_case.list_pictures(root_path=Path(check_path))
+    picture_list = check_use_case.iter_pictures(root_path=Path(check_path))
 
     not_in_backup_count = check_use_case.check_pictures(
         backup_list=backup_list,
@@ -203,5 +366,39 @@ def check(check_path: str):
         logger.info("All pictures have been backed up")
 
 
+@cli.command()
+def migrate_cache():
+    """
+    Migrate cache.jsonl to a SQLite database, used instead from then on
+    """
+    config = configparser.ConfigParser()
+    config.read(ConfigFileManager().config_file_path)
+
+    backup_folder_path = Path(config["backup"]["path"])
+
+    line_count = migrate_cache_to_sqlite(backup_folder_path=backup_folder_path)
+
+    logger.info(f"{line_count} cache lines migrated, cache.jsonl is no longer used")
+
+
+@cli.command()
+def compact():
+    """
+    Rewrite the cache with a single line per picture path
+    """
+    config = configparser.ConfigParser()
+    config.read(ConfigFileManager().config_file_path)
+
+    backup_folder_path = Path(config["backup"]["path"])
+
+    picture_data_repository = picture_data_repository_factory(
+        backup_folder_path=backup_folder_path
+    )
+
+    removed_count = picture_data_repository.compact()
+
+    logger.info(f"Cache compacted, {removed_count} duplicated records removed")
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
+
+from app.tools.file import FileTools
+
+# Old enough for folder mtimes to be trusted by the folder snapshot
+OLD_MTIME_NS = 1_600_000_000 * 10**9
+
+
+def set_old_mtimes(folder_path: Path) -> None:
+    for path, _, _ in os.walk(folder_path):
+        os.utime(path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+
+def create_backup_folder(test_case: unittest.TestCase, path_list: list[str]) -> Path:
+    """Temporary folder removed after the test, with an empty file per path or a
+    folder when the path ends with /, all the folders get an old mtime"""
+    backup_folder_path = Path(tempfile.mkdtemp())
+    test_case.addCleanup(shutil.rmtree, backup_folder_path)
+
+    for path in path_list:
+        if path.endswith("/"):
+            (backup_folder_path / path).mkdir(parents=True, exist_ok=True)
+        else:
+            (backup_folder_path / path).parent.mkdir(parents=True, exist_ok=True)
+            (backup_folder_path / path).write_bytes(b"")
+
+    set_old_mtimes(backup_folder_path)
+
+    return backup_folder_path
+
+
+@contextmanager
+def record_listed_folders(file_tools: FileTools) -> Iterator[set[Path]]:
+    """The set is filled with the folders listed within the block when it exits"""
+    listed_folder_set: set[Path] = set()
+
+    with patch.object(
+        file_tools, "list_folder", wraps=file_tools.list_folder
+    ) as list_folder:
+        yield listed_folder_set
+
+    listed_folder_set.update(call.args[0] for call in list_folder.call_args_list)
@@ -1,10 +1,11 @@
 import unittest
 from datetime import timezone
 from pathlib import Path
+from typing import Union
 from unittest.mock import MagicMock
 
-from app.entities.picture import HasherException
-from app.entities.picture_data import iPictureData
+from app.entities.picture import HasherException, MalformedImageFileException
+from app.entities.picture_data import PictureFile, iPictureData
 from app.factories.picture_data import iPictureDataFactory
 from app.services.backup import iBackupService, iFileTools
 from app.services.picture_data_caching import iPictureDataCachingService
@@ -13,6 +14,7 @@ from app.use_cases.backup import BackupUseCase, backup_use_case_factory
 PICTURE_PATH = Path("path1")
 PICTURE_DATA = MagicMock(name="fake_picture_data", spec=iPictureData)
 PICTURE_DATA_2 = MagicMock(name="fake_picture_data_2", spec=iPictureData)
+PICTURE_FILE = MagicMock(name="fake_picture_file", spec=PictureFile)
 
 
 class TestBackupUseCase(unittest.TestCase):
@@ -32,6 +34,7 @@ class TestBackupUseCase(unittest.TestCase):
         self._mock_file_tools = MagicMock(name="mock_file_tools", spec=iFileTools)
 
         self._mock_file_service.backup.return_value = True
+        self._mock_picture_data_factory.read_picture_file.return_value = PICTURE_FILE
 
         self._backup_use_case = BackupUseCase(
             backup_service=self._mock_file_service,
@@ -63,7 +66,9 @@ class TestBackupUseCase(unittest.TestCase):
         # When strict mode is True, cache should not be used
         self._mock_picture_id_service.get_from_cache.assert_not_called()
         self._mock_file_service.backup.assert_called_once_with(
-            origin_path=PICTURE_PATH, data=PICTURE_DATA
+            origin_path=PICTURE_PATH,
+            data=PICTURE_DATA,
+            content=PICTURE_FILE.content,
         )
 
     def test_backup_not_strict_file_not_cached_OK(self):
@@ -84,7 +89,9 @@ class TestBackupUseCase(unittest.TestCase):
         )
 
         self._mock_file_service.backup.assert_called_once_with(
-            origin_path=PICTURE_PATH, data=PICTURE_DATA
+            origin_path=PICTURE_PATH,
+            data=PICTURE_DATA,
+            content=PICTURE_FILE.content,
         )
 
     def test_backup_not_strict_file_cached_OK(self):
@@ -120,7 +127,10 @@ class TestBackupUseCase(unittest.TestCase):
         self._mock_picture_id_service.get_from_cache.return_value = None
 
         def raise_hasher_exception(
-            path: Path, current_timezone: timezone
+            path: Path,
+            current_timezone: timezone,
+            fields: tuple,
+            picture_file: Union[PictureFile, None] = None,
         ) -> iPictureData:
             raise HasherException("xxxx")
 
@@ -134,6 +144,134 @@ class TestBackupUseCase(unittest.TestCase):
 
         self.assertEqual(0, result)
 
+    def test_backup_parallel_workers_OK(self):
+        picture_path_list = [Path(f"path{i}") for i in range(10)]
+
+        def get_from_cache(picture_path: Path):
+            return PICTURE_DATA_2 if picture_path == picture_path_list[0] else None
+
+        self._mock_picture_id_service.get_from_cache.side_effect = get_from_cache
+        self._mock_picture_data_factory.compute_data.return_value = PICTURE_DATA
+
+        result = self._backup_use_case.backup(
+            picture_list_to_backup=picture_path_list, strict_mode=False, workers=4
+        )
+
+        self.assertEqual(10, result)
+        self.assertEqual(9, self._mock_picture_data_factory.compute_data.call_count)
+        self.assertEqual(9, self._mock_picture_id_service.add_to_cache.call_count)
+        self.assertEqual(10, self._mock_file_service.backup.call_count)
+        self._mock_file_service.backup.assert_any_call(
+            origin_path=picture_path_list[0], data=PICTURE_DATA_2
+        )
+
+    def test_backup_parallel_workers_impossible_to_compute_OK(self):
+        self._mock_picture_id_service.get_from_cache.return_value = None
+
+        def raise_hasher_exception(
+            path: Path,
+            current_timezone: timezone,
+            fields: tuple,
+            picture_file: Union[PictureFile, None] = None,
+        ) -> iPictureData:
+            if path == PICTURE_PATH:
+                raise HasherException("xxxx")
+            return PICTURE_DATA
+
+        self._mock_picture_data_factory.compute_data.side_effect = (
+            raise_hasher_exception
+        )
+
+        result = self._backup_use_case.backup(
+            picture_list_to_backup=[PICTURE_PATH, Path("path2")],
+            strict_mode=False,
+            workers=2,
+        )
+
+        self.assertEqual(1, result)
+        self._mock_picture_id_service.add_to_cache.assert_called_once_with(
+            data=PICTURE_DATA
+        )
+
+    def test_backup_parallel_workers_impossible_to_read_OK(self):
+        self._mock_picture_id_service.get_from_cache.return_value = None
+        self._mock_picture_data_factory.compute_data.return_value = PICTURE_DATA
+
+        def read_picture_file(path: Path) -> PictureFile:
+            if path == PICTURE_PATH:
+                raise MalformedImageFileException("xxxx")
+            return MagicMock(name="fake_picture_file", spec=PictureFile)
+
+        self._mock_picture_data_factory.read_picture_file.side_effect = (
+            read_picture_file
+        )
+
+        result = self._backup_use_case.backup(
+            picture_list_to_backup=[PICTURE_PATH, Path("path2")],
+            strict_mode=False,
+            workers=2,
+        )
+
+        self.assertEqual(1, result)
+        self._mock_picture_data_factory.compute_data.assert_called_once()
+
+    def test_backup_parallel_workers_writer_error_stops_pipeline(self):
+        self._mock_picture_id_service.get_from_cache.return_value = None
+        self._mock_picture_data_factory.compute_data.return_value = PICTURE_DATA
+        self._mock_file_service.backup.side_effect = OSError("disk full")
+
+        picture_path_list = [Path(f"path{i}") for i in range(50)]
+
+        self.assertRaises(
+            OSError,
+            self._backup_use_case.backup,
+            picture_list_to_backup=picture_path_list,
+            strict_mode=False,
+            workers=2,
+        )
+
+        self.assertLess(
+            self._mock_picture_data_factory.read_picture_file.call_count, 50
+        )
+        self._mock_file_service.flush.assert_called_once()
+
+    def test_backup_parallel_workers_from_generator_OK(self):
+        self._mock_picture_id_service.get_from_cache.return_value = None
+        self._mock_picture_data_factory.compute_data.return_value = PICTURE_DATA
+
+        result = self._backup_use_case.backup(
+            picture_list_to_backup=(Path(f"path{i}") for i in range(10)),
+            strict_mode=False,
+            workers=2,
+        )
+
+        self.assertEqual(10, result)
+        self.assertEqual(10, self._mock_file_service.backup.call_count)
+
+    def test_backup_parallel_workers_discovery_error(self):
+        self._mock_picture_id_service.get_from_cache.return_value = None
+        self._mock_picture_data_factory.compute_data.return_value = PICTURE_DATA
+
+        def discover_pictures():
+            yield PICTURE_PATH
+            raise PermissionError("xxxx")
+
+        self.assertRaises(
+            PermissionError,
+            self._backup_use_case.backup,
+            picture_list_to_backup=discover_pictures(),
+            strict_mode=False,
+            workers=2,
+        )
+
+    def test_iter_pictures_ok(self):
+        self._mock_file_tools.iter_pictures.return_value = iter([PICTURE_PATH])
+
+        self.assertEqual(
+            [PICTURE_PATH],
+            list(self._backup_use_case.iter_pictures(root_path=Path("root"))),
+        )
+
 
 class TestBackupUseCaseFactory(unittest.TestCase):
     def test_factory_ok(self):
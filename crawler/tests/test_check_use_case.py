@@ -12,21 +12,25 @@ class TestCheckUseCase(unittest.TestCase):
         self.mock_file_tools = MagicMock()
         self.mock_picture_data_factory = MagicMock(spec=iPictureDataFactory)
 
-        def mock_from_standard_path(path, current_timezone=timezone.utc):
-            if path == Path("backup_a.jpg"):
-                return MagicMock(get_hash=lambda: "hash1")
-            else:
-                return MagicMock(get_hash=lambda: "hash2")
+        def mock_add_standard_paths_to_table(table_builder, path_list):
+            for path in path_list:
+                table_builder.add(
+                    path=path,
+                    timestamp=0,
+                    picture_hash=1 if path == Path("backup_a.jpg") else 2,
+                )
+
+            return []
 
-        self.mock_picture_data_factory.from_standard_path.side_effect = (
-            mock_from_standard_path
+        self.mock_picture_data_factory.add_standard_paths_to_table.side_effect = (
+            mock_add_standard_paths_to_table
         )
 
-        def mock_compute_data(path, current_timezone=timezone.utc):
+        def mock_compute_data(path, current_timezone=timezone.utc, fields=()):
             if path == Path("a.jpg"):
-                return MagicMock(get_hash=lambda: "hash1")
+                return MagicMock(get_hash=lambda: "0000000000000001")
             else:
-                return MagicMock(get_hash=lambda: "hash3")
+                return MagicMock(get_hash=lambda: "0000000000000003")
 
         self.mock_picture_data_factory.compute_data.side_effect = mock_compute_data
 
@@ -46,3 +50,16 @@ class TestCheckUseCase(unittest.TestCase):
         picture_list = [Path("a.jpg")]
 
         self.assertEqual(0, self.use_case.check_pictures(backup_list, picture_list))
+
+    def test_check_pictures_tolerance(self):
+        backup_list = [Path("backup_a.jpg")]
+        picture_list = [Path("a.jpg"), Path("b.jpg")]
+
+        use_case = CheckUseCase(
+            file_tools=self.mock_file_tools,
+            picture_data_factory=self.mock_picture_data_factory,
+            tolerance=1,
+        )
+
+        # The hash of b.jpg is one bit away from the one of backup_a.jpg
+        self.assertEqual(0, use_case.check_pictures(backup_list, picture_list))
@@ -0,0 +1,50 @@
+import unittest
+from pathlib import Path
+
+from app.tools.exif import ExifDateTags, ExifHeaderException, ExifHeaderReader
+
+
+class TestExifHeaderReader(unittest.TestCase):
+    def test_read_date_tags_camera_picture(self):
+        date_tags = ExifHeaderReader().read_date_tags(
+            Path("tests/files/test-canon-eos70D-exif.jpg")
+        )
+
+        self.assertEqual(
+            ExifDateTags(
+                date_time_original="2019:11:19 12:46:56", offset_time_original=None
+            ),
+            date_tags,
+        )
+
+    def test_read_date_tags_exif_first_segment(self):
+        date_tags = ExifHeaderReader().read_date_tags(Path("tests/files/DSCF1057.JPG"))
+
+        self.assertEqual("2022:12:17 09:55:07", date_tags.date_time_original)
+
+    def test_read_date_tags_exif_without_date(self):
+        date_tags = ExifHeaderReader().read_date_tags(
+            Path("tests/files/picture-no-exif.jpg")
+        )
+
+        self.assertIsNone(date_tags.date_time_original)
+
+    def test_read_date_tags_no_exif_segment_throws_exception(self):
+        def read_date_tags():
+            ExifHeaderReader().read_date_tags(Path("tests/files/foto_no_exif.jpg"))
+
+        self.assertRaises(ExifHeaderException, read_date_tags)
+
+    def test_read_date_tags_not_a_jpeg_throws_exception(self):
+        def read_date_tags():
+            ExifHeaderReader().read_date_tags(Path("tests/files/not_a_jpeg.jpg"))
+
+        self.assertRaises(ExifHeaderException, read_date_tags)
+
+    def test_read_date_tags_exif_after_max_offset_throws_exception(self):
+        def read_date_tags():
+            ExifHeaderReader(max_offset=2).read_date_tags(
+                Path("tests/files/test-canon-eos70D-exif.jpg")
+            )
+
+        self.assertRaises(ExifHeaderException, read_date_tags)
@@ -1,7 +1,14 @@
+import errno
+import os
+import shutil
+import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
-from app.tools.file import FileTools
+from app.tools.file import CopyMode, FileTools, write_file_atomically
+
+PICTURE_PATH = Path("tests/files/test-canon-eos70D.jpg")
 
 
 class TestFileTools(unittest.TestCase):
@@ -18,3 +25,163 @@ class TestFileTools(unittest.TestCase):
             ),
             set(file_list),
         )
+
+    def test_list_pictures_walk(self):
+        folder_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, folder_path)
+
+        for file_path in [
+            "a.jpg",
+            "b.Jpg",
+            "c.jpeg",
+            "d.JPEG",
+            "e.txt",
+            "event/f.jpg",
+            "event/sub/g.jpg",
+            "logs/h.jpg",
+            ".thumbnails/i.jpg",
+            "event/.Trashes/j.jpg",
+        ]:
+            (folder_path / file_path).parent.mkdir(parents=True, exist_ok=True)
+            (folder_path / file_path).touch()
+
+        expected_path_set = set(
+            folder_path / file_path
+            for file_path in [
+                "a.jpg",
+                "b.Jpg",
+                "c.jpeg",
+                "d.JPEG",
+                "event/f.jpg",
+                "event/sub/g.jpg",
+            ]
+        )
+
+        self.assertEqual(
+            expected_path_set, set(FileTools().list_pictures(folder_path))
+        )
+        self.assertEqual(
+            expected_path_set, set(FileTools(workers=4).iter_pictures(folder_path))
+        )
+        self.assertEqual(
+            9, len(FileTools(pruned_folder_names=[]).list_pictures(folder_path))
+        )
+
+        expected_folder_set = set(
+            [folder_path, folder_path / "event", folder_path / "event/sub"]
+        )
+
+        for file_tools in [FileTools(), FileTools(workers=4)]:
+            folder_pictures = dict(file_tools.iter_folder_pictures(folder_path))
+
+            self.assertEqual(expected_folder_set, set(folder_pictures))
+            self.assertEqual(
+                expected_path_set,
+                set(path for paths in folder_pictures.values() for path in paths),
+            )
+
+    def test_list_folder(self):
+        folder_listing = FileTools().list_folder(Path("tests/files/crawl"))
+
+        self.assertEqual(
+            [Path("tests/files/crawl/small-1.jpg")], folder_listing.picture_path_list
+        )
+        self.assertEqual(
+            [Path("tests/files/crawl/sub-directory")], folder_listing.folder_path_list
+        )
+
+
+class TestFileToolsCopy(unittest.TestCase):
+    def setUp(self):
+        self._folder_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self._folder_path)
+
+        # Hard links need the original on the same file system
+        self._origin_path = self._folder_path / "origin.jpg"
+        shutil.copyfile(PICTURE_PATH, self._origin_path)
+
+        self._target_path = self._folder_path / "target.jpg"
+
+    def test_copy(self):
+        copy_mode = FileTools().copy_file(
+            self._origin_path, self._target_path, CopyMode.COPY
+        )
+
+        self.assertEqual(CopyMode.COPY, copy_mode)
+        self.assertEqual(PICTURE_PATH.read_bytes(), self._target_path.read_bytes())
+        self.assertNotEqual(
+            os.stat(self._origin_path).st_ino, os.stat(self._target_path).st_ino
+        )
+
+    def test_copy_without_kernel_copy(self):
+        def raise_not_supported(*args):
+            raise OSError(errno.ENOSYS, "Not supported")
+
+        with patch("os.copy_file_range", raise_not_supported), patch(
+            "os.sendfile", raise_not_supported
+        ):
+            FileTools().copy_file(self._origin_path, self._target_path, CopyMode.COPY)
+
+        self.assertEqual(PICTURE_PATH.read_bytes(), self._target_path.read_bytes())
+
+    def test_copy_kernel_copy_stops_early(self):
+        def copy_1000_bytes_then_stop(origin_fd, target_fd, count, offset, _):
+            if offset > 0:
+                return 0
+
+            os.pwrite(target_fd, os.pread(origin_fd, 1000, offset), offset)
+            return 1000
+
+        with patch("os.copy_file_range", copy_1000_bytes_then_stop):
+            FileTools().copy_file(self._origin_path, self._target_path, CopyMode.COPY)
+
+        self.assertEqual(PICTURE_PATH.read_bytes(), self._target_path.read_bytes())
+
+    def test_hardlink(self):
+        copy_mode = FileTools().copy_file(
+            self._origin_path, self._target_path, CopyMode.HARDLINK
+        )
+
+        self.assertEqual(CopyMode.HARDLINK, copy_mode)
+        self.assertEqual(
+            os.stat(self._origin_path).st_ino, os.stat(self._target_path).st_ino
+        )
+
+    def test_reflink_falls_back_to_copy(self):
+        copy_mode = FileTools().copy_file(
+            self._origin_path, self._target_path, CopyMode.REFLINK
+        )
+
+        self.assertIn(copy_mode, (CopyMode.REFLINK, CopyMode.COPY))
+        self.assertEqual(PICTURE_PATH.read_bytes(), self._target_path.read_bytes())
+
+    def test_copy_from_content(self):
+        content = self._origin_path.read_bytes()
+        # The origin file is not read again when its content is given
+        self._origin_path.unlink()
+
+        copy_mode = FileTools().copy_file(
+            self._origin_path, self._target_path, CopyMode.COPY, content=content
+        )
+
+        self.assertEqual(CopyMode.COPY, copy_mode)
+        self.assertEqual(PICTURE_PATH.read_bytes(), self._target_path.read_bytes())
+
+
+class TestWriteFileAtomically(unittest.TestCase):
+    def test_interrupted_write_keeps_previous_file(self):
+        folder_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, folder_path)
+        file_path = folder_path / "state.json"
+
+        write_file_atomically(file_path, lambda file: file.write(b"previous"))
+
+        def interrupted_write(file):
+            file.write(b"partial")
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        self.assertRaises(
+            OSError, write_file_atomically, file_path, interrupted_write
+        )
+        self.assertEqual(b"previous", file_path.read_bytes())
+        self.assertEqual(["state.json"], os.listdir(folder_path))
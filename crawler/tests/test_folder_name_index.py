@@ -0,0 +1,130 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from app.entities.picture_data import PictureData
+from app.repositories.folder_name_index import (FOLDER_NAME_INDEX_FILE_NAME,
+                                                FolderNameIndex,
+                                                FolderNameIndexRepository,
+                                                SqliteFolderNameIndexRepository,
+                                                clean_folder_name)
+from app.repositories.picture_data import (CACHE_JSONL_FILE_NAME,
+                                           SqlitePictureDataRepository)
+
+
+class TestFolderNameIndex(unittest.TestCase):
+    def test_clean_folder_name(self):
+        self.assertEqual("Carnaval", clean_folder_name("2013-02 Carnaval"))
+        self.assertEqual("Saint Malo", clean_folder_name("Saint Malo"))
+        self.assertIsNone(clean_folder_name("mon truc avec CANON"))
+        self.assertIsNone(clean_folder_name("FUJI RAW"))
+        self.assertIsNone(clean_folder_name("XXX APPLE RAW"))
+
+    def test_add(self):
+        index = FolderNameIndex()
+        index.add("hash1", "2024-03 Vacances Ski les Arcs")
+        index.add("hash1", "Vacances Ski les Arcs")
+        index.add("hash1", "FUJI RAW")
+        index.add("hash2", "Saint Malo")
+
+        self.assertEqual(
+            {"Vacances Ski les Arcs": 2}, index.get_folder_name_count("hash1")
+        )
+        self.assertEqual({"Saint Malo": 1}, index.get_folder_name_count("hash2"))
+        self.assertEqual({}, index.get_folder_name_count("hash3"))
+
+
+class TestFolderNameIndexRepository(unittest.TestCase):
+    def setUp(self):
+        self._backup_folder_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self._backup_folder_path)
+
+        self._cache_file_path = self._backup_folder_path / CACHE_JSONL_FILE_NAME
+        self._index_file_path = self._backup_folder_path / FOLDER_NAME_INDEX_FILE_NAME
+
+    def _record(self, path: str, picture_hash: str) -> None:
+        data = PictureData(
+            path=Path(path),
+            creation_date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            hash=picture_hash,
+        )
+
+        with open(self._cache_file_path, "a") as file:
+            file.write(PictureData.to_json(data) + "\n")
+
+    def _open(self) -> FolderNameIndexRepository:
+        return FolderNameIndexRepository(
+            cache_file_path=self._cache_file_path,
+            index_file_path=self._index_file_path,
+        )
+
+    def test_missing_cache(self):
+        repository = self._open()
+
+        self.assertEqual({}, repository.get_folder_name_count("hash1"))
+        self.assertFalse(self._index_file_path.exists())
+
+    def test_only_appended_lines_are_read(self):
+        self._record("root/2024-03 Ski/1.jpg", "hash1")
+        self._record("root/CANON/1.jpg", "hash1")
+
+        self.assertEqual({"Ski": 1}, self._open().get_folder_name_count("hash1"))
+        self.assertTrue(self._index_file_path.exists())
+
+        self._record("root/2025-03 Ski/1.jpg", "hash1")
+        self._record("root/Saint Malo/2.jpg", "hash2")
+
+        with patch.object(
+            FolderNameIndex, "add", autospec=True, side_effect=FolderNameIndex.add
+        ) as add:
+            repository = self._open()
+
+        self.assertEqual(2, add.call_count)
+        self.assertEqual({"Ski": 2}, repository.get_folder_name_count("hash1"))
+        self.assertEqual({"Saint Malo": 1}, repository.get_folder_name_count("hash2"))
+
+    def test_rewritten_cache_is_indexed_again(self):
+        self._record("root/Ski/1.jpg", "hash1")
+        self._open()
+
+        self._cache_file_path.unlink()
+        self._record("root/Carnaval/1.jpg", "hash1")
+
+        repository = self._open()
+
+        self.assertEqual({"Carnaval": 1}, repository.get_folder_name_count("hash1"))
+
+    def test_incomplete_last_line_is_ignored(self):
+        self._record("root/Ski/1.jpg", "hash1")
+
+        with open(self._cache_file_path, "a") as file:
+            file.write('{"path": "root/Carnaval/')
+
+        self.assertEqual({"Ski": 1}, self._open().get_folder_name_count("hash1"))
+
+    def test_unreadable_line_is_ignored(self):
+        with open(self._cache_file_path, "a") as file:
+            file.write('{"path": "root/Carnaval/\n')
+
+        self._record("root/Ski/1.jpg", "hash1")
+
+        self.assertEqual({"Ski": 1}, self._open().get_folder_name_count("hash1"))
+
+    def test_sqlite(self):
+        database_path = self._backup_folder_path / "cache.sqlite"
+        picture_repository = SqlitePictureDataRepository(database_path)
+        picture_repository.record(
+            PictureData(
+                path=Path("root/2013-02 Carnaval/1.jpg"),
+                creation_date=datetime(2013, 2, 3, tzinfo=timezone.utc),
+                hash="hash1",
+            )
+        )
+        picture_repository.close()
+
+        repository = SqliteFolderNameIndexRepository(database_path)
+
+        self.assertEqual({"Carnaval": 1}, repository.get_folder_name_count("hash1"))
@@ -0,0 +1,96 @@
+import shutil
+import unittest
+from pathlib import Path
+
+from app.repositories.folder_snapshot import FOLDER_SNAPSHOT_FILE_NAME
+from app.services.folder_snapshot import folder_snapshot_file_tools_factory
+from tests.backup_folder import create_backup_folder, record_listed_folders
+
+
+class TestFolderSnapshotFileTools(unittest.TestCase):
+    def setUp(self):
+        self._backup_folder_path = create_backup_folder(
+            self, ["2023/EVENT/a.jpg", "2024/NOT_GROUPED/b.JPG", "logs/"]
+        )
+        self._event_folder_path = self._backup_folder_path / "2023" / "EVENT"
+
+    def _add_picture(self, folder_path: Path, picture_name: str) -> None:
+        (folder_path / picture_name).write_bytes(b"")
+
+    def _list_pictures(self, root_path: Path) -> tuple[set[Path], set[Path]]:
+        """Returns the pictures and the folders actually listed"""
+        file_tools = folder_snapshot_file_tools_factory(self._backup_folder_path)
+
+        with record_listed_folders(file_tools) as listed_folder_set:
+            picture_path_set = set(file_tools.iter_pictures(root_path))
+
+        return picture_path_set, listed_folder_set
+
+    def test_only_changed_folders_are_listed(self):
+        expected_path_set = set(
+            [
+                self._event_folder_path / "a.jpg",
+                self._backup_folder_path / "2024" / "NOT_GROUPED" / "b.JPG",
+            ]
+        )
+
+        picture_path_set, listed_folder_set = self._list_pictures(
+            self._backup_folder_path
+        )
+
+        self.assertEqual(expected_path_set, picture_path_set)
+        self.assertEqual(5, len(listed_folder_set))
+
+        # The snapshot is written in the backup folder which changes its mtime
+        picture_path_set, listed_folder_set = self._list_pictures(
+            self._backup_folder_path
+        )
+
+        self.assertEqual(expected_path_set, picture_path_set)
+        self.assertEqual(set([self._backup_folder_path]), listed_folder_set)
+
+        self._add_picture(self._event_folder_path, "c.jpg")
+        shutil.rmtree(self._backup_folder_path / "2024")
+
+        picture_path_set, listed_folder_set = self._list_pictures(
+            self._backup_folder_path
+        )
+
+        self.assertEqual(
+            set([self._event_folder_path / "a.jpg", self._event_folder_path / "c.jpg"]),
+            picture_path_set,
+        )
+        self.assertEqual(
+            set([self._backup_folder_path, self._event_folder_path]),
+            listed_folder_set,
+        )
+
+    def test_sub_folder(self):
+        self._list_pictures(self._backup_folder_path)
+        self._add_picture(self._event_folder_path, "c.jpg")
+
+        picture_path_set, listed_folder_set = self._list_pictures(
+            self._event_folder_path
+        )
+
+        self.assertEqual(
+            set([self._event_folder_path / "a.jpg", self._event_folder_path / "c.jpg"]),
+            picture_path_set,
+        )
+        self.assertEqual(set([self._event_folder_path]), listed_folder_set)
+
+        # Folders outside of the sub folder are kept in the snapshot
+        picture_path_set, _ = self._list_pictures(self._backup_folder_path)
+
+        self.assertEqual(3, len(picture_path_set))
+
+    def test_outside_of_snapshot_root(self):
+        picture_path_set, listed_folder_set = self._list_pictures(
+            Path("tests/files/crawl")
+        )
+
+        self.assertEqual(3, len(picture_path_set))
+        self.assertEqual(set(), listed_folder_set)
+        self.assertFalse(
+            (self._backup_folder_path / FOLDER_SNAPSHOT_FILE_NAME).exists()
+        )
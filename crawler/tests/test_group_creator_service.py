@@ -1,9 +1,10 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 
 from app.entities.picture_data import PictureData
-from app.entities.picture_group import PictureGroup
+from app.entities.picture_group import EventFolder, PictureGroup
+from app.entities.picture_table import PictureTableBuilder
 from app.services.group_creator import GroupCreatorService
 
 
@@ -167,3 +168,122 @@ class TestGroupCreatorService(unittest.TestCase):
                 ).get_picture_list()
             ],
         )
+
+
+class TestGroupCreatorServiceTable(unittest.TestCase):
+    def setUp(self):
+        self._picture_list = [
+            PictureData(
+                path=Path(f"root/{folder}/{index}.jpg"),
+                creation_date=datetime(2023, 10, day, hour, tzinfo=timezone.utc),
+                hash=f"{index:016x}",
+            )
+            for index, (folder, day, hour) in enumerate(
+                [
+                    ("NOT_GROUPED", 5, 14),
+                    ("EVENT_1", 1, 11),
+                    ("NOT_GROUPED", 1, 10),
+                    ("EVENT_2", 4, 13),
+                    ("EVENT_1", 1, 13),
+                    ("NOT_GROUPED", 1, 13),
+                ]
+            )
+        ]
+
+        builder = PictureTableBuilder()
+        for picture in self._picture_list:
+            builder.add_picture_data(picture)
+
+        self._picture_table = builder.build()
+
+    def _assert_same_groups(self, expected_group_list, group_list):
+        def to_json_list(group):
+            return [PictureData.to_json(x) for x in group.get_picture_list()]
+
+        self.assertEqual(
+            [to_json_list(group) for group in expected_group_list],
+            [to_json_list(group) for group in group_list],
+        )
+        self.assertEqual(
+            [group.get_folder_path() for group in expected_group_list],
+            [group.get_folder_path() for group in group_list],
+        )
+        self.assertEqual(
+            [group.list_pictures_to_move() for group in expected_group_list],
+            [group.list_pictures_to_move() for group in group_list],
+        )
+
+    def test_from_time_same_as_list(self):
+        for hours in (1, 2, 24, 72):
+            grouper = GroupCreatorService(hours_btw_picture=hours, minimum_group_size=2)
+
+            self._assert_same_groups(
+                grouper.get_group_list_from_time(self._picture_list),
+                grouper.get_table_group_list_from_time(self._picture_table),
+            )
+
+    def test_from_folders_same_as_list(self):
+        grouper = GroupCreatorService()
+
+        self._assert_same_groups(
+            grouper.get_group_list_from_folders(self._picture_list),
+            grouper.get_table_group_list_from_folders(self._picture_table),
+        )
+
+    def test_empty_table(self):
+        grouper = GroupCreatorService()
+        picture_table = PictureTableBuilder().build()
+
+        self.assertEqual([], grouper.get_table_group_list_from_time(picture_table))
+        self.assertEqual([], grouper.get_table_group_list_from_folders(picture_table))
+        self.assertEqual(
+            [], grouper.get_table_group_list_incremental(picture_table, [])
+        )
+
+    def test_incremental(self):
+        grouper = GroupCreatorService(hours_btw_picture=24, minimum_group_size=3)
+
+        def timestamp(day: int, hour: int) -> int:
+            return int(datetime(2023, 10, day, hour, tzinfo=timezone.utc).timestamp())
+
+        event_list = [
+            EventFolder(Path("root/EVENT_1"), timestamp(1, 10), timestamp(1, 12), 5),
+            EventFolder(Path("root/EVENT_2"), timestamp(1, 20), timestamp(2, 8), 9),
+            EventFolder(Path("root/EVENT_3"), timestamp(20, 8), timestamp(20, 9), 1),
+        ]
+
+        builder = PictureTableBuilder()
+        for index, (day, hour) in enumerate([(2, 9), (3, 6), (10, 8), (21, 8)]):
+            builder.add(
+                path=Path(f"root/NOT_GROUPED/{index}.jpg"),
+                timestamp=timestamp(day, hour),
+                picture_hash=index,
+            )
+
+        group_list = grouper.get_table_group_list_incremental(
+            builder.build(), event_list
+        )
+
+        # Joins the largest close event, the other pictures are too far from any
+        # event large enough
+        self.assertEqual(
+            [
+                Path("root/EVENT_2"),
+                Path("root/2023 OTHER"),
+                Path("root/2023 OTHER"),
+            ],
+            [group.get_folder_path() for group in group_list],
+        )
+        self.assertEqual(
+            [
+                (
+                    Path("root/NOT_GROUPED/0.jpg"),
+                    Path("root/EVENT_2/0.jpg"),
+                ),
+                (
+                    Path("root/NOT_GROUPED/1.jpg"),
+                    Path("root/EVENT_2/1.jpg"),
+                ),
+            ],
+            group_list[0].list_pictures_to_move(),
+        )
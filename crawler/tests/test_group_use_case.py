@@ -1,21 +1,27 @@
 import unittest
-from datetime import timezone
+from datetime import datetime, timezone
 from pathlib import Path
 from unittest.mock import MagicMock
 
 from app.entities import picture
-from app.entities.picture_data import iPictureData
+from app.entities.picture_data import PictureData, PictureDataField
 from app.entities.picture_group import iPictureGroup
-from app.factories.picture_data import (NotStandardFileNameException,
-                                        iPictureDataFactory)
+from app.factories.picture_data import iPictureDataFactory
+from app.repositories.move_journal import Move
 from app.services.backup import iBackupService, iFileTools
 from app.services.group_creator import iGroupCreatorService
+from app.services.move_planner import iMovePlannerService
+from app.services.timeline import Timeline, iTimelineService
 from app.use_cases.group import GroupUseCase, group_use_case_factory
 
 PICTURE_PATH = Path("path1")
 PICTURE_PATH_2 = Path("path2")
 
-PICTURE_DATA = MagicMock(name="fake_picture_data", spec=iPictureData)
+PICTURE_DATA = PictureData(
+    path=PICTURE_PATH,
+    creation_date=datetime(2023, 10, 1, tzinfo=timezone.utc),
+    hash="0000000000000001",
+)
 PICTURE_GROUP = MagicMock(name="fake_picture_group", spec=iPictureGroup)
 
 
@@ -33,70 +39,98 @@ class TestGroupUseCase(unittest.TestCase):
             name="mock_picture_data_factory", spec=iPictureDataFactory
         )
         self._mock_file_tools = MagicMock(name="mock_file_tools", spec=iFileTools)
+        self._mock_move_planner_svc = MagicMock(
+            name="mock_move_planner_service", spec=iMovePlannerService
+        )
+        self._mock_move_planner_svc.move.return_value = 0
+        self._mock_timeline_svc = MagicMock(
+            name="mock_timeline_service", spec=iTimelineService
+        )
 
         self._group_use_case = GroupUseCase(
             file_tools=self._mock_file_tools,
             picture_data_factory=self._mock_picture_data_factory,
             group_creator_service=self._mock_group_creator_svc,
+            move_planner_service=self._mock_move_planner_svc,
+            timeline_service=self._mock_timeline_svc,
         )
 
+    def _get_grouped_path_list(self) -> list[Path]:
+        group_creator_svc = self._mock_group_creator_svc
+        group_creator_svc.get_table_group_list_from_time.assert_called_once()
+
+        picture_table = group_creator_svc.get_table_group_list_from_time.call_args[1][
+            "picture_table"
+        ]
+
+        return [picture_table.get_path(index) for index in range(len(picture_table))]
+
     def test_group_get_data_from_path_ok(self):
-        self._mock_picture_data_factory.from_standard_path.return_value = PICTURE_DATA
+        def mock_add_standard_paths_to_table(table_builder, path_list):
+            for path in path_list:
+                table_builder.add_picture_data(PICTURE_DATA)
+
+            return []
+
+        self._mock_picture_data_factory.add_standard_paths_to_table.side_effect = (
+            mock_add_standard_paths_to_table
+        )
 
         PICTURE_GROUP.list_pictures_to_move.return_value = [
             (PICTURE_PATH, PICTURE_PATH_2)
         ]
-        self._mock_group_creator_svc.get_group_list_from_time.return_value = [
+        self._mock_group_creator_svc.get_table_group_list_from_time.return_value = [
             PICTURE_GROUP
         ]
 
         self._group_use_case.group(picture_list=[PICTURE_PATH])
 
-        self._mock_picture_data_factory.from_standard_path.assert_called_once_with(
-            path=PICTURE_PATH, current_timezone=timezone.utc
+        add_standard_paths_to_table = (
+            self._mock_picture_data_factory.add_standard_paths_to_table
         )
-
-        self._mock_group_creator_svc.get_group_list_from_time.assert_called_once_with(
-            picture_list=[PICTURE_DATA]
+        add_standard_paths_to_table.assert_called_once()
+        self.assertEqual(
+            [PICTURE_PATH], add_standard_paths_to_table.call_args[1]["path_list"]
         )
+        self._mock_picture_data_factory.compute_data.assert_not_called()
 
-        self._mock_file_tools.move_file.assert_called_once_with(
-            origin_path=PICTURE_PATH, target_path=PICTURE_PATH_2
+        self.assertEqual([PICTURE_PATH], self._get_grouped_path_list())
+
+        self._mock_move_planner_svc.move.assert_called_once_with(
+            [Move(origin_path=PICTURE_PATH, target_path=PICTURE_PATH_2)]
         )
 
     def test_group_cannot_get_data_from_path_ok(self):
-        def raise_not_standard_file_name_exception(*args, **kwargs):
-            raise NotStandardFileNameException("Not standard file name")
-
-        self._mock_picture_data_factory.from_standard_path.side_effect = (
-            raise_not_standard_file_name_exception
-        )
+        self._mock_picture_data_factory.add_standard_paths_to_table.return_value = [
+            PICTURE_PATH
+        ]
         self._mock_picture_data_factory.compute_data.return_value = PICTURE_DATA
 
         PICTURE_GROUP.list_pictures_to_move.return_value = [
             (PICTURE_PATH, PICTURE_PATH_2)
         ]
-        self._mock_group_creator_svc.get_group_list_from_time.return_value = [
+        self._mock_group_creator_svc.get_table_group_list_from_time.return_value = [
             PICTURE_GROUP
         ]
 
         self._group_use_case.group(picture_list=[PICTURE_PATH])
 
-        self._mock_group_creator_svc.get_group_list_from_time.assert_called_once_with(
-            picture_list=[PICTURE_DATA]
+        self._mock_picture_data_factory.compute_data.assert_called_once_with(
+            path=PICTURE_PATH,
+            current_timezone=timezone.utc,
+            fields=(PictureDataField.CREATION_DATE,),
         )
 
-        self._mock_file_tools.move_file.assert_called_once_with(
-            origin_path=PICTURE_PATH, target_path=PICTURE_PATH_2
+        self.assertEqual([PICTURE_PATH], self._get_grouped_path_list())
+
+        self._mock_move_planner_svc.move.assert_called_once_with(
+            [Move(origin_path=PICTURE_PATH, target_path=PICTURE_PATH_2)]
         )
 
     def test_group_cannot_get_data_from_path_and_cannot_compute_nothing_happens(self):
-        def raise_not_standard_file_name_exception(*args, **kwargs):
-            raise NotStandardFileNameException("Not standard file name")
-
-        self._mock_picture_data_factory.from_standard_path.side_effect = (
-            raise_not_standard_file_name_exception
-        )
+        self._mock_picture_data_factory.add_standard_paths_to_table.return_value = [
+            PICTURE_PATH
+        ]
 
         def raise_picture_exception(*args, **kwargs):
             raise picture.PictureException("Cannot compute picture data")
@@ -109,15 +143,46 @@ class TestGroupUseCase(unittest.TestCase):
             (PICTURE_PATH, PICTURE_PATH_2)
         ]
 
-        self._mock_group_creator_svc.get_group_list_from_time.return_value = []
+        self._mock_group_creator_svc.get_table_group_list_from_time.return_value = []
 
         self._group_use_case.group(picture_list=[PICTURE_PATH])
 
-        self._mock_group_creator_svc.get_group_list_from_time.assert_called_once_with(
-            picture_list=[]
+        self.assertEqual([], self._get_grouped_path_list())
+
+        self._mock_move_planner_svc.move.assert_called_once_with([])
+
+    def test_group_incremental_ok(self):
+        self._mock_timeline_svc.get_timeline.return_value = Timeline(
+            event_list=["fake_event"], new_picture_path_list=[PICTURE_PATH]
         )
+        self._mock_picture_data_factory.add_standard_paths_to_table.return_value = []
 
-        self._mock_file_tools.move_file.assert_not_called()
+        PICTURE_GROUP.list_pictures_to_move.return_value = [
+            (PICTURE_PATH, PICTURE_PATH_2)
+        ]
+        group_creator_svc = self._mock_group_creator_svc
+        group_creator_svc.get_table_group_list_incremental.return_value = [
+            PICTURE_GROUP
+        ]
+
+        self._group_use_case.group_incremental()
+
+        self.assertEqual(
+            [PICTURE_PATH],
+            self._mock_picture_data_factory.add_standard_paths_to_table.call_args[1][
+                "path_list"
+            ],
+        )
+        self.assertEqual(
+            ["fake_event"],
+            group_creator_svc.get_table_group_list_incremental.call_args[1][
+                "event_list"
+            ],
+        )
+        group_creator_svc.get_table_group_list_from_time.assert_not_called()
+        self._mock_move_planner_svc.move.assert_called_once_with(
+            [Move(origin_path=PICTURE_PATH, target_path=PICTURE_PATH_2)]
+        )
 
 
 class TestGroupUseCaseFactory(unittest.TestCase):
@@ -1,12 +1,19 @@
+import shutil
 import unittest
 import uuid
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 
+from app.entities.near_duplicate_index import NearDuplicateIndex
 from app.entities.picture_data import PictureData
 from app.factories.picture_data import PictureDataFactory
+from app.repositories.near_duplicate_index import (
+    NEAR_DUPLICATE_INDEX_FILE_NAME, NearDuplicateIndexRepository)
 from app.services.backup import LocalFileBackupService
+from app.services.folder_snapshot import folder_snapshot_file_tools_factory
 from app.tools.file import FileTools
+from tests.backup_folder import create_backup_folder, record_listed_folders
 
 
 class TestLocalFileBackupService(unittest.TestCase):
@@ -55,3 +62,116 @@ class TestLocalFileBackupService(unittest.TestCase):
 
         self.assertTrue(file_service.hash_exists(test_hash))
         self.assertFalse(file_service.hash_exists("XXXXX"))
+
+
+class TestLocalFileBackupServiceSnapshot(unittest.TestCase):
+    def setUp(self):
+        self._backup_folder_path = create_backup_folder(
+            self, ["2023/EVENT/1700000000-0000000000000001.jpg", "2024/NOT_GROUPED/"]
+        )
+        self._event_folder_path = self._backup_folder_path / "2023" / "EVENT"
+        self._not_grouped_folder_path = (
+            self._backup_folder_path / "2024" / "NOT_GROUPED"
+        )
+
+    def _add_picture(self, folder_path: Path, picture_hash: str) -> None:
+        (folder_path / f"1700000000-{picture_hash}.jpg").write_bytes(b"")
+
+    def _create_service(self, rebuild_snapshot: bool = False, tolerance: int = 0):
+        file_tools = folder_snapshot_file_tools_factory(
+            self._backup_folder_path, rebuild_snapshot=rebuild_snapshot
+        )
+
+        with record_listed_folders(file_tools) as listed_folder_set:
+            file_service = LocalFileBackupService(
+                backup_folder_path=self._backup_folder_path,
+                picture_data_factory=PictureDataFactory(),
+                file_tools=file_tools,
+                tolerance=tolerance,
+                near_duplicate_index_repository=NearDuplicateIndexRepository(
+                    self._backup_folder_path / NEAR_DUPLICATE_INDEX_FILE_NAME
+                ),
+            )
+
+        return file_service, listed_folder_set
+
+    def test_only_changed_folders_are_listed(self):
+        file_service, listed_folder_set = self._create_service()
+
+        self.assertTrue(file_service.hash_exists("0000000000000001"))
+        self.assertEqual(5, len(listed_folder_set))
+
+        file_service, listed_folder_set = self._create_service()
+
+        # The snapshot is written in the backup folder which changes its mtime
+        self.assertTrue(file_service.hash_exists("0000000000000001"))
+        self.assertEqual(set([self._backup_folder_path]), listed_folder_set)
+
+        self._add_picture(self._event_folder_path, "0000000000000002")
+        shutil.rmtree(self._backup_folder_path / "2024")
+
+        file_service, listed_folder_set = self._create_service()
+
+        self.assertTrue(file_service.hash_exists("0000000000000002"))
+        self.assertEqual(
+            set([self._backup_folder_path, self._event_folder_path]),
+            listed_folder_set,
+        )
+
+    def test_rebuild_snapshot(self):
+        self._create_service()
+
+        file_service, listed_folder_set = self._create_service(rebuild_snapshot=True)
+
+        self.assertTrue(file_service.hash_exists("0000000000000001"))
+        self.assertEqual(5, len(listed_folder_set))
+
+    def test_backed_up_folder_listed_again(self):
+        file_service, _ = self._create_service()
+
+        picture_data = PictureData(
+            hash="0000000000000003",
+            path=Path("tests/files/test-canon-eos70D.jpg"),
+            creation_date=datetime(2024, 11, 30, 11, 45),
+        )
+
+        self.assertTrue(file_service.backup(picture_data.get_path(), picture_data))
+        file_service.flush()
+
+        file_service, listed_folder_set = self._create_service()
+
+        self.assertTrue(file_service.hash_exists("0000000000000003"))
+        self.assertEqual(
+            set([self._backup_folder_path, self._not_grouped_folder_path]),
+            listed_folder_set,
+        )
+
+    def test_backup_tolerance(self):
+        file_service, _ = self._create_service(tolerance=1)
+
+        # One bit away from the hash of the picture already backed up
+        near_picture_data = PictureData(
+            hash="0000000000000003",
+            path=Path("tests/files/test-canon-eos70D.jpg"),
+            creation_date=datetime(2024, 11, 30, 11, 45),
+        )
+        picture_data = PictureData(
+            hash="000000000000000c",
+            path=Path("tests/files/test-canon-eos70D.jpg"),
+            creation_date=datetime(2024, 11, 30, 11, 45),
+        )
+
+        self.assertFalse(
+            file_service.backup(near_picture_data.get_path(), near_picture_data)
+        )
+        self.assertTrue(file_service.backup(picture_data.get_path(), picture_data))
+        self.assertTrue(file_service.hash_exists("000000000000000d"))
+        file_service.flush()
+
+        # The saved index is used as is while the hashes are the same
+        with patch.object(NearDuplicateIndex, "from_hash_list") as from_hash_list:
+            file_service, _ = self._create_service(tolerance=1)
+
+        from_hash_list.assert_not_called()
+        self.assertTrue(file_service.hash_exists("000000000000000d"))
+        self.assertFalse(file_service.hash_exists("000000000000000f"))
@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.repositories.move_journal import (MOVE_JOURNAL_FILE_NAME, Move,
+                                           MoveJournalRepository,
+                                           MoveJournalStatus)
+from app.services.move_planner import MovePlannerException, MovePlannerService
+
+
+class TestMovePlannerService(unittest.TestCase):
+    def setUp(self):
+        self._folder_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self._folder_path)
+
+        self._not_grouped_path = self._folder_path / "2024" / "NOT_GROUPED"
+        self._not_grouped_path.mkdir(parents=True)
+
+        self._move_list = []
+
+        for index in range(6):
+            origin_path = self._not_grouped_path / f"{index}.jpg"
+            origin_path.write_bytes(b"")
+            event_folder_path = self._folder_path / "2024" / f"EVENT_{index % 2}"
+
+            self._move_list.append(
+                Move(
+                    origin_path=origin_path,
+                    target_path=event_folder_path / origin_path.name,
+                )
+            )
+
+        self._journal_repository = MoveJournalRepository(
+            self._folder_path / MOVE_JOURNAL_FILE_NAME
+        )
+        self._move_planner = MovePlannerService(
+            move_journal_repository=self._journal_repository
+        )
+
+    def _assert_moved(self, move_list: list[Move]) -> None:
+        for move in move_list:
+            self.assertFalse(move.origin_path.exists(), str(move.origin_path))
+            self.assertTrue(move.target_path.exists(), str(move.target_path))
+
+    def test_move(self):
+        self.assertEqual(6, self._move_planner.move(self._move_list))
+
+        self._assert_moved(self._move_list)
+
+        journal = self._journal_repository.load()
+        self.assertEqual(MoveJournalStatus.FINISHED, journal.status)
+        self.assertEqual(self._move_list, journal.move_list)
+        self.assertEqual(set(range(6)), journal.done_index_set)
+
+    def test_existing_target_is_not_replaced(self):
+        self._move_list[0].target_path.parent.mkdir(parents=True)
+        self._move_list[0].target_path.write_bytes(b"existing")
+
+        self.assertEqual(5, self._move_planner.move(self._move_list))
+
+        self.assertTrue(self._move_list[0].origin_path.exists())
+        self.assertEqual(b"existing", self._move_list[0].target_path.read_bytes())
+
+    def test_resume_interrupted_moves(self):
+        # Interrupted after two moves, only the first one was recorded
+        self._journal_repository.start(self._move_list)
+        self._journal_repository.record_done(0)
+        self._journal_repository.close()
+
+        for move in self._move_list[:2]:
+            move.target_path.parent.mkdir(parents=True, exist_ok=True)
+            move.origin_path.rename(move.target_path)
+
+        self.assertRaises(
+            MovePlannerException, self._move_planner.move, self._move_list
+        )
+
+        self.assertEqual(4, self._move_planner.resume())
+
+        self._assert_moved(self._move_list)
+        self.assertEqual(
+            MoveJournalStatus.FINISHED, self._journal_repository.load().status
+        )
+        self.assertEqual(0, self._move_planner.resume())
+
+    def test_undo(self):
+        self._move_planner.move(self._move_list)
+
+        self.assertEqual(6, self._move_planner.undo())
+
+        for move in self._move_list:
+            self.assertTrue(move.origin_path.exists())
+            self.assertFalse(move.target_path.parent.exists())
+
+        self.assertEqual(
+            MoveJournalStatus.UNDONE, self._journal_repository.load().status
+        )
+        self.assertEqual(0, self._move_planner.undo())
+
+    def test_undo_keeps_existing_folders(self):
+        existing_folder_path = self._move_list[0].target_path.parent
+        existing_folder_path.mkdir()
+
+        self._move_planner.move(self._move_list)
+        self._move_planner.undo()
+
+        self.assertTrue(existing_folder_path.is_dir())
+        self.assertFalse(self._move_list[1].target_path.parent.exists())
+        self.assertTrue(self._not_grouped_path.is_dir())
+
+    def test_without_journal(self):
+        move_planner = MovePlannerService()
+
+        self.assertEqual(6, move_planner.move(self._move_list))
+        self._assert_moved(self._move_list)
+        self.assertRaises(MovePlannerException, move_planner.undo)
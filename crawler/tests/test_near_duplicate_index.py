@@ -0,0 +1,101 @@
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from app.entities.near_duplicate_index import (NearDuplicateIndex,
+                                               NearDuplicateIndexException,
+                                               count_different_bits)
+from app.repositories.near_duplicate_index import (
+    NEAR_DUPLICATE_INDEX_FILE_NAME, NearDuplicateIndexRepository)
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def setUp(self):
+        generator = random.Random(42)
+
+        self._hashes = [generator.getrandbits(64) for _ in range(2000)]
+        # Close to an existing hash, in a different chunk each time
+        self._hashes += [self._hashes[0] ^ (1 << bit) for bit in (3, 20, 40, 60)]
+        self._hashes += [self._hashes[1] ^ 0b111 << 30]
+
+        self._index = NearDuplicateIndex(np.array(self._hashes, dtype=np.uint64))
+
+    def _find_by_scan(self, picture_hash: int, tolerance: int) -> list[int]:
+        return sorted(
+            value
+            for value in set(self._hashes)
+            if bin(value ^ picture_hash).count("1") <= tolerance
+        )
+
+    def test_count_different_bits(self):
+        self.assertEqual(
+            [0, 1, 64],
+            count_different_bits(
+                np.array([5, 4, 2**64 - 1 - 5], dtype=np.uint64), 5
+            ).tolist(),
+        )
+
+    def test_find_same_as_scan(self):
+        for picture_hash in self._hashes[:50] + self._hashes[-5:]:
+            for tolerance in range(4):
+                self.assertEqual(
+                    self._find_by_scan(picture_hash, tolerance),
+                    self._index.find(picture_hash, tolerance),
+                )
+
+    def test_find_tolerance(self):
+        self.assertEqual([self._hashes[1]], self._index.find(self._hashes[1], 2))
+        self.assertEqual(
+            set([self._hashes[1], self._hashes[-1]]),
+            set(self._index.find(self._hashes[1], 3)),
+        )
+        self.assertFalse(self._index.contains(self._hashes[1] ^ 0b1111, 3))
+        self.assertRaises(NearDuplicateIndexException, self._index.find, 0, 4)
+
+    def test_add(self):
+        picture_hash = 0x0123456789ABCDEF
+
+        self.assertFalse(self._index.contains(picture_hash ^ 0b11, 2))
+
+        self._index.add(picture_hash)
+
+        self.assertTrue(self._index.contains(picture_hash ^ 0b11, 2))
+        self.assertEqual(len(set(self._hashes)) + 1, len(self._index))
+        self.assertEqual(
+            [picture_hash], self._index.rebuild().find(picture_hash ^ 0b11, 2)
+        )
+
+    def test_from_hash_list(self):
+        index = NearDuplicateIndex.from_hash_list(
+            ["0000000000000001", "not a hash", "2eacfe02c923466cb98163c0b65c739e"]
+        )
+
+        self.assertEqual(1, len(index))
+        self.assertTrue(index.contains(0, 1))
+
+
+class TestNearDuplicateIndexRepository(unittest.TestCase):
+    def setUp(self):
+        folder_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, folder_path)
+
+        self._repository = NearDuplicateIndexRepository(
+            folder_path / NEAR_DUPLICATE_INDEX_FILE_NAME
+        )
+
+    def test_save_and_load(self):
+        self.assertIsNone(self._repository.load("signature"))
+
+        index = NearDuplicateIndex(np.array([1, 2**40], dtype=np.uint64))
+        index.add(2**63)
+        self._repository.save(index, "signature")
+
+        loaded_index = self._repository.load("signature")
+
+        self.assertEqual(3, len(loaded_index))
+        self.assertEqual([2**63], loaded_index.find(2**63 + 2, 1))
+        self.assertIsNone(self._repository.load("other signature"))
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from app.entities.picture_data import FileStat, PictureData
+from app.repositories.picture_data import iPictureDataRepository
+from app.services.picture_data_caching import LocalFilePictureDataCachingService
+
+
+class TestLocalFilePictureDataCachingService(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self._picture_path = Path(self._temporary_directory.name) / "picture.jpg"
+        self._picture_path.write_bytes(b"picture content")
+
+        self._mock_repository = MagicMock(spec=iPictureDataRepository)
+        self._caching_service = LocalFilePictureDataCachingService(
+            picture_data_repo=self._mock_repository
+        )
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+    def _cached_data(self, file_stat) -> PictureData:
+        return PictureData(
+            path=self._picture_path,
+            creation_date=datetime(2023, 10, 1, tzinfo=timezone.utc),
+            hash="hash1",
+            file_stat=file_stat,
+        )
+
+    def test_get_from_cache_not_cached(self):
+        self._mock_repository.get.return_value = None
+
+        self.assertIsNone(self._caching_service.get_from_cache(self._picture_path))
+
+    def test_get_from_cache_file_unchanged(self):
+        picture_data = self._cached_data(FileStat.from_path(self._picture_path))
+        self._mock_repository.get.return_value = picture_data
+
+        self.assertEqual(
+            picture_data, self._caching_service.get_from_cache(self._picture_path)
+        )
+
+    def test_get_from_cache_file_modified(self):
+        file_stat = FileStat.from_path(self._picture_path)
+        self._mock_repository.get.return_value = self._cached_data(file_stat)
+
+        self._picture_path.write_bytes(b"other picture content")
+        os.utime(self._picture_path, ns=(file_stat.mtime_ns, file_stat.mtime_ns + 1))
+
+        self.assertIsNone(self._caching_service.get_from_cache(self._picture_path))
+
+    def test_get_from_cache_without_file_stat(self):
+        self._mock_repository.get.return_value = self._cached_data(None)
+
+        self.assertIsNone(self._caching_service.get_from_cache(self._picture_path))
+
+    def test_get_from_cache_file_deleted(self):
+        picture_data = self._cached_data(FileStat.from_path(self._picture_path))
+        self._mock_repository.get.return_value = picture_data
+        self._picture_path.unlink()
+
+        self.assertIsNone(self._caching_service.get_from_cache(self._picture_path))
@@ -0,0 +1,73 @@
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from app.entities.picture_data import (FileStat, LazyPictureData, PictureData,
+                                       PictureDataField)
+
+
+class TestLazyPictureData(unittest.TestCase):
+    def setUp(self):
+        self._creation_date_loader = MagicMock(
+            return_value=datetime(2023, 10, 1, tzinfo=timezone.utc)
+        )
+        self._hash_loader = MagicMock(return_value="c643dbe5e4d60f02")
+
+        self._picture_data = LazyPictureData(
+            path=Path("path1"),
+            creation_date_loader=self._creation_date_loader,
+            hash_loader=self._hash_loader,
+        )
+
+    def test_nothing_computed_before_access(self):
+        self.assertEqual(Path("path1"), self._picture_data.get_path())
+
+        self._creation_date_loader.assert_not_called()
+        self._hash_loader.assert_not_called()
+
+    def test_fields_computed_once(self):
+        self._picture_data.get_hash()
+        self.assertEqual("c643dbe5e4d60f02", self._picture_data.get_hash())
+
+        self._hash_loader.assert_called_once_with()
+        self._creation_date_loader.assert_not_called()
+
+    def test_load_only_requested_fields(self):
+        self._picture_data.load([PictureDataField.CREATION_DATE])
+
+        self._creation_date_loader.assert_called_once_with()
+        self._hash_loader.assert_not_called()
+
+        self.assertEqual(
+            datetime(2023, 10, 1, tzinfo=timezone.utc),
+            self._picture_data.get_creation_date(),
+        )
+        self._creation_date_loader.assert_called_once_with()
+
+
+class TestPictureData(unittest.TestCase):
+    def test_json_with_file_stat(self):
+        picture_data = PictureData(
+            path=Path("path1"),
+            creation_date=datetime(2023, 10, 1, tzinfo=timezone.utc),
+            hash="c643dbe5e4d60f02",
+            file_stat=FileStat(size=10, mtime_ns=1700000000000000000, inode=42),
+        )
+
+        new_picture_data = PictureData.from_json(PictureData.to_json(picture_data))
+
+        self.assertEqual(picture_data.get_path(), new_picture_data.get_path())
+        self.assertEqual(
+            picture_data.get_creation_date(), new_picture_data.get_creation_date()
+        )
+        self.assertEqual(picture_data.get_hash(), new_picture_data.get_hash())
+        self.assertEqual(picture_data.get_file_stat(), new_picture_data.get_file_stat())
+
+    def test_json_without_file_stat(self):
+        new_picture_data = PictureData.from_json(
+            '{"path": "path1", "creation_date": "2023-10-01T00:00:00+00:00", '
+            '"hash": "c643dbe5e4d60f02"}'
+        )
+
+        self.assertIsNone(new_picture_data.get_file_stat())
@@ -1,10 +1,16 @@
+import sqlite3
+import tempfile
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from uuid import uuid4
 
-from app.entities.picture_data import PictureData
-from app.repositories.picture_data import PictureDataRepository
+from app.entities.picture_data import FileStat, PictureData
+from app.repositories.picture_data import (IndexedPictureDataRepository,
+                                           PictureDataRepository,
+                                           SqlitePictureDataRepository,
+                                           migrate_cache_to_sqlite,
+                                           picture_data_repository_factory)
 
 
 class TestPictureDataRepository(unittest.TestCase):
@@ -68,3 +74,446 @@ class TestPictureDataRepository(unittest.TestCase):
             new_repository.get(picture_data.get_path()).get_hash(),
             picture_data.get_hash(),
         )
+
+
+class TestSqlitePictureDataRepository(unittest.TestCase):
+    def setUp(self):
+        self._database_path = Path(
+            f"tests/files/repository/repo_{uuid4().hex}.sqlite"
+        )
+
+    def test_get_record(self):
+        repository = SqlitePictureDataRepository(database_path=self._database_path)
+
+        picture_data = PictureData(
+            path=Path("tests/files/repository/test.jpg"),
+            creation_date=datetime(2023, 10, 1, 12, 0, 0, tzinfo=timezone.utc),
+            hash="1234567890abcdef",
+            file_stat=FileStat(size=10, mtime_ns=1700000000000000000, inode=42),
+        )
+
+        self.assertIsNone(repository.get(picture_data.get_path()))
+
+        repository.record(data=picture_data)
+
+        self.assertEqual(repository.get(picture_data.get_path()), picture_data)
+
+        repository.flush()
+
+        new_repository = SqlitePictureDataRepository(database_path=self._database_path)
+        new_picture_data = new_repository.get(picture_data.get_path())
+
+        self.assertEqual(new_picture_data.get_hash(), picture_data.get_hash())
+        self.assertEqual(
+            new_picture_data.get_creation_date(), picture_data.get_creation_date()
+        )
+        self.assertEqual(new_picture_data.get_file_stat(), picture_data.get_file_stat())
+
+    def test_file_stat_columns_added_to_old_cache(self):
+        connection = sqlite3.connect(self._database_path)
+        connection.execute(
+            "CREATE TABLE picture_data (path TEXT PRIMARY KEY, "
+            "creation_date TEXT NOT NULL, hash TEXT NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO picture_data VALUES "
+            "('folder/old.jpg', '2023-10-01T12:00:00', 'hash0')"
+        )
+        connection.commit()
+        connection.close()
+
+        repository = SqlitePictureDataRepository(database_path=self._database_path)
+
+        picture_data = PictureData(
+            path=Path("folder/new.jpg"),
+            creation_date=datetime(2023, 10, 1, 12, 0, 0, tzinfo=timezone.utc),
+            hash="hash1",
+            file_stat=FileStat(size=10, mtime_ns=1700000000000000000, inode=42),
+        )
+        repository.record(data=picture_data)
+        repository.flush()
+
+        new_repository = SqlitePictureDataRepository(database_path=self._database_path)
+
+        self.assertEqual(
+            "hash0", new_repository.get(Path("folder/old.jpg")).get_hash()
+        )
+        self.assertIsNone(new_repository.get(Path("folder/old.jpg")).get_file_stat())
+        self.assertEqual(
+            picture_data.get_file_stat(),
+            new_repository.get(picture_data.get_path()).get_file_stat(),
+        )
+
+    def test_record_batched(self):
+        repository = SqlitePictureDataRepository(
+            database_path=self._database_path, flush_count=2
+        )
+        other_repository = SqlitePictureDataRepository(
+            database_path=self._database_path
+        )
+
+        for index in range(3):
+            repository.record(
+                PictureData(
+                    path=Path(f"folder/test{index}.jpg"),
+                    creation_date=datetime(2023, 10, 1, 12, 0, 0),
+                    hash=f"hash{index}",
+                )
+            )
+
+        self.assertIsNotNone(other_repository.get(Path("folder/test1.jpg")))
+        self.assertIsNone(other_repository.get(Path("folder/test2.jpg")))
+
+        repository.flush()
+
+        self.assertIsNotNone(other_repository.get(Path("folder/test2.jpg")))
+
+    def test_get_parents_folder_list(self):
+        repository = SqlitePictureDataRepository(database_path=self._database_path)
+
+        for path in ["folder1/test1.jpg", "folder1/test2.jpg", "folder2/test3.jpg"]:
+            repository.record(
+                PictureData(
+                    path=Path(path),
+                    creation_date=datetime(2023, 10, 1, 12, 0, 0),
+                    hash="same-hash",
+                )
+            )
+
+        folders = repository.get_parents_folder_list(picture_hash="same-hash")
+
+        self.assertEqual(set(folders), set(["folder1", "folder2"]))
+        self.assertEqual([], repository.get_parents_folder_list(picture_hash="other"))
+
+    def test_import_jsonl(self):
+        cache_file_path = Path(f"tests/files/repository/repo_{uuid4().hex}.jsonl")
+        jsonl_repository = PictureDataRepository(cache_file_path=cache_file_path)
+
+        picture_data = PictureData(
+            path=Path("folder1/test1.jpg"),
+            creation_date=datetime(2023, 10, 1, 12, 0, 0),
+            hash="1234567890abcdef",
+        )
+        jsonl_repository.record(picture_data)
+        jsonl_repository.record(picture_data)
+
+        repository = SqlitePictureDataRepository(database_path=self._database_path)
+
+        self.assertEqual(2, repository.import_jsonl(cache_file_path))
+        self.assertEqual(
+            picture_data.get_hash(), repository.get(picture_data.get_path()).get_hash()
+        )
+        self.assertEqual(
+            ["folder1"], repository.get_parents_folder_list("1234567890abcdef")
+        )
+
+
+class TestPictureDataRepositoryFactory(unittest.TestCase):
+    def test_migrate_cache_to_sqlite(self):
+        with tempfile.TemporaryDirectory() as backup_folder:
+            backup_folder_path = Path(backup_folder)
+
+            self.assertIsInstance(
+                picture_data_repository_factory(backup_folder_path),
+                PictureDataRepository,
+            )
+
+            picture_data = PictureData(
+                path=Path("folder1/test1.jpg"),
+                creation_date=datetime(2023, 10, 1, 12, 0, 0),
+                hash="1234567890abcdef",
+            )
+            repository = picture_data_repository_factory(backup_folder_path)
+            repository.record(picture_data)
+            repository.close()
+
+            self.assertEqual(1, migrate_cache_to_sqlite(backup_folder_path))
+
+            repository = picture_data_repository_factory(backup_folder_path)
+
+            self.assertIsInstance(repository, SqlitePictureDataRepository)
+            self.assertEqual(
+                picture_data.get_hash(),
+                repository.get(picture_data.get_path()).get_hash(),
+            )
+            repository.close()
+
+            self.assertRaises(
+                FileExistsError, migrate_cache_to_sqlite, backup_folder_path
+            )
+
+
+class TestPictureDataRepositoryCompaction(unittest.TestCase):
+    def setUp(self):
+        self._file_path = Path(f"tests/files/repository/repo_{uuid4().hex}.jsonl")
+
+        self._picture_data = PictureData(
+            path=Path("folder1/test1.jpg"),
+            creation_date=datetime(2023, 10, 1, 12, 0, 0),
+            hash="hash1",
+        )
+        self._other_picture_data = PictureData(
+            path=Path("folder2/test2.jpg"),
+            creation_date=datetime(2023, 10, 1, 12, 0, 0),
+            hash="hash1",
+        )
+
+    def _count_lines(self) -> int:
+        with open(self._file_path, "r") as file:
+            return len(file.readlines())
+
+    def test_compact(self):
+        repository = PictureDataRepository(
+            cache_file_path=self._file_path, compaction_ratio=None
+        )
+
+        for _ in range(3):
+            repository.record(self._picture_data)
+        repository.record(self._other_picture_data)
+
+        self.assertEqual(4, self._count_lines())
+        self.assertEqual(2, repository.compact())
+        self.assertEqual(2, self._count_lines())
+
+        new_repository = PictureDataRepository(cache_file_path=self._file_path)
+
+        self.assertEqual(
+            self._picture_data.get_hash(),
+            new_repository.get(self._picture_data.get_path()).get_hash(),
+        )
+        self.assertEqual(
+            set(["folder1", "folder2"]),
+            set(new_repository.get_parents_folder_list("hash1")),
+        )
+
+    def test_compact_when_loaded_above_ratio(self):
+        repository = PictureDataRepository(
+            cache_file_path=self._file_path, compaction_ratio=None
+        )
+
+        for _ in range(3):
+            repository.record(self._picture_data)
+
+        PictureDataRepository(cache_file_path=self._file_path, compaction_ratio=3)
+
+        self.assertEqual(3, self._count_lines())
+
+        PictureDataRepository(cache_file_path=self._file_path, compaction_ratio=2)
+
+        self.assertEqual(1, self._count_lines())
+
+    def test_record_same_path_new_hash_updates_folder_list(self):
+        repository = PictureDataRepository(cache_file_path=self._file_path)
+
+        repository.record(self._picture_data)
+        repository.record(self._picture_data)
+        repository.record(
+            PictureData(
+                path=self._picture_data.get_path(),
+                creation_date=datetime(2023, 10, 1, 12, 0, 0),
+                hash="hash2",
+            )
+        )
+
+        self.assertEqual([], repository.get_parents_folder_list("hash1"))
+        self.assertEqual(["folder1"], repository.get_parents_folder_list("hash2"))
+
+
+class TestPictureDataRepositoryWriteBuffer(unittest.TestCase):
+    def setUp(self):
+        self._file_path = Path(f"tests/files/repository/repo_{uuid4().hex}.jsonl")
+
+    def _picture_data(self, index: int) -> PictureData:
+        return PictureData(
+            path=Path(f"folder/test{index}.jpg"),
+            creation_date=datetime(2023, 10, 1, 12, 0, 0),
+            hash=f"hash{index}",
+        )
+
+    def _count_lines(self) -> int:
+        if not self._file_path.is_file():
+            return 0
+
+        with open(self._file_path, "r") as file:
+            return len(file.readlines())
+
+    def test_flush_count(self):
+        repository = PictureDataRepository(
+            cache_file_path=self._file_path, flush_count=2
+        )
+
+        repository.record(self._picture_data(0))
+
+        self.assertEqual(0, self._count_lines())
+        self.assertIsNotNone(repository.get(self._picture_data(0).get_path()))
+
+        repository.record(self._picture_data(1))
+        repository.record(self._picture_data(2))
+
+        self.assertEqual(2, self._count_lines())
+
+        repository.close()
+
+        self.assertEqual(3, self._count_lines())
+
+    def test_flush_interval(self):
+        repository = PictureDataRepository(
+            cache_file_path=self._file_path,
+            flush_count=10,
+            flush_interval=0,
+            fsync=True,
+        )
+
+        repository.record(self._picture_data(0))
+
+        self.assertEqual(1, self._count_lines())
+
+    def test_compact_with_buffered_records(self):
+        repository = PictureDataRepository(
+            cache_file_path=self._file_path, flush_count=10
+        )
+
+        repository.record(self._picture_data(0))
+        repository.record(self._picture_data(0))
+        repository.record(self._picture_data(1))
+        repository.compact()
+        repository.close()
+
+        self.assertEqual(2, self._count_lines())
+
+
+class TestIndexedPictureDataRepository(unittest.TestCase):
+    def setUp(self):
+        self._file_path = Path(f"tests/files/repository/repo_{uuid4().hex}.jsonl")
+        self._index_file_path = Path(f"{self._file_path}.idx")
+
+    def _picture_data(self, index: int, hash: str = "hash1") -> PictureData:
+        return PictureData(
+            path=Path(f"folder{index}/test{index}.jpg"),
+            creation_date=datetime(2023, 10, 1, 12, 0, 0),
+            hash=hash,
+            file_stat=FileStat(size=index, mtime_ns=index, inode=index),
+        )
+
+    def _write_cache(self, picture_data_list: list[PictureData]) -> None:
+        repository = PictureDataRepository(cache_file_path=self._file_path)
+
+        for picture_data in picture_data_list:
+            repository.record(picture_data)
+
+    def test_get_record(self):
+        self._write_cache([self._picture_data(1), self._picture_data(2)])
+
+        repository = IndexedPictureDataRepository(cache_file_path=self._file_path)
+
+        self.assertTrue(self._index_file_path.is_file())
+        self.assertEqual(
+            self._picture_data(2).get_file_stat(),
+            repository.get(self._picture_data(2).get_path()).get_file_stat(),
+        )
+        self.assertIsNone(repository.get(Path("folder3/test3.jpg")))
+
+        repository.record(self._picture_data(3))
+
+        self.assertEqual(
+            self._picture_data(3).get_path(),
+            repository.get(self._picture_data(3).get_path()).get_path(),
+        )
+        repository.close()
+
+    def test_latest_record_wins(self):
+        self._write_cache([self._picture_data(1), self._picture_data(1, "hash2")])
+
+        repository = IndexedPictureDataRepository(
+            cache_file_path=self._file_path, compaction_ratio=None
+        )
+
+        self.assertEqual(
+            "hash2", repository.get(self._picture_data(1).get_path()).get_hash()
+        )
+        self.assertEqual([], repository.get_parents_folder_list("hash1"))
+        self.assertEqual(["folder1"], repository.get_parents_folder_list("hash2"))
+        repository.close()
+
+    def test_get_parents_folder_list(self):
+        self._write_cache([self._picture_data(1), self._picture_data(2, "hash2")])
+
+        repository = IndexedPictureDataRepository(cache_file_path=self._file_path)
+        repository.record(self._picture_data(3))
+        repository.record(self._picture_data(2))
+
+        self.assertEqual(
+            set(["folder1", "folder2", "folder3"]),
+            set(repository.get_parents_folder_list("hash1")),
+        )
+        self.assertEqual([], repository.get_parents_folder_list("hash2"))
+        repository.close()
+
+    def test_index_updated_with_appended_lines(self):
+        self._write_cache([self._picture_data(1)])
+        IndexedPictureDataRepository(cache_file_path=self._file_path).close()
+
+        self._write_cache([self._picture_data(2)])
+
+        repository = IndexedPictureDataRepository(cache_file_path=self._file_path)
+
+        self.assertIsNotNone(repository.get(self._picture_data(1).get_path()))
+        self.assertIsNotNone(repository.get(self._picture_data(2).get_path()))
+        repository.close()
+
+    def test_index_rebuilt_when_file_replaced(self):
+        self._write_cache([self._picture_data(1)])
+        IndexedPictureDataRepository(cache_file_path=self._file_path).close()
+
+        self._file_path.unlink()
+        self._write_cache([self._picture_data(2)])
+
+        repository = IndexedPictureDataRepository(cache_file_path=self._file_path)
+
+        self.assertIsNone(repository.get(self._picture_data(1).get_path()))
+        self.assertIsNotNone(repository.get(self._picture_data(2).get_path()))
+        repository.close()
+
+    def test_incomplete_last_line_ignored(self):
+        self._write_cache([self._picture_data(1)])
+
+        with open(self._file_path, "a") as file:
+            file.write('{"path": "folder2/te')
+
+        repository = IndexedPictureDataRepository(cache_file_path=self._file_path)
+
+        self.assertIsNotNone(repository.get(self._picture_data(1).get_path()))
+        repository.close()
+
+    def test_append_after_incomplete_last_line(self):
+        self._write_cache([self._picture_data(1)])
+
+        with open(self._file_path, "a") as file:
+            file.write('{"path": "folder2/te')
+
+        repository = IndexedPictureDataRepository(cache_file_path=self._file_path)
+        repository.record(self._picture_data(3))
+        repository.close()
+
+        repository = IndexedPictureDataRepository(cache_file_path=self._file_path)
+
+        self.assertIsNotNone(repository.get(self._picture_data(1).get_path()))
+        self.assertIsNotNone(repository.get(self._picture_data(3).get_path()))
+        repository.close()
+
+        self.assertEqual(
+            2, len(PictureDataRepository(cache_file_path=self._file_path)._data)
+        )
+
+    def test_compact_when_loaded_above_ratio(self):
+        self._write_cache([self._picture_data(1)] * 3)
+
+        repository = IndexedPictureDataRepository(
+            cache_file_path=self._file_path, compaction_ratio=2
+        )
+
+        with open(self._file_path, "r") as file:
+            self.assertEqual(1, len(file.readlines()))
+
+        self.assertIsNotNone(repository.get(self._picture_data(1).get_path()))
+        repository.close()
@@ -2,14 +2,24 @@ import unittest
 from datetime import datetime, timezone
 from pathlib import Path
 
-from app.entities.picture import (HasherException, MalformedImageFileException,
-                                  Picture)
+import imagehash
+import numpy as np
+
+from app.entities.picture import (FAST_HASH_MAX_DISTANCE, HasherException,
+                                  MalformedImageFileException, Picture,
+                                  PictureException, get_hash_batch)
+from app.entities.picture_data import PictureDataField
+from app.factories.picture_data import PictureDataFactory
 
 TEST_PICTURE_CAMERA = "tests/files/test-canon-eos70D-exif.jpg"
 TEST_PICTURE_OLD_SCAN_2 = "tests/files/0001.jpg"
 
 DEFAULT_CREATION_TIME = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
+TEST_PICTURE_LIST = sorted(
+    path for path in Path("tests/files").iterdir() if path.suffix.lower() == ".jpg"
+)
+
 
 class TestPictureEntity(unittest.TestCase):
     def test_get_exif_creation_time_old_picture(self):
@@ -53,3 +63,137 @@ class TestPictureEntity(unittest.TestCase):
         picture = Picture(path=Path("tests/files/foto_no_exif.jpg"))
 
         self.assertEqual(DEFAULT_CREATION_TIME, picture.get_exif_creation_time())
+
+    def test_get_fast_hash(self):
+        picture = Picture(
+            path=Path("tests/files/test-canon-eos70D.jpg"), fast_hash=True
+        )
+
+        self.assertEqual("c643dbe5e4d60f02", picture.get_hash())
+
+    def test_get_fast_hash_within_max_distance_of_hash(self):
+        for picture_path in TEST_PICTURE_LIST:
+            try:
+                picture_hash = Picture(path=picture_path).get_hash()
+            except PictureException:
+                continue
+
+            fast_hash = Picture(path=picture_path, fast_hash=True).get_hash()
+            distance = imagehash.hex_to_hash(picture_hash) - imagehash.hex_to_hash(
+                fast_hash
+            )
+
+            self.assertLessEqual(distance, FAST_HASH_MAX_DISTANCE, str(picture_path))
+
+    def test_get_hash_pixels(self):
+        picture = Picture(path=Path("tests/files/test-canon-eos70D.jpg"))
+
+        pixels = picture.get_hash_pixels()
+
+        self.assertEqual((32, 32), pixels.shape)
+        self.assertEqual(np.uint8, pixels.dtype)
+
+    def test_get_hash_batch_same_as_get_hash(self):
+        picture_list = []
+
+        for picture_path in TEST_PICTURE_LIST:
+            try:
+                Picture(path=picture_path).get_hash()
+            except PictureException:
+                continue
+
+            picture_list.append(picture_path)
+
+        expected_hash_list = [
+            Picture(path=picture_path).get_hash() for picture_path in picture_list
+        ]
+        pixels_list = [
+            Picture(path=picture_path).get_hash_pixels()
+            for picture_path in picture_list
+        ]
+
+        self.assertEqual(expected_hash_list, get_hash_batch(pixels_list))
+
+    def test_get_hash_batch_empty(self):
+        self.assertEqual([], get_hash_batch([]))
+
+    def test_get_hash_batch_wrong_shape_throws_exception(self):
+        def hash_wrong_shape():
+            get_hash_batch([np.zeros((16, 16), dtype=np.uint8)])
+
+        self.assertRaises(HasherException, hash_wrong_shape)
+
+    def test_get_hash_batch_different_shapes_throws_exception(self):
+        def hash_different_shapes():
+            get_hash_batch(
+                [
+                    np.zeros((32, 32), dtype=np.uint8),
+                    np.zeros((16, 16), dtype=np.uint8),
+                ]
+            )
+
+        self.assertRaises(HasherException, hash_different_shapes)
+
+    def test_compute_creation_date_same_as_get_exif_creation_time(self):
+        for picture_path in TEST_PICTURE_LIST:
+            try:
+                expected_creation_time = Picture(
+                    path=picture_path
+                ).get_exif_creation_time()
+            except PictureException:
+                continue
+
+            self.assertEqual(
+                expected_creation_time,
+                PictureDataFactory().compute_creation_date(
+                    path=picture_path, current_timezone=timezone.utc
+                ),
+                str(picture_path),
+            )
+
+    def test_compute_data_only_requested_fields(self):
+        picture_data = PictureDataFactory().compute_data(
+            path=Path("tests/files/not_a_jpeg.jpg"),
+            current_timezone=timezone.utc,
+            fields=[],
+        )
+
+        self.assertRaises(MalformedImageFileException, picture_data.get_hash)
+
+    def test_compute_data_creation_date_then_hash(self):
+        picture_data = PictureDataFactory().compute_data(
+            path=Path(TEST_PICTURE_CAMERA),
+            current_timezone=timezone.utc,
+            fields=[PictureDataField.CREATION_DATE],
+        )
+
+        self.assertEqual(
+            datetime(2019, 11, 19, 12, 46, 56, tzinfo=timezone.utc),
+            picture_data.get_creation_date(),
+        )
+        self.assertEqual("c643dbe5e4d60f02", picture_data.get_hash())
+
+    def test_compute_data_from_picture_file(self):
+        picture_data_factory = PictureDataFactory()
+
+        for picture_path in TEST_PICTURE_LIST:
+            try:
+                expected_data = picture_data_factory.compute_data(
+                    path=picture_path, current_timezone=timezone.utc
+                )
+            except PictureException:
+                continue
+
+            picture_data = picture_data_factory.compute_data(
+                path=picture_path,
+                current_timezone=timezone.utc,
+                picture_file=picture_data_factory.read_picture_file(picture_path),
+            )
+
+            self.assertEqual(
+                expected_data.get_creation_date(), picture_data.get_creation_date()
+            )
+            self.assertEqual(expected_data.get_hash(), picture_data.get_hash())
+            self.assertEqual(
+                expected_data.get_file_stat(), picture_data.get_file_stat()
+            )
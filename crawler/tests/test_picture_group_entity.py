@@ -1,12 +1,16 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call
+
+import numpy as np
 
 from app.entities.picture_data import PictureData, iPictureData
 from app.entities.picture_group import (NotUniqueFolderException, PictureGroup,
-                                        PictureGroupException)
-from app.repositories.picture_data import iPictureDataRepository
+                                        PictureGroupException,
+                                        TablePictureGroup)
+from app.entities.picture_table import PictureTableBuilder
+from app.repositories.folder_name_index import iFolderNameIndexRepository
 
 
 class TestPictureGroup(unittest.TestCase):
@@ -109,7 +113,7 @@ class TestPictureGroup(unittest.TestCase):
             self._picture_group_list, min_group_size=4
         )
 
-        self._mock_picture_data_repository = MagicMock(spec=iPictureDataRepository)
+        self._mock_folder_name_index = MagicMock(spec=iFolderNameIndexRepository)
 
     def test_is_editable_not_grouped_should_return_false(self):
         picture_group = PictureGroup([self._picture_group_list_2[0]], min_group_size=1)
@@ -146,18 +150,17 @@ class TestPictureGroup(unittest.TestCase):
             min_group_size=1,
         )
 
-        self._mock_picture_data_repository.get_parents_folder_list.return_value = [
-            "2024-03 Vacances Ski les Arcs",
-            "2024-03 Vacances Ski les Arcs",
-            "Saint Malo Weekend",
-        ]
+        self._mock_folder_name_index.get_folder_name_count.return_value = {
+            "Vacances Ski les Arcs": 2,
+            "Saint Malo Weekend": 1,
+        }
 
         expected_folder_name_list = [
             Path("root/2023-10-03 Saint Malo Weekend<OR>Vacances Ski les Arcs"),
             Path("root/2023-10-03 Vacances Ski les Arcs<OR>Saint Malo Weekend"),
         ]
         self.assertIn(
-            picture_group.get_new_folder_name(self._mock_picture_data_repository),
+            picture_group.get_new_folder_name(self._mock_folder_name_index),
             expected_folder_name_list,
         )
 
@@ -170,32 +173,11 @@ class TestPictureGroup(unittest.TestCase):
             min_group_size=1,
         )
 
-        self._mock_picture_data_repository.get_parents_folder_list.return_value = []
-
-        expected_folder_name = Path("root/2013-02-03 <EVENT_DESCRIPTION>")
-        self.assertEqual(
-            picture_group.get_new_folder_name(self._mock_picture_data_repository),
-            expected_folder_name,
-        )
-
-    def test_get_new_folder_name_should_return_same_name_if_only_camera_folder(self):
-        picture_group = PictureGroup(
-            [
-                self._picture_group_list_2[1],
-                self._picture_group_list_2[3],
-            ],
-            min_group_size=1,
-        )
-
-        self._mock_picture_data_repository.get_parents_folder_list.return_value = [
-            "mon truc avec CANON",
-            "FUJI RAW",
-            "XXX APPLE RAW",
-        ]
+        self._mock_folder_name_index.get_folder_name_count.return_value = {}
 
         expected_folder_name = Path("root/2013-02-03 <EVENT_DESCRIPTION>")
         self.assertEqual(
-            picture_group.get_new_folder_name(self._mock_picture_data_repository),
+            picture_group.get_new_folder_name(self._mock_folder_name_index),
             expected_folder_name,
         )
 
@@ -203,7 +185,7 @@ class TestPictureGroup(unittest.TestCase):
         picture_group = PictureGroup([self._picture_group_list_2[2]], min_group_size=1)
 
         def get_new_folder_name():
-            picture_group.get_new_folder_name(self._mock_picture_data_repository)
+            picture_group.get_new_folder_name(self._mock_folder_name_index)
 
         self.assertRaises(PictureGroupException, get_new_folder_name)
 
@@ -287,3 +269,88 @@ class TestPictureGroup(unittest.TestCase):
             pictures_to_move,
             expected_list,
         )
+
+
+class TestTablePictureGroup(unittest.TestCase):
+    def setUp(self):
+        builder = PictureTableBuilder()
+        builder.add(
+            path=Path("root/2013-02-03 <EVENT_DESCRIPTION>/1.jpg"),
+            timestamp=int(datetime(2013, 2, 4, tzinfo=timezone.utc).timestamp()),
+            picture_hash=1,
+        )
+        builder.add(
+            path=Path("root/NOT_GROUPED/2.jpg"),
+            timestamp=int(datetime(2013, 2, 5, tzinfo=timezone.utc).timestamp()),
+            picture_hash=2,
+        )
+        builder.add(
+            path=Path("root/2013-02-03 <EVENT_DESCRIPTION>/3.jpg"),
+            timestamp=int(datetime(2013, 2, 3, tzinfo=timezone.utc).timestamp()),
+            picture_hash=3,
+        )
+
+        self._picture_table = builder.build()
+        self._mock_folder_name_index = MagicMock(spec=iFolderNameIndexRepository)
+
+    def test_list_pictures_to_move(self):
+        picture_group = TablePictureGroup(
+            self._picture_table, np.array([0, 1, 2]), min_group_size=1
+        )
+
+        self.assertEqual(
+            Path("root/2013-02-03 <EVENT_DESCRIPTION>"),
+            picture_group.get_folder_path(),
+        )
+        self.assertEqual(
+            [
+                (
+                    Path("root/NOT_GROUPED/2.jpg"),
+                    Path("root/2013-02-03 <EVENT_DESCRIPTION>/2.jpg"),
+                )
+            ],
+            picture_group.list_pictures_to_move(),
+        )
+
+    def test_get_new_folder_name(self):
+        picture_group = TablePictureGroup(
+            self._picture_table, np.array([0, 2]), min_group_size=1
+        )
+
+        self._mock_folder_name_index.get_folder_name_count.return_value = {
+            "Carnaval": 1
+        }
+
+        self.assertEqual(
+            Path("root/2013-02-03 Carnaval"),
+            picture_group.get_new_folder_name(self._mock_folder_name_index),
+        )
+        self._mock_folder_name_index.get_folder_name_count.assert_has_calls(
+            [call("0000000000000001"), call("0000000000000003")]
+        )
+
+    def test_summary_same_as_list(self):
+        table_group = TablePictureGroup(
+            self._picture_table, np.array([0, 1, 2]), min_group_size=1
+        )
+        list_group = PictureGroup(
+            table_group.get_picture_list(), min_group_size=1
+        )
+
+        self.assertEqual(list_group.get_summary(), table_group.get_summary())
+        self.assertEqual(
+            datetime(2013, 2, 3, tzinfo=timezone.utc),
+            table_group.get_summary().min_creation_date,
+        )
+        self.assertEqual(
+            datetime(2013, 2, 5, tzinfo=timezone.utc),
+            table_group.get_summary().max_creation_date,
+        )
+        self.assertEqual(
+            {
+                Path("root/2013-02-03 <EVENT_DESCRIPTION>"): 2,
+                Path("root/NOT_GROUPED"): 1,
+            },
+            table_group.get_summary().folder_count,
+        )
+        self.assertIs(table_group.get_summary(), table_group.get_summary())
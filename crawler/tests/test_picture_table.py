@@ -0,0 +1,102 @@
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.entities.picture_data import PictureData
+from app.entities.picture_table import (
+    PictureTableBuilder,
+    PictureTableException,
+    hash_to_int,
+    int_to_hash,
+)
+from app.factories.picture_data import PictureDataFactory
+
+
+class TestPictureTable(unittest.TestCase):
+    def setUp(self):
+        builder = PictureTableBuilder()
+        builder.add(
+            path=Path("root/EVENT_1/1733616335-e7975821ce2e1a55.jpg"),
+            timestamp=1733616335,
+            picture_hash=0xE7975821CE2E1A55,
+        )
+        builder.add(
+            path=Path("root/EVENT_1/1733616336-0000000000000001.jpg"),
+            timestamp=1733616336,
+            picture_hash=1,
+        )
+        builder.add_picture_data(
+            PictureData(
+                path=Path("root/NOT_GROUPED/test.jpg"),
+                creation_date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                hash="ffffffffffffffff",
+            ),
+            with_hash=False,
+        )
+
+        self._picture_table = builder.build()
+
+    def test_columns(self):
+        self.assertEqual(3, len(self._picture_table))
+        self.assertEqual(
+            [1733616335, 1733616336, 1704067200],
+            self._picture_table.get_timestamps().tolist(),
+        )
+        self.assertEqual([0, 0, 1], self._picture_table.get_folder_ids().tolist())
+        self.assertEqual(
+            [Path("root/EVENT_1"), Path("root/NOT_GROUPED")],
+            self._picture_table.get_folders(),
+        )
+
+    def test_get_folder_id(self):
+        self.assertEqual(1, self._picture_table.get_folder_id(Path("root/NOT_GROUPED")))
+        self.assertIsNone(self._picture_table.get_folder_id(Path("root/EVENT_2")))
+
+    def test_rows(self):
+        self.assertEqual(
+            Path("root/EVENT_1/1733616336-0000000000000001.jpg"),
+            self._picture_table.get_path(1),
+        )
+        self.assertEqual(
+            datetime(2024, 12, 8, 0, 5, 35, tzinfo=timezone.utc),
+            self._picture_table.get_creation_date(0),
+        )
+        self.assertEqual("e7975821ce2e1a55", self._picture_table.get_hash(0))
+        self.assertEqual("0000000000000001", self._picture_table.get_hash(1))
+        self.assertRaises(PictureTableException, self._picture_table.get_hash, 2)
+
+    def test_contains_hash(self):
+        self.assertTrue(self._picture_table.contains_hash("e7975821ce2e1a55"))
+        self.assertTrue(self._picture_table.contains_hash("0000000000000001"))
+        self.assertFalse(self._picture_table.contains_hash("0000000000000000"))
+        self.assertFalse(self._picture_table.contains_hash("ffffffffffffffff"))
+        self.assertFalse(self._picture_table.contains_hash("hash1"))
+
+    def test_hash_conversion(self):
+        self.assertEqual(0xE7975821CE2E1A55, hash_to_int("e7975821ce2e1a55"))
+        self.assertEqual("0000000000000001", int_to_hash(1))
+        self.assertRaises(PictureTableException, hash_to_int, "abc")
+        self.assertRaises(PictureTableException, hash_to_int, "zzzzzzzzzzzzzzzz")
+
+    def test_add_standard_paths_to_table(self):
+        builder = PictureTableBuilder()
+        path_list = [
+            Path("root/2024/1733616335-e7975821ce2e1a55.jpg"),
+            Path("root/2024/testXXX.jpg"),
+            Path("root/2024/1733616335-e7975821.jpg"),
+        ]
+
+        not_standard_path_list = PictureDataFactory().add_standard_paths_to_table(
+            table_builder=builder, path_list=path_list
+        )
+        picture_table = builder.build()
+
+        self.assertEqual(path_list[1:], not_standard_path_list)
+        self.assertEqual(1, len(picture_table))
+        self.assertEqual(
+            PictureDataFactory()
+            .from_standard_path(path_list[0], current_timezone=timezone.utc)
+            .get_creation_date(),
+            picture_table.get_creation_date(0),
+        )
+        self.assertEqual("e7975821ce2e1a55", picture_table.get_hash(0))
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import MagicMock
+
+from app.factories.picture_data import PictureDataFactory
+from app.repositories.folder_name_index import iFolderNameIndexRepository
+from app.services.folder_snapshot import folder_snapshot_file_tools_factory
+from app.services.group_creator import GroupCreatorService
+from app.use_cases.rename import RenameUseCase
+from tests.backup_folder import create_backup_folder, record_listed_folders
+
+EVENT_FOLDER_NAME = "2024-12-08 <EVENT_DESCRIPTION>"
+
+
+class TestRenameUseCase(unittest.TestCase):
+    def setUp(self):
+        # Large enough for the event folder to be kept as a group
+        self._event_picture_name_list = [
+            f"{1733616335 + index}-{index:016x}.jpg" for index in range(10)
+        ]
+
+        self._backup_folder_path = create_backup_folder(
+            self,
+            [
+                f"2024/{EVENT_FOLDER_NAME}/{picture_name}"
+                for picture_name in self._event_picture_name_list
+            ]
+            + [
+                "2024/2024-12-01 Saint Malo/1733011200-0000000000000001.jpg",
+                "2024/NOT_GROUPED/malformed.jpg",
+            ],
+        )
+
+        self._file_tools = folder_snapshot_file_tools_factory(self._backup_folder_path)
+        self._mock_folder_name_index = MagicMock(spec=iFolderNameIndexRepository)
+
+        self._use_case = RenameUseCase(
+            file_tools=self._file_tools,
+            picture_data_factory=PictureDataFactory(),
+            folder_name_index=self._mock_folder_name_index,
+            group_creator_service=GroupCreatorService(),
+        )
+
+    def test_iter_candidate_pictures(self):
+        event_folder_path = self._backup_folder_path / "2024" / EVENT_FOLDER_NAME
+
+        self.assertEqual(
+            set(
+                event_folder_path / picture_name
+                for picture_name in self._event_picture_name_list
+            ),
+            set(self._use_case.iter_candidate_pictures(self._backup_folder_path)),
+        )
+
+        # Unchanged folders are not listed again, even the event folder
+        with record_listed_folders(self._file_tools) as listed_folder_set:
+            list(self._use_case.iter_candidate_pictures(self._backup_folder_path))
+
+        # The snapshot is written in the backup folder which changes its mtime
+        self.assertEqual(set([self._backup_folder_path]), listed_folder_set)
+
+    def test_rename_folders(self):
+        self._mock_folder_name_index.get_folder_name_count.return_value = {
+            "Carnaval": 1
+        }
+
+        self._use_case.rename_folders(
+            self._use_case.iter_candidate_pictures(self._backup_folder_path)
+        )
+
+        self.assertEqual(
+            ["2024-12-01 Saint Malo", "2024-12-08 Carnaval", "NOT_GROUPED"],
+            sorted(path.name for path in (self._backup_folder_path / "2024").iterdir()),
+        )
+        self.assertEqual(
+            10, self._mock_folder_name_index.get_folder_name_count.call_count
+        )
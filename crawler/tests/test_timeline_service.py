@@ -0,0 +1,69 @@
+import unittest
+
+from app.entities.picture_group import EventFolder
+from app.factories.picture_data import PictureDataFactory
+from app.services.folder_snapshot import folder_snapshot_file_tools_factory
+from app.services.timeline import TimelineService
+from tests.backup_folder import create_backup_folder, record_listed_folders
+
+
+class TestTimelineService(unittest.TestCase):
+    def setUp(self):
+        self._backup_folder_path = create_backup_folder(
+            self,
+            [
+                "2023/EVENT/1700000000-0000000000000001.jpg",
+                "2023/EVENT/1700000100-0000000000000002.jpg",
+                "2023/EVENT/not_standard.jpg",
+                "2023/NOT_GROUPED/1700000200-0000000000000003.jpg",
+                "2023/2023 OTHER/1600000000-0000000000000004.jpg",
+            ],
+        )
+        self._event_folder_path = self._backup_folder_path / "2023" / "EVENT"
+        self._not_grouped_folder_path = (
+            self._backup_folder_path / "2023" / "NOT_GROUPED"
+        )
+
+    def _get_timeline(self):
+        """Returns the timeline and the folders actually listed"""
+        file_tools = folder_snapshot_file_tools_factory(self._backup_folder_path)
+
+        timeline_service = TimelineService(
+            backup_folder_path=self._backup_folder_path,
+            file_tools=file_tools,
+            picture_data_factory=PictureDataFactory(),
+        )
+
+        with record_listed_folders(file_tools) as listed_folder_set:
+            timeline = timeline_service.get_timeline()
+
+        return timeline, listed_folder_set
+
+    def test_get_timeline(self):
+        timeline, listed_folder_set = self._get_timeline()
+
+        self.assertEqual(
+            [EventFolder(self._event_folder_path, 1700000000, 1700000100, 2)],
+            timeline.event_list,
+        )
+        self.assertEqual(
+            [self._not_grouped_folder_path / "1700000200-0000000000000003.jpg"],
+            timeline.new_picture_path_list,
+        )
+        self.assertIn(self._event_folder_path, listed_folder_set)
+
+        # Unchanged event folders are not listed again
+        timeline, listed_folder_set = self._get_timeline()
+
+        self.assertEqual(1, len(timeline.event_list))
+        self.assertNotIn(self._event_folder_path, listed_folder_set)
+
+        (self._event_folder_path / "1700000300-0000000000000005.jpg").write_bytes(b"")
+
+        timeline, listed_folder_set = self._get_timeline()
+
+        self.assertEqual(
+            [EventFolder(self._event_folder_path, 1700000000, 1700000300, 3)],
+            timeline.event_list,
+        )
+        self.assertIn(self._event_folder_path, listed_folder_set)